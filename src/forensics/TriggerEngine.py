@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Dict, Iterable
 
+from .metrics import instrument
+
 
 _DEFAULT_TRIGGERS = {
     "exfiltration": ["exfiltrate", "leak", "dump", "steal"],
@@ -12,12 +14,16 @@ _DEFAULT_TRIGGERS = {
     "persistence": ["remember this", "store this", "save this"],
 }
 
+# Every phrase evaluate_triggers() looks for; it matches them as substrings of text.lower().
+TRIGGER_PHRASES = tuple(phrase for phrases in _DEFAULT_TRIGGERS.values() for phrase in phrases)
+
 
 def _matches_any(text: str, phrases: Iterable[str]) -> bool:
     lowered = text.lower()
     return any(phrase in lowered for phrase in phrases)
 
 
+@instrument("trigger_engine")
 def evaluate_triggers(signal: str | Dict[str, object]) -> Dict[str, object]:
     """Evaluate whether a signal should trigger residual monitoring."""
     if isinstance(signal, dict):
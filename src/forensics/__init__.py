@@ -0,0 +1,90 @@
+"""H4RB1NG3R forensic detectors.
+
+Submodules and the common entry points below are imported on first
+attribute access (PEP 562), so ``import forensics`` costs nothing and
+calling one detector never loads the others. Use :mod:`.registry` to
+look detectors up by name.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+__version__ = "3.6.0"
+
+_SUBMODULES = frozenset({
+    "TriggerEngine",
+    "audit_tools",
+    "bec_i_calculator",
+    "cascade",
+    "collateral_damage_scorer",
+    "epistemic_narrowing_monitor",
+    "event_log_index",
+    "fleet_themes",
+    "ghost_autopsy",
+    "ghost_trace_visualizer",
+    "injection_detector",
+    "machiavellian_delta",
+    "media_triage",
+    "metadata_stripper",
+    "metrics",
+    "normalization",
+    "probe_recalibrator",
+    "profiling",
+    "psyop_scorer",
+    "reaudit",
+    "registry",
+    "sere_evaluator",
+    "siem_aggregation",
+    "star_chamber_consensus",
+    "star_chamber_journal",
+    "star_chamber_signing",
+    "streaming",
+    "threshold_tuner",
+    "thresholds",
+    "user_shards",
+    "watermark_scanner",
+    "wazuh_mcp_bridge",
+})
+
+_EXPORTS = {
+    "detect": "injection_detector",
+    "evaluate_response": "sere_evaluator",
+    "score_influence": "psyop_scorer",
+    "evaluate_triggers": "TriggerEngine",
+    "scan": "watermark_scanner",
+    "compare_traces": "ghost_autopsy",
+    "align_traces": "ghost_autopsy",
+    "calculate_machiavellian_delta": "machiavellian_delta",
+    "score_divergence": "machiavellian_delta",
+    "calculate_machiavellian_delta_stream": "machiavellian_delta",
+    "monitor_epistemic_narrowing": "epistemic_narrowing_monitor",
+    "monitor_epistemic_narrowing_stream": "epistemic_narrowing_monitor",
+    "calculate_coupling": "bec_i_calculator",
+    "detect_sandbagging": "audit_tools",
+    "initiate_star_chamber": "star_chamber_consensus",
+    "compile_nl_to_siem": "wazuh_mcp_bridge",
+    "query_siem_logs": "wazuh_mcp_bridge",
+    "strip_metadata": "metadata_stripper",
+    "strip_and_hash": "metadata_stripper",
+    "triage_file": "media_triage",
+    "get_detector": "registry",
+    "list_detectors": "registry",
+}
+
+__all__ = sorted(_SUBMODULES | set(_EXPORTS) | {"__version__"})
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,45 @@
+"""
+Forensics package CLI
+
+Lists the registered detectors or runs one by name. Only the requested
+detector's module is imported.
+
+Usage:
+    python -m forensics list
+    python -m forensics run <detector> '<json args>'
+
+The JSON argument is either a list of positional arguments or an object
+of keyword arguments.
+"""
+
+import json
+import sys
+
+from .registry import list_detectors, run
+
+
+def main():
+    """CLI interface for the detector registry."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('list', 'run') or (sys.argv[1] == 'run' and len(sys.argv) < 3):
+        print(json.dumps({'error': "Usage: python -m forensics <list|run> [detector] ['<json args>']"}))
+        sys.exit(1)
+
+    if sys.argv[1] == 'list':
+        print(json.dumps(list_detectors(), indent=2))
+        return
+
+    name = sys.argv[2]
+    arguments = json.loads(sys.argv[3]) if len(sys.argv) > 3 else []
+    try:
+        if isinstance(arguments, dict):
+            result = run(name, **arguments)
+        else:
+            result = run(name, *arguments)
+    except KeyError as exc:
+        print(json.dumps({'error': str(exc.args[0])}))
+        sys.exit(1)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,22 +2,161 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the batched API
+    np = None
+
+
+FEATURES = ("alignment", "anomaly", "volatility", "memory_drift")
+
+DEFAULT_WEIGHTS = {"alignment": 0.5, "anomaly": -0.4, "volatility": 0.2, "memory_drift": 0.3}
 
 
 def _clamp(value: float, minimum: float = 0.0, maximum: float = 1.0) -> float:
     return max(minimum, min(maximum, value))
 
 
-def calculate_coupling(features: Dict[str, float]) -> float:
+def calculate_coupling(features: Dict[str, float], weights: Optional[Mapping[str, float]] = None) -> float:
     """Calculate behavior-environment coupling index.
 
     Expected feature keys: alignment, anomaly, volatility, memory_drift.
+    ``weights`` overrides entries of :data:`DEFAULT_WEIGHTS`.
     """
-    alignment = float(features.get("alignment", 0.0))
-    anomaly = float(features.get("anomaly", 0.0))
-    volatility = float(features.get("volatility", 0.0))
-    memory_drift = float(features.get("memory_drift", 0.0))
-
-    score = 0.5 * alignment + 0.2 * volatility + 0.3 * memory_drift - 0.4 * anomaly
+    weights = DEFAULT_WEIGHTS if weights is None else {**DEFAULT_WEIGHTS, **weights}
+    score = sum(weights[name] * float(features.get(name, 0.0)) for name in FEATURES)
     return _clamp(score)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for the batched coupling API")
+
+
+def _weight_vector(weights: Optional[Mapping[str, float]]) -> "np.ndarray":
+    merged = {**DEFAULT_WEIGHTS, **(weights or {})}
+    return np.array([merged[name] for name in FEATURES], dtype=np.float64)
+
+
+def to_feature_matrix(features) -> "np.ndarray":
+    """Convert feature input to an ``(n, 4)`` float matrix in :data:`FEATURES` order.
+
+    Accepts a 2-D array already in that order, a structured array or a
+    mapping of column arrays keyed by feature name, or a list of feature
+    dicts. Missing features are treated as 0.0, as in
+    :func:`calculate_coupling`.
+    """
+    _require_numpy()
+    if isinstance(features, np.ndarray) and features.dtype.names:
+        names = features.dtype.names
+        return np.column_stack([
+            features[name].astype(np.float64) if name in names else np.zeros(len(features))
+            for name in FEATURES
+        ])
+    if isinstance(features, Mapping):
+        columns = {name: np.asarray(features[name], dtype=np.float64) for name in FEATURES if name in features}
+        size = len(next(iter(columns.values()))) if columns else 0
+        return np.column_stack([columns.get(name, np.zeros(size)) for name in FEATURES])
+    if isinstance(features, np.ndarray):
+        matrix = np.atleast_2d(features.astype(np.float64))
+    else:
+        rows = list(features)
+        if rows and isinstance(rows[0], Mapping):
+            return np.array(
+                [[float(row.get(name, 0.0)) for name in FEATURES] for row in rows], dtype=np.float64
+            ).reshape(len(rows), len(FEATURES))
+        matrix = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+    if matrix.size == 0:
+        # An idle interval yields no rows; atleast_2d turns that into shape (1, 0).
+        return np.empty((0, len(FEATURES)), dtype=np.float64)
+    if matrix.shape[1] != len(FEATURES):
+        raise ValueError(f"expected {len(FEATURES)} feature columns, got {matrix.shape[1]}")
+    return matrix
+
+
+def calculate_coupling_batch(features, weights: Optional[Mapping[str, float]] = None) -> "np.ndarray":
+    """Vectorized :func:`calculate_coupling` returning one clamped score per row."""
+    matrix = to_feature_matrix(features)
+    return np.clip(matrix @ _weight_vector(weights), 0.0, 1.0)
+
+
+class CouplingTracker:
+    """Rolling per-session coupling history in a compact ring buffer.
+
+    Scores are stored as float32 in a ``(sessions, window)`` array; each
+    session row is a ring indexed by its sample count. Capacity doubles as
+    new sessions appear.
+    """
+
+    def __init__(self, window: int = 60, weights: Optional[Mapping[str, float]] = None, capacity: int = 1024):
+        _require_numpy()
+        self.window = window
+        self.weights = _weight_vector(weights)
+        self._rows: Dict[Hashable, int] = {}
+        self._sessions: List[Hashable] = []
+        self._scores = np.full((capacity, window), np.nan, dtype=np.float32)
+        self._counts = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _row_ids(self, session_ids: Iterable[Hashable]) -> "np.ndarray":
+        rows = self._rows
+        ids = []
+        for session_id in session_ids:
+            row = rows.get(session_id)
+            if row is None:
+                row = rows[session_id] = len(self._sessions)
+                self._sessions.append(session_id)
+            ids.append(row)
+        if len(self._sessions) > self._scores.shape[0]:
+            capacity = max(len(self._sessions), 2 * self._scores.shape[0])
+            grown = np.full((capacity, self.window), np.nan, dtype=np.float32)
+            grown[:self._scores.shape[0]] = self._scores
+            self._scores = grown
+            self._counts = np.concatenate([self._counts, np.zeros(capacity - self._counts.size, dtype=np.int64)])
+        return np.asarray(ids, dtype=np.int64)
+
+    def update(self, session_ids: Iterable[Hashable], features) -> "np.ndarray":
+        """Score one feature row per session id and append it to that session's ring.
+
+        A session may appear several times in one batch; its scores are
+        appended in order.
+        """
+        scores = np.clip(to_feature_matrix(features) @ self.weights, 0.0, 1.0)
+        session_ids = list(session_ids)
+        # Check before registering, so a rejected batch leaves no new sessions behind.
+        if len(session_ids) != scores.size:
+            raise ValueError("session_ids and features must have the same length")
+        rows = self._row_ids(session_ids)
+        # Offset repeated sessions within the batch so each gets its own slot.
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        starts = np.flatnonzero(np.diff(sorted_rows, prepend=-1))
+        rank = np.arange(rows.size) - np.repeat(starts, np.diff(np.append(starts, rows.size)))
+        slots = (self._counts[sorted_rows] + rank) % self.window
+        self._scores[sorted_rows, slots] = scores[order]
+        np.add.at(self._counts, rows, 1)
+        return scores
+
+    def rolling_mean(self) -> Dict[Hashable, float]:
+        """Mean coupling over each session's window."""
+        active = self._scores[:len(self._sessions)]
+        counts = np.minimum(self._counts[:len(self._sessions)], self.window)
+        totals = np.nansum(active, axis=1, dtype=np.float64)
+        means = totals / np.maximum(counts, 1)
+        return {session: float(mean) for session, mean in zip(self._sessions, means)}
+
+    def history(self, session_id: Hashable) -> "np.ndarray":
+        """A session's scores in the window, oldest first."""
+        row = self._rows.get(session_id)
+        if row is None:
+            return np.empty(0, dtype=np.float32)
+        count = int(self._counts[row])
+        ring = self._scores[row]
+        if count <= self.window:
+            return ring[:count].copy()
+        start = count % self.window
+        return np.concatenate([ring[start:], ring[:start]])
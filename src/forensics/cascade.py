@@ -0,0 +1,297 @@
+"""Cost-aware detector cascade: cheap keyword prefilters gate the expensive analyses."""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .injection_detector import candidate_views
+from .metrics import instrument
+from .psyop_scorer import INFLUENCE_TERMS
+from .registry import get_detector
+from .TriggerEngine import TRIGGER_PHRASES
+
+
+CASCADE_PATH_ENV = "HARBINGER_CASCADE_PATH"
+
+# Prefilter hit rules: {"key": k} is a hit when result[k] is truthy, {"key": k, "min": x} when result[k] >= x.
+# Stages run unconditionally when any prefilter named in "when" hits; otherwise only when sampled at
+# "sample_rate" and while the message's "sampled_budget" covers their "cost".
+DEFAULT_POLICY: Dict[str, Any] = {
+    "prefilters": {
+        "injection_detector": {"hit": {"key": "indicators"}},
+        "trigger_engine": {"hit": {"key": "triggered"}},
+        "psyop_scorer": {"hit": {"key": "score", "min": 0.2}},
+    },
+    "stages": {
+        "machiavellian_delta_report": {
+            "cost": 4,
+            "when": ["injection_detector", "trigger_engine", "psyop_scorer"],
+            "sample_rate": 0.02,
+        },
+        "ghost_autopsy": {"cost": 8, "when": ["injection_detector", "trigger_engine"], "sample_rate": 0.01},
+        "epistemic_narrowing_report": {"cost": 2, "when": ["psyop_scorer"], "sample_rate": 0.05},
+    },
+    "sampled_budget": 8,
+    "tenants": {},
+}
+
+_TEXT_FIELDS = ("text", "internal_trace", "external_output")
+
+
+def _pair(message: Dict[str, Any]) -> Optional[tuple]:
+    internal, external = message.get("internal_trace"), message.get("external_output")
+    return (internal, external) if internal and external else None
+
+
+def _history(message: Dict[str, Any]) -> Optional[tuple]:
+    history = message.get("history")
+    return (history, None, message.get("user_id")) if history else None
+
+
+# registry name -> builds the stage's arguments from a message (None when its inputs are missing)
+_STAGE_INPUTS: Dict[str, Callable[[Dict[str, Any]], Optional[tuple]]] = {
+    "machiavellian_delta_report": _pair,
+    "ghost_autopsy": _pair,
+    "epistemic_narrowing_report": _history,
+}
+
+_PREFILTERS = ("injection_detector", "trigger_engine", "psyop_scorer")
+
+_NO_HIT_RESULTS: Dict[str, Dict[str, Any]] = {
+    "injection_detector": {"detected": False, "confidence": 0.0, "indicators": [], "obfuscation": []},
+    "trigger_engine": {"triggered": False, "triggers": [], "risk_score": 0.0, "verdict": "monitor"},
+    "psyop_scorer": {"score": 0.0, "psyop_hits": 0, "emotion_hits": 0, "authority_hits": 0},
+}
+
+
+_GATE_TERMS = tuple(sorted(set(INFLUENCE_TERMS) | set(TRIGGER_PHRASES)))
+
+
+def _gate(text: str) -> Tuple[bool, Optional[List[Tuple[str, str]]]]:
+    """Whether any prefilter could report a hit on ``text``, plus the candidate views if computed.
+
+    TriggerEngine and psyop_scorer match these terms against ``text.lower()``,
+    and injection_detector only scans its candidate views, so a closed gate
+    is lossless: the prefilters are only run when it passes. Substring
+    checks keep it much cheaper than running them. The views are returned
+    so injection_detector does not compute them a second time.
+    """
+    lowered = text.lower()
+    if any(term in lowered for term in _GATE_TERMS):
+        return True, None
+    views = candidate_views(text)
+    return bool(views), views
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_policy(path: Optional[str] = None) -> Dict[str, Any]:
+    """Return the default policy overlaid with the JSON file at ``path`` (or ``HARBINGER_CASCADE_PATH``)."""
+    path = path or os.environ.get(CASCADE_PATH_ENV)
+    policy = copy.deepcopy(DEFAULT_POLICY)
+    if not path:
+        return policy
+    with open(path, encoding="utf-8") as handle:
+        policy = _merge(policy, json.load(handle))
+    unknown = [name for name in policy["stages"] if name not in _STAGE_INPUTS]
+    unknown += [name for name in policy["prefilters"] if name not in _PREFILTERS]
+    if unknown:
+        raise ValueError(f"Unknown cascade stages: {unknown}")
+    return policy
+
+
+def _is_hit(result: Dict[str, Any], rule: Dict[str, Any]) -> bool:
+    value = result.get(rule["key"])
+    if "min" in rule:
+        return value is not None and float(value) >= float(rule["min"])
+    return bool(value)
+
+
+class Cascade:
+    """Runs prefilters on every message and expensive stages only when flagged or sampled.
+
+    A stage whose trigger prefilters hit always runs, so flagged traffic
+    keeps full recall. Unflagged messages run a stage only when sampled at
+    the stage's rate (overridable per tenant), and only while the sampled
+    work fits the message's cost budget. Per-stage counters are kept for
+    :meth:`stats`.
+    """
+
+    def __init__(self, policy: Optional[Dict[str, Any]] = None, rng: Optional[random.Random] = None):
+        self.policy = policy if policy is not None else load_policy()
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    def _empty_stats(self) -> Dict[str, Any]:
+        return {
+            "messages": 0,
+            "flagged": 0,
+            "gate_skips": 0,
+            "cost": 0,
+            "prefilters": {name: {"runs": 0, "hits": 0} for name in self.policy["prefilters"]},
+            "stages": {
+                name: {"runs": 0, "flagged": 0, "sampled": 0, "skipped": 0, "skipped_budget": 0, "skipped_input": 0,
+                       "errors": 0, "seconds": 0.0}
+                for name in self.policy["stages"]
+            },
+        }
+
+    def _tenant_policy(self, tenant: Optional[str]) -> Tuple[Dict[str, Dict[str, Any]], float]:
+        overrides = self.policy.get("tenants", {}).get(tenant) if tenant is not None else None
+        if not overrides:
+            return self.policy["stages"], self.policy["sampled_budget"]
+        stages = {}
+        for name, stage in self.policy["stages"].items():
+            stage = dict(stage)
+            if "sample_rate" in overrides:
+                stage["sample_rate"] = overrides["sample_rate"]
+            stage.update(overrides.get("stages", {}).get(name, {}))
+            stages[name] = stage
+        return stages, overrides.get("sampled_budget", self.policy["sampled_budget"])
+
+    def evaluate(self, message: Dict[str, Any], tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Run the cascade on one message.
+
+        ``message`` may carry ``text``, ``internal_trace``,
+        ``external_output``, ``history`` and ``user_id``. Returns the
+        prefilter results, which prefilters hit, the results of the stages
+        that ran and why each other stage was skipped.
+        """
+        tenant = tenant if tenant is not None else message.get("tenant")
+        text = "\n".join(str(message[field]) for field in _TEXT_FIELDS if message.get(field))
+        passes, views = _gate(text)
+        gated = not passes
+
+        prefilters: Dict[str, Any] = {}
+        hits: List[str] = []
+        for name, spec in self.policy["prefilters"].items():
+            if gated:
+                result = dict(_NO_HIT_RESULTS[name])
+            elif name == "injection_detector":
+                result = get_detector(name)(text, tenant, views=views)
+            else:
+                result = get_detector(name)(text)
+            prefilters[name] = result
+            if _is_hit(result, spec["hit"]):
+                hits.append(name)
+
+        stages, budget = self._tenant_policy(tenant)
+        results: Dict[str, Any] = {}
+        skipped: Dict[str, str] = {}
+        reasons: Dict[str, str] = {}
+        elapsed: Dict[str, float] = {}
+        errors: List[str] = []
+        cost = 0
+        planned: List[Tuple[str, bool]] = []
+        for name, stage in stages.items():
+            if any(hit in stage.get("when", ()) for hit in hits):
+                planned.append((name, True))
+            elif self._rng.random() < stage.get("sample_rate", 0.0):
+                planned.append((name, False))
+            else:
+                skipped[name] = "not_flagged"
+        # Flagged stages first: they are never subject to the sampled budget.
+        planned.sort(key=lambda item: not item[1])
+        spent = 0.0
+        for name, flagged in planned:
+            stage_cost = stages[name].get("cost", 1)
+            args = _STAGE_INPUTS[name](message)
+            if args is None:
+                skipped[name] = "missing_input"
+                continue
+            if not flagged and spent + stage_cost > budget:
+                skipped[name] = "budget"
+                continue
+            if not flagged:
+                spent += stage_cost
+            reasons[name] = "flagged" if flagged else "sampled"
+            started = time.perf_counter()
+            try:
+                results[name] = get_detector(name)(*args)
+            except Exception as exc:  # a failing stage must not drop the others
+                results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+                errors.append(name)
+            elapsed[name] = time.perf_counter() - started
+            cost += stage_cost
+
+        self._record(gated, prefilters, hits, reasons, skipped, errors, elapsed, cost)
+        return {
+            "flagged": bool(hits),
+            "hits": hits,
+            "prefilters": prefilters,
+            "stages": results,
+            "ran": reasons,
+            "skipped": skipped,
+            "cost": cost,
+        }
+
+    def _record(self, gated, prefilters, hits, reasons, skipped, errors, elapsed, cost) -> None:
+        with self._lock:
+            stats = self._stats
+            stats["messages"] += 1
+            stats["flagged"] += bool(hits)
+            stats["gate_skips"] += gated
+            stats["cost"] += cost
+            for name in prefilters:
+                counters = stats["prefilters"].setdefault(name, {"runs": 0, "hits": 0})
+                counters["runs"] += not gated
+                counters["hits"] += name in hits
+            for name, reason in reasons.items():
+                counters = stats["stages"][name]
+                counters["runs"] += 1
+                counters[reason] += 1
+                counters["seconds"] += elapsed[name]
+            for name, reason in skipped.items():
+                counters = stats["stages"][name]
+                counters["skipped"] += 1
+                if reason == "budget":
+                    counters["skipped_budget"] += 1
+                elif reason == "missing_input":
+                    counters["skipped_input"] += 1
+            for name in errors:
+                stats["stages"][name]["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Message, prefilter hit and per-stage run/skip counters since start or the last reset."""
+        with self._lock:
+            stats = copy.deepcopy(self._stats)
+        for counters in stats["stages"].values():
+            counters["seconds"] = round(counters["seconds"], 6)
+        messages = stats["messages"]
+        stats["cost_per_message"] = round(stats["cost"] / messages, 3) if messages else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = self._empty_stats()
+
+
+_default_cascade: Optional[Cascade] = None
+
+
+def get_cascade() -> Cascade:
+    global _default_cascade
+    if _default_cascade is None:
+        _default_cascade = Cascade()
+    return _default_cascade
+
+
+@instrument("cascade", verdict_key="flagged")
+def evaluate(message: Dict[str, Any], tenant: Optional[str] = None) -> Dict[str, Any]:
+    """Run the process-wide cascade (policy from ``HARBINGER_CASCADE_PATH``) on one message."""
+    return get_cascade().evaluate(message, tenant)
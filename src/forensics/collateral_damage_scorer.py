@@ -5,6 +5,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the vectorized API
+    np = None
+
 
 @dataclass(frozen=True)
 class CollateralDamageMetrics:
@@ -52,3 +57,249 @@ def summarize_metrics(metrics: CollateralDamageMetrics) -> Dict[str, float]:
         "recall": metrics.recall,
         "f1": metrics.f1,
     }
+
+
+@dataclass(frozen=True)
+class ThresholdCurves:
+    """Confusion counts and alert-quality metrics at every distinct threshold.
+
+    Entry ``i`` describes the detector alerting on ``score >= thresholds[i]``;
+    thresholds are in descending order.
+    """
+
+    thresholds: "np.ndarray"
+    true_positives: "np.ndarray"
+    false_positives: "np.ndarray"
+    false_negatives: "np.ndarray"
+    true_negatives: "np.ndarray"
+    precision: "np.ndarray"
+    recall: "np.ndarray"
+    f1: "np.ndarray"
+    false_positive_rate: "np.ndarray"
+
+    def at(self, threshold: float) -> CollateralDamageMetrics:
+        """Metrics for alerting on ``score >= threshold``."""
+        index = int(np.searchsorted(-self.thresholds, -threshold, side="right")) - 1
+        if index < 0:
+            return CollateralDamageMetrics(false_positive_rate=0.0, precision=0.0, recall=0.0, f1=0.0)
+        return CollateralDamageMetrics(
+            false_positive_rate=float(self.false_positive_rate[index]),
+            precision=float(self.precision[index]),
+            recall=float(self.recall[index]),
+            f1=float(self.f1[index]),
+        )
+
+    def auc(self) -> float:
+        """Area under the ROC curve."""
+        fpr = np.concatenate(([0.0], self.false_positive_rate))
+        tpr = np.concatenate(([0.0], self.recall))
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for the vectorized collateral damage API")
+
+
+def _vector_divide(numerator: "np.ndarray", denominator: "np.ndarray") -> "np.ndarray":
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def metrics_from_counts(
+    true_positives: "np.ndarray",
+    false_positives: "np.ndarray",
+    false_negatives: "np.ndarray",
+    true_negatives: "np.ndarray",
+) -> Dict[str, "np.ndarray"]:
+    """Vectorized precision/recall/F1/FPR over arrays of confusion counts.
+
+    Unlike :func:`compute_metrics`, the false positive rate here is the
+    standard ``FP / (FP + TN)``. Empty denominators yield ``0.0``.
+    """
+    _require_numpy()
+    precision = _vector_divide(true_positives, np.add(true_positives, false_positives))
+    recall = _vector_divide(true_positives, np.add(true_positives, false_negatives))
+    return {
+        "false_positive_rate": _vector_divide(false_positives, np.add(false_positives, true_negatives)),
+        "precision": precision,
+        "recall": recall,
+        "f1": _vector_divide(2 * precision * recall, precision + recall),
+    }
+
+
+def _curves_from_sorted(sorted_scores: "np.ndarray", sorted_labels: "np.ndarray") -> ThresholdCurves:
+    total_positives = int(sorted_labels.sum())
+    total_negatives = sorted_labels.size - total_positives
+    # Last index of each run of equal scores: the cut point for that threshold.
+    if sorted_scores.size:
+        cuts = np.flatnonzero(np.diff(sorted_scores, append=-np.inf) != 0)
+    else:
+        cuts = np.empty(0, dtype=np.int64)
+    true_positives = np.cumsum(sorted_labels, dtype=np.int64)[cuts]
+    false_positives = cuts + 1 - true_positives
+    false_negatives = total_positives - true_positives
+    true_negatives = total_negatives - false_positives
+    metrics = metrics_from_counts(true_positives, false_positives, false_negatives, true_negatives)
+    return ThresholdCurves(
+        thresholds=sorted_scores[cuts],
+        true_positives=true_positives,
+        false_positives=false_positives,
+        false_negatives=false_negatives,
+        true_negatives=true_negatives,
+        **metrics,
+    )
+
+
+def compute_curves(scores: "np.ndarray", labels: "np.ndarray") -> ThresholdCurves:
+    """Compute full PR/ROC curves from scored events with one sort.
+
+    Args:
+        scores: Detector scores, higher meaning more suspicious.
+        labels: Ground truth, truthy for events that should alert.
+    """
+    _require_numpy()
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    labels = np.asarray(labels).astype(bool).ravel()
+    if scores.shape != labels.shape:
+        raise ValueError(f"scores and labels differ in length: {scores.size} != {labels.size}")
+    order = np.argsort(-scores, kind="stable")
+    return _curves_from_sorted(scores[order], labels[order])
+
+
+def compute_detector_curves(
+    scores: "np.ndarray",
+    labels: "np.ndarray",
+    detectors: "np.ndarray",
+) -> Dict[str, ThresholdCurves]:
+    """Compute curves for every detector in a mixed event stream.
+
+    Events are grouped with a single lexsort on ``(detector, -score)``
+    rather than one sort per detector.
+    """
+    _require_numpy()
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    labels = np.asarray(labels).astype(bool).ravel()
+    names, codes = np.unique(np.asarray(detectors).ravel(), return_inverse=True)
+    if not (scores.size == labels.size == codes.size):
+        raise ValueError("scores, labels and detectors must have the same length")
+    order = np.lexsort((-scores, codes))
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(names.size + 1))
+    sorted_scores = scores[order]
+    sorted_labels = labels[order]
+    return {
+        str(name): _curves_from_sorted(
+            sorted_scores[bounds[i]:bounds[i + 1]], sorted_labels[bounds[i]:bounds[i + 1]]
+        )
+        for i, name in enumerate(names)
+    }
+
+
+def compute_window_metrics(
+    scores: "np.ndarray",
+    labels: "np.ndarray",
+    timestamps: "np.ndarray",
+    threshold: float,
+    window: float,
+) -> Dict[str, "np.ndarray"]:
+    """Metrics at a fixed threshold for consecutive tumbling time windows.
+
+    Returns arrays indexed by window, starting at the earliest timestamp,
+    plus ``window_start`` and the raw confusion counts.
+    """
+    _require_numpy()
+    if window <= 0:
+        raise ValueError("window must be positive")
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    labels = np.asarray(labels).astype(bool).ravel()
+    timestamps = np.asarray(timestamps, dtype=np.float64).ravel()
+    if not (scores.size == labels.size == timestamps.size):
+        raise ValueError("scores, labels and timestamps must have the same length")
+    if not scores.size:
+        empty = np.empty(0)
+        return {"window_start": empty, **metrics_from_counts(empty, empty, empty, empty)}
+
+    origin = timestamps.min()
+    slots = ((timestamps - origin) // window).astype(np.int64)
+    # Confusion cell per event: 0=TN, 1=FN, 2=FP, 3=TP.
+    cells = 2 * (scores >= threshold) + labels
+    n_windows = int(slots.max()) + 1
+    counts = np.bincount(slots * 4 + cells, minlength=n_windows * 4).reshape(n_windows, 4)
+    true_negatives, false_negatives, false_positives, true_positives = counts.T
+    return {
+        "window_start": origin + window * np.arange(n_windows),
+        "true_positives": true_positives,
+        "false_positives": false_positives,
+        "false_negatives": false_negatives,
+        "true_negatives": true_negatives,
+        **metrics_from_counts(true_positives, false_positives, false_negatives, true_negatives),
+    }
+
+
+class SlidingWindowAccumulator:
+    """Streaming score histograms over a sliding window of fixed memory.
+
+    Scores in ``[low, high]`` are binned into ``bins`` buckets, split by
+    label, and kept per slot in a ring of ``slots`` sub-windows. Calling
+    :meth:`advance` retires the oldest slot, so the window always covers
+    the most recent ``slots`` intervals. Curves are evaluated at bin edges.
+    """
+
+    def __init__(self, bins: int = 1000, slots: int = 60, low: float = 0.0, high: float = 1.0):
+        _require_numpy()
+        if bins < 1 or slots < 1 or high <= low:
+            raise ValueError("bins and slots must be positive and high must exceed low")
+        self.bins = bins
+        self.slots = slots
+        self.low = low
+        self.high = high
+        # counts[slot, label, bin]
+        self._counts = np.zeros((slots, 2, bins), dtype=np.int64)
+        self._current = 0
+
+    def _bin(self, scores: "np.ndarray") -> "np.ndarray":
+        scaled = (scores - self.low) * (self.bins / (self.high - self.low))
+        return np.clip(scaled.astype(np.int64), 0, self.bins - 1)
+
+    def update(self, scores: "np.ndarray", labels: "np.ndarray") -> None:
+        """Add a batch of labeled scores to the current slot."""
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        labels = np.asarray(labels).astype(np.int64).ravel()
+        flat = np.bincount(labels * self.bins + self._bin(scores), minlength=2 * self.bins)
+        self._counts[self._current] += flat.reshape(2, self.bins)
+
+    def advance(self) -> None:
+        """Start a new slot, dropping the oldest one from the window."""
+        self._current = (self._current + 1) % self.slots
+        self._counts[self._current] = 0
+
+    def merge(self, other: "SlidingWindowAccumulator") -> None:
+        """Fold another accumulator's window (same binning) into this slot."""
+        if (other.bins, other.low, other.high) != (self.bins, self.low, self.high):
+            raise ValueError("cannot merge accumulators with different binning")
+        self._counts[self._current] += other._counts.sum(axis=0)
+
+    def histogram(self) -> "np.ndarray":
+        """Window totals as a ``(2, bins)`` array of negative/positive counts."""
+        return self._counts.sum(axis=0)
+
+    def curves(self) -> ThresholdCurves:
+        """PR/ROC curves over the window, thresholds at each bin's lower edge."""
+        negatives, positives = self.histogram()[:, ::-1]
+        true_positives = np.cumsum(positives)
+        false_positives = np.cumsum(negatives)
+        false_negatives = true_positives[-1] - true_positives
+        true_negatives = false_positives[-1] - false_positives
+        edges = self.low + (self.high - self.low) * np.arange(self.bins) / self.bins
+        return ThresholdCurves(
+            thresholds=edges[::-1],
+            true_positives=true_positives,
+            false_positives=false_positives,
+            false_negatives=false_negatives,
+            true_negatives=true_negatives,
+            **metrics_from_counts(true_positives, false_positives, false_negatives, true_negatives),
+        )
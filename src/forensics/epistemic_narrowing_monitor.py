@@ -1,15 +1,391 @@
-"""Epistemic narrowing monitor with token diversity heuristics."""
+#!/usr/bin/env python3
+"""
+Epistemic Narrowing Monitor
 
-def monitor(text: str) -> dict:
+Detects longitudinal reduction in viewpoint diversity and epistemic narrowing
+across AI interactions, identifying filter bubble formation and reinforcement loops.
+
+Implements the normative sovereignty monitoring described in H4RB1NG3R v0.05.
+monitor() is the single-text variant scoring token diversity and repetition.
+
+The report only depends on the markers seen so far and the last 20
+interactions, so NarrowingTracker produces it from a stream of interactions
+in bounded memory. The CLI reads the history from an argument, a file or
+stdin; a file holds a JSON array or JSON lines and is parsed item by item.
+
+Usage:
+    epistemic_narrowing_monitor.py <interaction_history_json> [baseline_diversity] [user_id]
+    epistemic_narrowing_monitor.py --history-file <path|-> [baseline_diversity] [user_id]
+"""
+
+import json
+import sys
+from typing import Dict, Iterable, List, Any, Optional, Set
+from collections import defaultdict, deque
+import hashlib
+
+from .metrics import instrument, track
+from .streaming import STDIN, iter_json_items, open_text
+
+DIVERSITY_WINDOW = 10
+REINFORCEMENT_WINDOW = 20
+
+# Simplified viewpoint detection (would be enhanced with NLP in production)
+DIVERSITY_MARKERS = {
+    'alternatives': ['alternatively', 'on the other hand', 'however', 'but', 'although', 'whereas'],
+    'uncertainty': ['might', 'could', 'perhaps', 'possibly', 'maybe', 'uncertain'],
+    'multiple_perspectives': ['some people', 'others believe', 'different views', 'various perspectives'],
+    'nuance': ['complex', 'nuanced', 'depends', 'context', 'varies'],
+    'absolutes': ['always', 'never', 'definitely', 'certainly', 'only', 'must', 'impossible']
+}
+
+# NarrowingTracker stores marker sets as bitmasks in this order.
+_MARKER_NAMES = [f"{category}:{keyword}" for category, keywords in DIVERSITY_MARKERS.items() for keyword in keywords]
+_MARKER_BITS = {name: 1 << index for index, name in enumerate(_MARKER_NAMES)}
+
+
+def extract_viewpoint_markers(text: str) -> Set[str]:
+    """
+    Extract markers indicating viewpoint diversity from text.
+    """
+    text_lower = text.lower()
+    found_markers = set()
+
+    for category, keywords in DIVERSITY_MARKERS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                found_markers.add(f"{category}:{keyword}")
+
+    return found_markers
+
+
+def _content(interaction: Dict[str, Any]) -> str:
+    return interaction.get('content', '') or interaction.get('text', '')
+
+
+def _themes(content: str) -> Set[str]:
+    # Simple keyword extraction (would use proper topic modeling in production)
+    return set(word.lower() for word in content.split() if len(word) > 4)
+
+
+def _diversity(all_markers: Set[str], recent_window: Iterable[Set[str]]) -> float:
+    # Count category diversity
+    categories = set(marker.split(':')[0] for marker in all_markers)
+    category_diversity = len(categories) / 5  # 5 categories max
+
+    # Count marker diversity within recent window
+    recent_markers = set()
+    for markers in recent_window:
+        recent_markers.update(markers)
+
+    marker_density = len(recent_markers) / 20  # Normalize to reasonable max
+
+    # Check for absolute language (reduces diversity)
+    absolute_count = len([m for m in recent_markers if 'absolutes:' in m])
+    absolute_penalty = min(absolute_count / 5, 0.3)
+
+    diversity_score = min((category_diversity * 0.5 + marker_density * 0.5) - absolute_penalty, 1.0)
+    return max(diversity_score, 0.0)
+
+
+def calculate_viewpoint_diversity(interaction_history: List[Dict[str, Any]]) -> float:
+    """
+    Calculate viewpoint diversity score from 0.0 (narrow) to 1.0 (diverse).
+    """
+    if not interaction_history:
+        return 0.5  # Neutral baseline
+
+    markers = [extract_viewpoint_markers(_content(interaction)) for interaction in interaction_history]
+    all_markers = set().union(*markers)
+    return _diversity(all_markers, markers[-DIVERSITY_WINDOW:])
+
+
+def detect_reinforcement_loops(interaction_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Detect self-reinforcing patterns in interactions.
+    """
+    recent_themes = [_themes(_content(interaction)) for interaction in interaction_history[-REINFORCEMENT_WINDOW:]]
+    return _reinforcement(recent_themes, len(interaction_history))
+
+
+def _reinforcement(recent_themes: List[Set[str]], interaction_count: int) -> Dict[str, Any]:
+    if interaction_count < 5:
+        return {'detected': False, 'confidence': 0.0}
+
+    # Track repeated themes
+    theme_counts = defaultdict(int)
+    for words in recent_themes:
+        for word in words:
+            theme_counts[word] += 1
+
+    # Find over-represented themes
+    avg_count = sum(theme_counts.values()) / len(theme_counts) if theme_counts else 0
+    reinforced_themes = {
+        theme: count for theme, count in theme_counts.items()
+        if count > avg_count * 2  # Appears more than 2x average
+    }
+
+    # Check for echo chamber pattern (same themes repeated without alternatives)
+    echo_score = 0
+    if len(recent_themes) >= 3:
+        for i in range(len(recent_themes) - 2):
+            overlap_1_2 = len(recent_themes[i] & recent_themes[i+1])
+            overlap_2_3 = len(recent_themes[i+1] & recent_themes[i+2])
+            if overlap_1_2 > 3 and overlap_2_3 > 3:
+                echo_score += 1
+
+    echo_ratio = echo_score / max(len(recent_themes) - 2, 1)
+
+    loop_detected = len(reinforced_themes) > 3 or echo_ratio > 0.5
+    confidence = min((len(reinforced_themes) / 10 + echo_ratio) / 2, 1.0)
+
+    return {
+        'detected': loop_detected,
+        'confidence': confidence,
+        'reinforced_themes': list(reinforced_themes.keys())[:10],
+        'echo_ratio': echo_ratio,
+        'pattern': 'echo_chamber' if echo_ratio > 0.5 else 'theme_reinforcement' if len(reinforced_themes) > 3 else 'normal'
+    }
+
+
+def calculate_epistemic_drift(baseline: Dict[str, Any], current: Dict[str, Any]) -> float:
+    """
+    Calculate drift in epistemic diversity from baseline to current state.
+    """
+    baseline_diversity = baseline.get('diversity_score', 0.5)
+    current_diversity = current.get('diversity_score', 0.5)
+
+    drift = baseline_diversity - current_diversity
+    return drift
+
+
+@instrument('epistemic_narrowing_report', verdict_key='severity')
+def monitor_epistemic_narrowing(
+    interaction_history: List[Dict[str, Any]],
+    baseline_diversity: float = None,
+    user_id: str = None
+) -> Dict[str, Any]:
+    """
+    Main monitoring function for epistemic narrowing.
+
+    Args:
+        interaction_history: List of interaction dictionaries
+        baseline_diversity: Optional baseline diversity score
+        user_id: Optional user identifier
+
+    Returns:
+        Dictionary containing narrowing analysis and recommendations
+    """
+    if not interaction_history:
+        return {
+            'error': 'No interaction history provided',
+            'narrowing_detected': False
+        }
+
+    # Calculate current diversity
+    current_diversity = calculate_viewpoint_diversity(interaction_history)
+
+    # Detect reinforcement loops
+    reinforcement = detect_reinforcement_loops(interaction_history)
+
+    return _narrowing_report(
+        current_diversity, reinforcement, len(interaction_history), baseline_diversity, user_id
+    )
+
+
+def _narrowing_report(
+    current_diversity: float,
+    reinforcement: Dict[str, Any],
+    interaction_count: int,
+    baseline_diversity: Optional[float],
+    user_id: Optional[str],
+) -> Dict[str, Any]:
+    # Calculate drift if baseline provided
+    drift = 0.0
+    if baseline_diversity is not None:
+        drift = baseline_diversity - current_diversity
+
+    # Determine narrowing severity
+    narrowing_score = (1.0 - current_diversity) * 0.5 + reinforcement['confidence'] * 0.5
+
+    if narrowing_score >= 0.7:
+        severity = "CRITICAL"
+        interpretation = "Severe epistemic narrowing detected - significant viewpoint collapse"
+    elif narrowing_score >= 0.5:
+        severity = "HIGH"
+        interpretation = "Substantial epistemic narrowing - filter bubble forming"
+    elif narrowing_score >= 0.3:
+        severity = "MEDIUM"
+        interpretation = "Moderate narrowing trend - early warning signs"
+    else:
+        severity = "LOW"
+        interpretation = "Healthy epistemic diversity maintained"
+
+    # Generate recommendations
+    recommendations = []
+    if narrowing_score >= 0.5:
+        recommendations.append("Introduce alternative perspectives")
+        recommendations.append("Challenge assumptions with counterexamples")
+    if reinforcement['detected']:
+        recommendations.append("Break reinforcement loop by introducing novel topics")
+    if drift > 0.3:
+        recommendations.append("Alert guardian to significant epistemic drift")
+
+    # Evidence span
+    evidence_span_id = hashlib.sha256(
+        f"{user_id}{interaction_count}{current_diversity}".encode()
+    ).hexdigest()[:16]
+
+    return {
+        'narrowing_detected': narrowing_score >= 0.3,
+        'narrowing_score': narrowing_score,
+        'severity': severity,
+        'interpretation': interpretation,
+        'metrics': {
+            'current_diversity': current_diversity,
+            'baseline_diversity': baseline_diversity,
+            'epistemic_drift': drift,
+            'interaction_count': interaction_count
+        },
+        'reinforcement_analysis': reinforcement,
+        'recommendations': recommendations,
+        'evidence_span_id': evidence_span_id,
+        'governance_recommendation': 'GATE' if severity == "CRITICAL" else 'WARN' if severity == "HIGH" else 'MONITOR'
+    }
+
+
+def _marker_names(bits: int) -> Set[str]:
+    return {name for index, name in enumerate(_MARKER_NAMES) if bits >> index & 1}
+
+
+class NarrowingTracker:
+    """Bounded-memory state for :func:`monitor_epistemic_narrowing` over a stream.
+
+    Feed interactions in order with :meth:`update`; :meth:`report` returns
+    what ``monitor_epistemic_narrowing`` would for the whole history, while
+    only the markers seen so far (as bitmasks) and the themes of the last
+    20 interactions are kept. :meth:`to_state` gives a JSON-able snapshot.
+    """
+
+    __slots__ = ('interaction_count', 'marker_bits', '_recent_markers', '_recent_themes')
+
+    def __init__(self):
+        self.interaction_count = 0
+        self.marker_bits = 0
+        self._recent_markers = deque(maxlen=DIVERSITY_WINDOW)
+        self._recent_themes = deque(maxlen=REINFORCEMENT_WINDOW)
+
+    @property
+    def markers(self) -> Set[str]:
+        return _marker_names(self.marker_bits)
+
+    def update(self, interaction: Dict[str, Any]) -> None:
+        content = _content(interaction)
+        bits = 0
+        for marker in extract_viewpoint_markers(content):
+            bits |= _MARKER_BITS[marker]
+        self.marker_bits |= bits
+        self._recent_markers.append(bits)
+        self._recent_themes.append(tuple(_themes(content)))
+        self.interaction_count += 1
+
+    def diversity(self) -> float:
+        if not self.interaction_count:
+            return 0.5  # Neutral baseline
+        return _diversity(self.markers, [_marker_names(bits) for bits in self._recent_markers])
+
+    def report(self, baseline_diversity: float = None, user_id: str = None) -> Dict[str, Any]:
+        if not self.interaction_count:
+            return {
+                'error': 'No interaction history provided',
+                'narrowing_detected': False
+            }
+        reinforcement = _reinforcement([set(themes) for themes in self._recent_themes], self.interaction_count)
+        return _narrowing_report(
+            self.diversity(), reinforcement, self.interaction_count, baseline_diversity, user_id
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'interaction_count': self.interaction_count,
+            'marker_bits': self.marker_bits,
+            'recent_markers': list(self._recent_markers),
+            'recent_themes': [list(themes) for themes in self._recent_themes],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'NarrowingTracker':
+        tracker = cls()
+        tracker.interaction_count = state['interaction_count']
+        tracker.marker_bits = state['marker_bits']
+        tracker._recent_markers.extend(state['recent_markers'])
+        tracker._recent_themes.extend(tuple(themes) for themes in state['recent_themes'])
+        return tracker
+
+
+def monitor_epistemic_narrowing_stream(
+    interactions: Iterable[Dict[str, Any]],
+    baseline_diversity: float = None,
+    user_id: str = None
+) -> Dict[str, Any]:
+    """Streaming form of :func:`monitor_epistemic_narrowing` for histories too large to hold in memory."""
+    with track('epistemic_narrowing_report') as call:
+        tracker = NarrowingTracker()
+        for interaction in interactions:
+            tracker.update(interaction)
+        result = tracker.report(baseline_diversity, user_id)
+        call.verdict = result.get('severity')
+    return result
+
+
+@instrument('epistemic_narrowing_monitor', verdict_key='narrowing_detected')
+def monitor(text: str) -> Dict[str, Any]:
+    """Score a single text for low token diversity and heavy repetition."""
     tokens = [t for t in text.lower().split() if t]
     if not tokens:
-        return {"token_diversity": 0.0, "repetition_ratio": 0.0, "narrowing_detected": False}
+        return {'token_diversity': 0.0, 'repetition_ratio': 0.0, 'narrowing_detected': False}
     unique = set(tokens)
     diversity = len(unique) / len(tokens)
     repetition_ratio = (len(tokens) - len(unique)) / len(tokens)
     narrowing = diversity < 0.4 or repetition_ratio > 0.35
     return {
-        "token_diversity": round(diversity, 3),
-        "repetition_ratio": round(repetition_ratio, 3),
-        "narrowing_detected": narrowing,
+        'token_diversity': round(diversity, 3),
+        'repetition_ratio': round(repetition_ratio, 3),
+        'narrowing_detected': narrowing,
     }
+
+
+def main():
+    """CLI interface for the Epistemic Narrowing Monitor."""
+    args = sys.argv[1:]
+    history_path = None
+    if args[:1] == ['--history-file'] and len(args) > 1:
+        history_path = args[1]
+        args = args[2:]
+    elif args:
+        history_json = args.pop(0)
+    else:
+        print(json.dumps({
+            'error': 'Usage: epistemic_narrowing_monitor.py <interaction_history_json | --history-file <path|->> '
+                     '[baseline_diversity] [user_id]'
+        }))
+        sys.exit(1)
+
+    baseline_diversity = float(args[0]) if len(args) > 0 else None
+    user_id = args[1] if len(args) > 1 else None
+
+    if history_path is None:
+        result = monitor_epistemic_narrowing(json.loads(history_json), baseline_diversity, user_id)
+    else:
+        try:
+            with open_text(history_path) as stream:
+                result = monitor_epistemic_narrowing_stream(iter_json_items(stream), baseline_diversity, user_id)
+        except (OSError, ValueError) as exc:
+            source = 'stdin' if history_path == STDIN else history_path
+            print(json.dumps({'error': f'Cannot read interaction history from {source}: {exc}'}))
+            sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
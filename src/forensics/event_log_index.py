@@ -0,0 +1,315 @@
+"""Indexed query engine for the promptforge event log.
+
+Builds a SQLite sidecar next to the append-only JSONL audit log holding the
+byte offset of every record, keyed by timestamp, evidence_span_id, action_id
+and tool name. Indexing is incremental: each refresh only parses the bytes
+appended since the previous one. Lookups and time-range scans seek straight
+to the matching records through an mmap instead of parsing every line.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_LOG_PATH = "src/promptforge/event_log.jsonl"
+
+# Indexed field -> record keys it is read from (top level first, then payload).
+_KEY_FIELDS = {
+    "evidence_span_id": ("evidence_span_id",),
+    "action_id": ("action_id",),
+    "tool": ("tool", "tool_name"),
+}
+
+_HEAD_BYTES = 4096
+_BATCH_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS records (
+    seq INTEGER PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    timestamp REAL
+);
+CREATE TABLE IF NOT EXISTS keys (field TEXT NOT NULL, value TEXT NOT NULL, seq INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS records_by_time ON records (timestamp);
+CREATE INDEX IF NOT EXISTS keys_by_value ON keys (field, value);
+"""
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Normalize a record timestamp to epoch seconds.
+
+    Accepts epoch seconds, epoch milliseconds (as emitted by ``Date.now()``)
+    and ISO-8601 strings. Naive ISO strings are treated as UTC.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                return _to_epoch(float(value))
+            except ValueError:
+                return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def _extract_keys(record: Dict[str, Any]) -> Tuple[Optional[float], List[Tuple[str, str]]]:
+    payload = record.get("payload")
+    sources = [record, payload] if isinstance(payload, dict) else [record]
+
+    timestamp = None
+    for source in sources:
+        timestamp = _to_epoch(source.get("timestamp"))
+        if timestamp is not None:
+            break
+
+    keys: List[Tuple[str, str]] = []
+    for field, names in _KEY_FIELDS.items():
+        for source in sources:
+            value = next((source[name] for name in names if source.get(name) is not None), None)
+            if value is not None:
+                keys.append((field, str(value)))
+                break
+    return timestamp, keys
+
+
+def _head_digest(mapped: mmap.mmap, indexed_bytes: int) -> str:
+    """Fingerprint the indexed prefix so a replaced log is detected."""
+    return hashlib.sha256(mapped[:min(indexed_bytes, _HEAD_BYTES)]).hexdigest()
+
+
+class EventLogIndex:
+    """Sidecar offset index over a JSONL event log."""
+
+    def __init__(self, log_path: str = DEFAULT_LOG_PATH, index_path: Optional[str] = None):
+        self.log_path = log_path
+        self.index_path = index_path or f"{log_path}.idx"
+        self._db = sqlite3.connect(self.index_path)
+        self._db.executescript(_SCHEMA)
+        self._log = None
+        self._map: Optional[mmap.mmap] = None
+
+    def close(self) -> None:
+        self._unmap()
+        self._db.close()
+
+    def __enter__(self) -> "EventLogIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # -- index maintenance -------------------------------------------------
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _reset(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM records")
+            self._db.execute("DELETE FROM keys")
+            self._db.execute("DELETE FROM meta")
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _mapped(self) -> Optional[mmap.mmap]:
+        """Map the log, remapping if it has grown since the last call."""
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if self._map is not None and len(self._map) == size:
+            return self._map
+        self._unmap()
+        if size == 0:
+            return None
+        self._log = open(self.log_path, "rb")
+        self._map = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def refresh(self) -> Dict[str, int]:
+        """Index records appended since the last refresh.
+
+        Only complete (newline-terminated) lines are indexed; a partially
+        written tail is picked up by the next refresh. If the log was
+        truncated or replaced, the index is rebuilt from scratch.
+        """
+        mapped = self._mapped()
+        if mapped is None:
+            self._reset()
+            return {"indexed_records": 0, "indexed_bytes": 0, "skipped_lines": 0}
+
+        indexed_bytes = int(self._meta("indexed_bytes") or 0)
+        if indexed_bytes > len(mapped) or self._meta("head_digest") != _head_digest(mapped, indexed_bytes):
+            self._reset()
+            indexed_bytes = 0
+
+        row = self._db.execute("SELECT COALESCE(MAX(seq), -1) FROM records").fetchone()
+        seq = row[0] + 1
+        added = skipped = 0
+        records: List[Tuple[int, int, int, Optional[float]]] = []
+        keys: List[Tuple[str, str, int]] = []
+        pos = indexed_bytes
+
+        while True:
+            end = mapped.find(b"\n", pos)
+            if end < 0:
+                break
+            line = mapped[pos:end]
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    timestamp, record_keys = _extract_keys(record)
+                    records.append((seq, pos, end - pos, timestamp))
+                    keys.extend((field, value, seq) for field, value in record_keys)
+                    seq += 1
+                    added += 1
+                else:
+                    skipped += 1
+            pos = end + 1
+            if len(records) >= _BATCH_SIZE:
+                self._flush(records, keys, pos, _head_digest(mapped, pos))
+
+        self._flush(records, keys, pos, _head_digest(mapped, pos))
+        return {"indexed_records": added, "indexed_bytes": pos, "skipped_lines": skipped}
+
+    def _flush(
+        self,
+        records: List[Tuple[int, int, int, Optional[float]]],
+        keys: List[Tuple[str, str, int]],
+        indexed_bytes: int,
+        head: str,
+    ) -> None:
+        with self._db:
+            self._db.executemany("INSERT INTO records VALUES (?, ?, ?, ?)", records)
+            self._db.executemany("INSERT INTO keys VALUES (?, ?, ?)", keys)
+            self._set_meta("indexed_bytes", indexed_bytes)
+            self._set_meta("head_digest", head)
+        records.clear()
+        keys.clear()
+
+    # -- queries -------------------------------------------------------------
+
+    def _read(self, rows: List[Tuple[int, int]]) -> Iterator[Dict[str, Any]]:
+        mapped = self._mapped()
+        if mapped is None:
+            return
+        for offset, length in rows:
+            yield json.loads(mapped[offset:offset + length])
+
+    def offsets(self, field: str, value: str) -> List[Tuple[int, int]]:
+        """Return ``(offset, length)`` of every record whose ``field`` equals ``value``."""
+        if field not in _KEY_FIELDS:
+            raise ValueError(f"Unknown index field: {field} (expected one of {sorted(_KEY_FIELDS)})")
+        return self._db.execute(
+            "SELECT r.offset, r.length FROM keys k JOIN records r ON r.seq = k.seq "
+            "WHERE k.field = ? AND k.value = ? ORDER BY r.seq",
+            (field, str(value)),
+        ).fetchall()
+
+    def lookup(self, field: str, value: str) -> List[Dict[str, Any]]:
+        """Return every record whose ``field`` equals ``value``, in log order."""
+        return list(self._read(self.offsets(field, value)))
+
+    def time_range(self, start: Any = None, end: Any = None) -> Iterator[Dict[str, Any]]:
+        """Yield records with ``start <= timestamp < end``, ordered by timestamp.
+
+        Bounds accept epoch seconds/milliseconds or ISO-8601 strings; ``None``
+        leaves that side open.
+        """
+        clauses = ["timestamp IS NOT NULL"]
+        params: List[float] = []
+        for bound, op in ((start, ">="), (end, "<")):
+            if bound is None:
+                continue
+            epoch = _to_epoch(bound)
+            if epoch is None:
+                raise ValueError(f"Unparseable time bound: {bound!r}")
+            clauses.append(f"timestamp {op} ?")
+            params.append(epoch)
+        cursor = self._db.execute(
+            f"SELECT offset, length FROM records WHERE {' AND '.join(clauses)} ORDER BY timestamp, seq",
+            params,
+        )
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            yield from self._read(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        count, first, last = self._db.execute(
+            "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM records"
+        ).fetchone()
+        return {
+            "log_path": self.log_path,
+            "index_path": self.index_path,
+            "records": count,
+            "indexed_bytes": int(self._meta("indexed_bytes") or 0),
+            "first_timestamp": first,
+            "last_timestamp": last,
+        }
+
+
+def main():
+    """CLI interface for the event log index."""
+    usage = {
+        'error': 'Usage: event_log_index.py <mode> [log_path] [args...]',
+        'modes': ['build', 'lookup <field> <value>', 'range <start> <end>', 'stats'],
+        'fields': sorted(_KEY_FIELDS),
+    }
+    if len(sys.argv) < 2:
+        print(json.dumps(usage))
+        sys.exit(1)
+
+    mode = sys.argv[1]
+    log_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_LOG_PATH
+    args = sys.argv[3:]
+    if mode not in ('build', 'lookup', 'range', 'stats') or (mode == 'lookup' and len(args) != 2):
+        print(json.dumps(usage))
+        sys.exit(1)
+
+    with EventLogIndex(log_path) as index:
+        refresh = index.refresh()
+        if mode == 'build':
+            result = {**refresh, **index.stats()}
+        elif mode == 'lookup':
+            result = {'field': args[0], 'value': args[1], 'records': index.lookup(args[0], args[1])}
+        elif mode == 'range':
+            start = args[0] if len(args) > 0 and args[0] != '-' else None
+            end = args[1] if len(args) > 1 and args[1] != '-' else None
+            result = {'start': start, 'end': end, 'records': list(index.time_range(start, end))}
+        else:
+            result = index.stats()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+"""Fleet-wide theme frequencies in fixed memory.
+
+:func:`.epistemic_narrowing_monitor.detect_reinforcement_loops` counts
+themes per user. :class:`FleetThemes` aggregates them over the whole
+population: a count-min sketch estimates any theme's frequency, a
+Space-Saving summary keeps the heaviest themes, and per-cohort viewpoint
+diversity is tracked at two time scales to expose narrowing trends.
+
+Counts are exponentially time-decayed with forward decay: an observation at
+time ``t`` is added with weight ``2 ** ((t - landmark) / half_life)`` and
+every count is divided by the weight of "now" when read, so nothing has to
+be decayed on the write path. When weights grow large all counters are
+rescaled to a later landmark. Aggregators built in different worker
+processes with the same parameters are combined with :meth:`FleetThemes.merge`
+or shipped as :meth:`FleetThemes.to_state` dicts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .epistemic_narrowing_monitor import _content, _diversity, _themes, extract_viewpoint_markers
+
+
+DEFAULT_WIDTH = 2048
+DEFAULT_DEPTH = 4
+DEFAULT_TOP_K = 128
+DEFAULT_COHORT_TOP_K = 16
+DEFAULT_MAX_COHORTS = 64
+DEFAULT_HALF_LIFE = 24 * 3600.0
+# Share of the population's theme mass above which a theme is reported as reinforced.
+REINFORCED_SHARE = 0.01
+# Recent diversity this far below the long-run level counts as a narrowing cohort.
+NARROWING_DROP = 0.1
+# The recent-diversity average decays this many times faster than the long-run one.
+TREND_SPEEDUP = 4.0
+OTHER_COHORT = "other"
+
+# Rescale once the fast weights reach 2 ** _MAX_EXPONENT (far below float overflow).
+_MAX_EXPONENT = 64.0
+_HASH_KEY = b"harbinger-fleet-themes"
+
+
+def _hash_pair(key: str) -> Tuple[int, int]:
+    # Stable across processes (unlike hash()), so sketches from different workers line up.
+    digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8, key=_HASH_KEY).digest(), "little")
+    return digest & 0xFFFFFFFF, (digest >> 32) | 1
+
+
+class CountMinSketch:
+    """Conservative-update count-min sketch over string keys.
+
+    Estimates never undercount; with ``width`` w and ``depth`` d they
+    overcount by at most ``e / w`` of the total weight with probability
+    ``1 - exp(-d)``. Merging two sketches adds their counters.
+    """
+
+    __slots__ = ("width", "depth", "rows")
+
+    def __init__(self, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+
+    def _columns(self, key: str) -> List[int]:
+        first, step = _hash_pair(key)
+        return [(first + row * step) % self.width for row in range(self.depth)]
+
+    def add(self, key: str, weight: float = 1.0) -> float:
+        """Add ``weight`` to ``key`` and return its new estimate."""
+        columns = self._columns(key)
+        rows = self.rows
+        estimate = min(rows[row][column] for row, column in enumerate(columns)) + weight
+        for row, column in enumerate(columns):
+            if rows[row][column] < estimate:
+                rows[row][column] = estimate
+        return estimate
+
+    def estimate(self, key: str) -> float:
+        return min(self.rows[row][column] for row, column in enumerate(self._columns(key)))
+
+    def scale(self, factor: float) -> None:
+        for index, row in enumerate(self.rows):
+            self.rows[index] = array("d", (value * factor for value in row))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different shapes")
+        for row, other_row in zip(self.rows, other.rows):
+            for column, value in enumerate(other_row):
+                if value:
+                    row[column] += value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"width": self.width, "depth": self.depth, "rows": [row.tolist() for row in self.rows]}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(state["width"], state["depth"])
+        sketch.rows = [array("d", row) for row in state["rows"]]
+        return sketch
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters: at most ``capacity`` keys with counts and error bounds.
+
+    A new key evicts the smallest counter and inherits its count as error,
+    so ``count - error <= true count <= count``. Any key whose true weight
+    exceeds ``total / capacity`` is guaranteed to be present. The minimum is
+    found through a lazily invalidated heap, which is rebuilt when stale
+    entries pile up.
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "_heap")
+
+    def __init__(self, capacity: int = DEFAULT_TOP_K):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+        self.errors: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def _rebuild(self) -> None:
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, float]:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def minimum(self) -> float:
+        """Smallest tracked count once full (the most an untracked key can have), else 0."""
+        if len(self.counts) < self.capacity:
+            return 0.0
+        while self._heap and self.counts.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+
+    def add(self, key: str, weight: float = 1.0) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0.0
+        else:
+            evicted, floor = self._pop_min()
+            del counts[evicted], self.errors[evicted]
+            counts[key] = floor + weight
+            self.errors[key] = floor
+        heapq.heappush(self._heap, (counts[key], key))
+        if len(self._heap) > 4 * self.capacity + 64:
+            self._rebuild()
+
+    def scale(self, factor: float) -> None:
+        for key in self.counts:
+            self.counts[key] *= factor
+            self.errors[key] *= factor
+        self._rebuild()
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """Combine with a summary of another stream (Agarwal et al. mergeable summaries)."""
+        own_floor, other_floor = self.minimum(), other.minimum()
+        counts: Dict[str, float] = {}
+        errors: Dict[str, float] = {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, own_floor) + other.counts.get(key, other_floor)
+            errors[key] = self.errors.get(key, own_floor) + other.errors.get(key, other_floor)
+        kept = heapq.nlargest(max(self.capacity, other.capacity), counts, key=counts.__getitem__)
+        self.capacity = max(self.capacity, other.capacity)
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self._rebuild()
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, float, float]]:
+        """``(key, count, error)`` triples, heaviest first."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(key, count, self.errors[key]) for key, count in ranked[:limit]]
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "counts": dict(self.counts), "errors": dict(self.errors)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SpaceSaving":
+        summary = cls(state["capacity"])
+        summary.counts = dict(state["counts"])
+        summary.errors = dict(state["errors"])
+        summary._rebuild()
+        return summary
+
+
+class _Cohort:
+    """Forward-decayed interaction weight, diversity sums and top themes of one cohort."""
+
+    __slots__ = ("weight", "diversity", "recent_weight", "recent_diversity", "themes")
+
+    def __init__(self, top_k: int):
+        self.weight = 0.0
+        self.diversity = 0.0
+        self.recent_weight = 0.0
+        self.recent_diversity = 0.0
+        self.themes = SpaceSaving(top_k)
+
+    def scale(self, factor: float, recent_factor: float) -> None:
+        self.weight *= factor
+        self.diversity *= factor
+        self.recent_weight *= recent_factor
+        self.recent_diversity *= recent_factor
+        self.themes.scale(factor)
+
+    def merge(self, other: "_Cohort") -> None:
+        self.weight += other.weight
+        self.diversity += other.diversity
+        self.recent_weight += other.recent_weight
+        self.recent_diversity += other.recent_diversity
+        self.themes.merge(other.themes)
+
+    def to_state(self) -> Dict[str, Any]:
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["themes"] = self.themes.to_state()
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "_Cohort":
+        cohort = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(cohort, name, state[name])
+        cohort.themes = SpaceSaving.from_state(state["themes"])
+        return cohort
+
+
+class FleetThemes:
+    """Population-wide theme heavy hitters and per-cohort narrowing trends in fixed memory.
+
+    Memory is bounded by the sketch (``width * depth`` counters), the
+    ``top_k`` heavy hitters and at most ``max_cohorts`` named cohorts of
+    ``cohort_top_k`` themes each; further cohorts, and interactions without
+    one, are pooled under ``"other"``. Counts decay with ``half_life`` seconds; the recent
+    diversity average used for trends decays ``TREND_SPEEDUP`` times faster.
+    """
+
+    def __init__(
+        self,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+        top_k: int = DEFAULT_TOP_K,
+        half_life: float = DEFAULT_HALF_LIFE,
+        max_cohorts: int = DEFAULT_MAX_COHORTS,
+        cohort_top_k: int = DEFAULT_COHORT_TOP_K,
+        landmark: Optional[float] = None,
+    ):
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.half_life = float(half_life)
+        self.max_cohorts = max_cohorts
+        self.cohort_top_k = cohort_top_k
+        self.landmark = time.time() if landmark is None else float(landmark)
+        self.sketch = CountMinSketch(width, depth)
+        self.heavy = SpaceSaving(top_k)
+        self.theme_weight = 0.0
+        self.interactions = 0.0
+        self.cohorts: Dict[str, _Cohort] = {}
+
+    def _exponent(self, timestamp: float) -> float:
+        return (timestamp - self.landmark) / self.half_life
+
+    def _rescale(self, landmark: float) -> None:
+        shift = (landmark - self.landmark) / self.half_life
+        factor, recent_factor = 2.0 ** -shift, 2.0 ** (-shift * TREND_SPEEDUP)
+        self.sketch.scale(factor)
+        self.heavy.scale(factor)
+        self.theme_weight *= factor
+        self.interactions *= factor
+        for cohort in self.cohorts.values():
+            cohort.scale(factor, recent_factor)
+        self.landmark = landmark
+
+    def _weights(self, timestamp: float) -> Tuple[float, float]:
+        exponent = self._exponent(timestamp)
+        if exponent * TREND_SPEEDUP > _MAX_EXPONENT:
+            self._rescale(timestamp)
+            exponent = 0.0
+        return 2.0 ** exponent, 2.0 ** (exponent * TREND_SPEEDUP)
+
+    def _cohort(self, name: str) -> _Cohort:
+        cohort = self.cohorts.get(name)
+        if cohort is None:
+            if len(self.cohorts) >= self.max_cohorts and name != OTHER_COHORT:
+                return self._cohort(OTHER_COHORT)
+            cohort = self.cohorts[name] = _Cohort(self.cohort_top_k)
+        return cohort
+
+    def observe(self, interaction: Dict[str, Any], cohort: Optional[str] = None,
+                timestamp: Optional[float] = None) -> None:
+        """Count one interaction's themes (see ``detect_reinforcement_loops``) and viewpoint diversity."""
+        timestamp = time.time() if timestamp is None else timestamp
+        weight, recent_weight = self._weights(timestamp)
+        content = _content(interaction)
+        themes = _themes(content)
+        for theme in themes:
+            self.sketch.add(theme, weight)
+            self.heavy.add(theme, weight)
+        self.theme_weight += weight * len(themes)
+        self.interactions += weight
+
+        markers = extract_viewpoint_markers(content)
+        diversity = _diversity(markers, [markers])
+        stats = self._cohort(cohort if cohort is not None else OTHER_COHORT)
+        stats.weight += weight
+        stats.diversity += weight * diversity
+        stats.recent_weight += recent_weight
+        stats.recent_diversity += recent_weight * diversity
+        for theme in themes:
+            stats.themes.add(theme, weight)
+
+    def observe_many(self, interactions: Iterable[Dict[str, Any]], cohort: Optional[str] = None,
+                     timestamp: Optional[float] = None) -> None:
+        for interaction in interactions:
+            self.observe(interaction, cohort, timestamp)
+
+    def estimate(self, theme: str, now: Optional[float] = None) -> float:
+        """Decayed frequency of ``theme`` (an upper bound, see :class:`CountMinSketch`)."""
+        return self.sketch.estimate(theme.lower()) * self._decay(now)[0]
+
+    def _decay(self, now: Optional[float]) -> Tuple[float, float]:
+        """Factors turning stored weights into counts at ``now``, for the long-run and recent averages.
+
+        The landmark only moves on ``observe``, so ``now`` may be arbitrarily
+        many half-lives past it: negative powers just underflow to zero,
+        where ``2 ** exponent`` would overflow.
+        """
+        exponent = max(self._exponent(time.time() if now is None else now), -_MAX_EXPONENT)
+        return 2.0 ** -exponent, 2.0 ** (-exponent * TREND_SPEEDUP)
+
+    def report(self, now: Optional[float] = None, limit: int = 20,
+               min_share: float = REINFORCED_SHARE) -> Dict[str, Any]:
+        """Heaviest themes, themes above ``min_share`` of all theme mass, and cohort trends at ``now``."""
+        now = time.time() if now is None else now
+        decay, recent_decay = self._decay(now)
+        total = self.theme_weight
+
+        themes = []
+        for theme, count, error in self.heavy.top(limit):
+            count = min(count, self.sketch.estimate(theme))
+            themes.append({
+                "theme": theme,
+                "count": round(count * decay, 3),
+                "share": round(count / total, 4) if total else 0.0,
+                "error": round(error * decay, 3),
+            })
+
+        cohorts = {}
+        for name, cohort in sorted(self.cohorts.items()):
+            diversity = cohort.diversity / cohort.weight if cohort.weight else 0.5
+            recent = cohort.recent_diversity / cohort.recent_weight if cohort.recent_weight else diversity
+            trend = recent - diversity
+            cohorts[name] = {
+                "interactions": round(cohort.weight * decay, 3),
+                "recent_interactions": round(cohort.recent_weight * recent_decay, 3),
+                "diversity": round(diversity, 4),
+                "recent_diversity": round(recent, 4),
+                "trend": round(trend, 4),
+                "narrowing": trend <= -NARROWING_DROP,
+                "top_themes": [theme for theme, _, _ in cohort.themes.top(5)],
+            }
+
+        return {
+            "interactions": round(self.interactions * decay, 3),
+            "themes": themes,
+            "reinforced_themes": [entry["theme"] for entry in themes if entry["share"] >= min_share],
+            "cohorts": cohorts,
+            "narrowing_cohorts": [name for name, stats in cohorts.items() if stats["narrowing"]],
+            "half_life_seconds": self.half_life,
+        }
+
+    def merge(self, other: "FleetThemes") -> None:
+        """Fold another aggregator (e.g. from a worker process) into this one."""
+        if other.half_life != self.half_life:
+            raise ValueError("Cannot merge aggregators with different half-lives")
+        if other.landmark > self.landmark:
+            self._rescale(other.landmark)
+        elif other.landmark < self.landmark:
+            other = FleetThemes.from_state(other.to_state())
+            other._rescale(self.landmark)
+        self.sketch.merge(other.sketch)
+        self.heavy.merge(other.heavy)
+        self.theme_weight += other.theme_weight
+        self.interactions += other.interactions
+        for name, cohort in other.cohorts.items():
+            if name in self.cohorts:
+                self.cohorts[name].merge(cohort)
+            else:
+                self._cohort(name).merge(cohort)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "half_life": self.half_life,
+            "max_cohorts": self.max_cohorts,
+            "cohort_top_k": self.cohort_top_k,
+            "landmark": self.landmark,
+            "sketch": self.sketch.to_state(),
+            "heavy": self.heavy.to_state(),
+            "theme_weight": self.theme_weight,
+            "interactions": self.interactions,
+            "cohorts": {name: cohort.to_state() for name, cohort in self.cohorts.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "FleetThemes":
+        fleet = cls.__new__(cls)
+        fleet.half_life = state["half_life"]
+        fleet.max_cohorts = state["max_cohorts"]
+        fleet.cohort_top_k = state["cohort_top_k"]
+        fleet.landmark = state["landmark"]
+        fleet.sketch = CountMinSketch.from_state(state["sketch"])
+        fleet.heavy = SpaceSaving.from_state(state["heavy"])
+        fleet.theme_weight = state["theme_weight"]
+        fleet.interactions = state["interactions"]
+        fleet.cohorts = {name: _Cohort.from_state(cohort) for name, cohort in state["cohorts"].items()}
+        return fleet
+
+
+_default_fleet: Optional[FleetThemes] = None
+
+
+def get_fleet_themes() -> FleetThemes:
+    global _default_fleet
+    if _default_fleet is None:
+        _default_fleet = FleetThemes()
+    return _default_fleet
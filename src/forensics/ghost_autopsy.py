@@ -3,16 +3,307 @@
 from __future__ import annotations
 
 import re
-from typing import Dict
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .metrics import instrument
 
 
 _TOKEN_RE = re.compile(r"\b\w+\b")
 
+# Largest edit distance a single Myers pass may explore before the gap is
+# split on anchors instead (the search is O((N + M) * D)).
+_MYERS_MAX_COST = 256
+# Gaps longer than this (in combined tokens) are split on anchors first.
+_ANCHOR_THRESHOLD = 2048
+# Without unique anchors, tokens seen at most this often on both sides anchor instead.
+_RARE_COUNT = 2
+_SNIPPET_CHARS = 160
+
+_SPAN_TYPES = {"delete": "omitted", "insert": "inserted", "replace": "contradicting"}
+
+Opcode = Tuple[str, int, int, int, int]
+Tokens = Tuple[List[str], List[Tuple[int, int]]]
+
+
+def _tokenize_with_offsets(text: str) -> Tokens:
+    tokens: List[str] = []
+    offsets: List[Tuple[int, int]] = []
+    for match in _TOKEN_RE.finditer(text):
+        tokens.append(match.group().lower())
+        offsets.append(match.span())
+    return tokens, offsets
+
+
+def _intern(*sequences: Sequence[str]) -> List[List[int]]:
+    """Map tokens to small ints so comparisons are integer equality."""
+    table: Dict[str, int] = {}
+    return [[table.setdefault(token, len(table)) for token in sequence] for sequence in sequences]
+
+
+def _myers(a: List[int], b: List[int], a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+           max_cost: int) -> Optional[List[Opcode]]:
+    """Myers' O(ND) shortest edit script, or None if it costs more than ``max_cost``."""
+    n, m = a_hi - a_lo, b_hi - b_lo
+    max_d = min(n + m, max_cost)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, offset, n, m, a_lo, b_lo)
+    return None
+
+
+def _backtrack(trace: List[List[int]], offset: int, n: int, m: int, a_lo: int, b_lo: int) -> List[Opcode]:
+    ops: List[Opcode] = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[offset + prev_k]
+        prev_y = prev_x - prev_k
+        if x > prev_x and y > prev_y:
+            run = min(x - prev_x, y - prev_y)
+            ops.append(("equal", a_lo + x - run, a_lo + x, b_lo + y - run, b_lo + y))
+            x -= run
+            y -= run
+        if d > 0:
+            if x == prev_x:
+                ops.append(("insert", a_lo + x, a_lo + x, b_lo + y - 1, b_lo + y))
+            else:
+                ops.append(("delete", a_lo + x - 1, a_lo + x, b_lo + y, b_lo + y))
+        x, y = prev_x, prev_y
+    ops.reverse()
+    return ops
+
+
+def _anchors(a: List[int], b: List[int], a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+             max_count: int = 1) -> List[Tuple[int, int]]:
+    """Patience anchors, in increasing order on both sides.
+
+    Anchors are tokens occurring equally often, at most ``max_count`` times,
+    in both ranges; their occurrences are paired up in order.
+    """
+    count_a = Counter(a[a_lo:a_hi])
+    count_b = Counter(b[b_lo:b_hi])
+    positions_b: Dict[int, List[int]] = {}
+    for j in range(b_lo, b_hi):
+        count = count_b[b[j]]
+        if count <= max_count and count_a.get(b[j]) == count:
+            positions_b.setdefault(b[j], []).append(j)
+    seen: Counter = Counter()
+    pairs = []
+    for i in range(a_lo, a_hi):
+        positions = positions_b.get(a[i])
+        if positions is not None:
+            pairs.append((i, positions[seen[a[i]]]))
+            seen[a[i]] += 1
+    if not pairs:
+        return []
+
+    # Longest increasing subsequence on the b positions.
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        slot = bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+        previous[index] = tail_index[slot - 1] if slot else -1
+    chain = []
+    index = tail_index[-1]
+    while index >= 0:
+        chain.append(pairs[index])
+        index = previous[index]
+    chain.reverse()
+    return chain
+
+
+def _diff(a: List[int], b: List[int], deadline: float, max_cost: int) -> Tuple[List[Opcode], Dict[str, int]]:
+    """Align two interned token sequences into difflib-style opcodes."""
+    ops: List[Opcode] = []
+    stats = {"myers": 0, "anchored": 0, "chunked": 0, "fallback": 0}
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        start_a, start_b = a_lo, b_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        if a_lo > start_a:
+            ops.append(("equal", start_a, a_lo, start_b, b_lo))
+        end_a, end_b = a_hi, b_hi
+        while a_hi > a_lo and b_hi > b_lo and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+        if a_hi < end_a:
+            ops.append(("equal", a_hi, end_a, b_hi, end_b))
+
+        if a_lo == a_hi and b_lo == b_hi:
+            continue
+        if a_lo == a_hi:
+            ops.append(("insert", a_lo, a_hi, b_lo, b_hi))
+            continue
+        if b_lo == b_hi:
+            ops.append(("delete", a_lo, a_hi, b_lo, b_hi))
+            continue
+        if time.perf_counter() > deadline:
+            stats["fallback"] += 1
+            ops.append(("replace", a_lo, a_hi, b_lo, b_hi))
+            continue
 
-def _tokenize(text: str) -> list[str]:
-    return [token.lower() for token in _TOKEN_RE.findall(text)]
+        small = (a_hi - a_lo) + (b_hi - b_lo) <= _ANCHOR_THRESHOLD
+        if small:
+            script = _myers(a, b, a_lo, a_hi, b_lo, b_hi, max_cost)
+            if script is not None:
+                stats["myers"] += 1
+                ops.extend(script)
+                continue
 
+        anchors = _anchors(a, b, a_lo, a_hi, b_lo, b_hi) or _anchors(a, b, a_lo, a_hi, b_lo, b_hi, _RARE_COUNT)
+        if anchors:
+            stats["anchored"] += 1
+            prev_a, prev_b = a_lo, b_lo
+            for i, j in anchors:
+                ops.append(("equal", i, i + 1, j, j + 1))
+                stack.append((prev_a, i, prev_b, j))
+                prev_a, prev_b = i + 1, j + 1
+            stack.append((prev_a, a_hi, prev_b, b_hi))
+            continue
 
+        if not small:
+            # No usable anchors (a long trace over a common vocabulary): cut both
+            # sides into proportional pieces small enough for Myers, so only the
+            # pieces that still fail become coarse replaces.
+            stats["chunked"] += 1
+            pieces = -(-((a_hi - a_lo) + (b_hi - b_lo)) // (_ANCHOR_THRESHOLD // 2))
+            cuts_a = [a_lo + (a_hi - a_lo) * piece // pieces for piece in range(pieces + 1)]
+            cuts_b = [b_lo + (b_hi - b_lo) * piece // pieces for piece in range(pieces + 1)]
+            stack.extend(zip(cuts_a, cuts_a[1:], cuts_b, cuts_b[1:]))
+            continue
+
+        stats["fallback"] += 1
+        ops.append(("replace", a_lo, a_hi, b_lo, b_hi))
+
+    return _merge(ops), stats
+
+
+def _merge(ops: List[Opcode]) -> List[Opcode]:
+    """Sort opcodes, coalesce runs, and fuse adjacent deletes/inserts into replaces."""
+    merged: List[Opcode] = []
+    ops = sorted((op for op in ops if op[1] < op[2] or op[3] < op[4]), key=lambda op: (op[1], op[3], op[2], op[4]))
+    for tag, i1, i2, j1, j2 in ops:
+        if merged:
+            last_tag, li1, li2, lj1, lj2 = merged[-1]
+            if li2 == i1 and lj2 == j1 and (last_tag == tag or (last_tag != "equal" and tag != "equal")):
+                merged[-1] = (tag if last_tag == tag else "replace", li1, i2, lj1, j2)
+                continue
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def align_traces(
+    internal_trace: str,
+    external_output: str,
+    time_budget: float = 0.5,
+    max_cost: int = _MYERS_MAX_COST,
+    max_spans: int = 500,
+) -> Dict[str, object]:
+    """Token-level alignment of internal reasoning against external output.
+
+    Tokens are interned to ints; long inputs are split on patience anchors
+    (tokens unique on both sides, else tokens rare on both sides) and the
+    gaps aligned with Myers' diff under an edit-cost budget. Long gaps
+    without anchors are cut into proportional pieces first. Gaps that
+    exceed the cost or the overall ``time_budget`` are reported as coarse
+    ``contradicting`` blocks.
+
+    Spans are ``omitted`` (internal only), ``inserted`` (output only) or
+    ``contradicting`` (both sides differ), with token and character offsets.
+    """
+    return _align(
+        internal_trace, external_output, _tokenize_with_offsets(internal_trace),
+        _tokenize_with_offsets(external_output), time_budget, max_cost, max_spans,
+    )
+
+
+def _align(
+    internal_trace: str,
+    external_output: str,
+    internal: Tokens,
+    external: Tokens,
+    time_budget: float = 0.5,
+    max_cost: int = _MYERS_MAX_COST,
+    max_spans: int = 500,
+) -> Dict[str, object]:
+    internal_tokens, internal_offsets = internal
+    external_tokens, external_offsets = external
+    a, b = _intern(internal_tokens, external_tokens)
+    ops, stats = _diff(a, b, time.perf_counter() + time_budget, max_cost)
+
+    def char_range(offsets: List[Tuple[int, int]], start: int, end: int, text: str) -> Tuple[int, int]:
+        if start < end:
+            return offsets[start][0], offsets[end - 1][1]
+        position = offsets[start][0] if start < len(offsets) else len(text)
+        return position, position
+
+    spans: List[Dict[str, object]] = []
+    matched = 0
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == "equal":
+            matched += i2 - i1
+            continue
+        if len(spans) >= max_spans:
+            continue
+        internal_chars = char_range(internal_offsets, i1, i2, internal_trace)
+        external_chars = char_range(external_offsets, j1, j2, external_output)
+        spans.append({
+            "type": _SPAN_TYPES[tag],
+            "internal_start": i1,
+            "internal_end": i2,
+            "external_start": j1,
+            "external_end": j2,
+            "internal_chars": list(internal_chars),
+            "external_chars": list(external_chars),
+            "internal_text": internal_trace[internal_chars[0]:internal_chars[1]][:_SNIPPET_CHARS],
+            "external_text": external_output[external_chars[0]:external_chars[1]][:_SNIPPET_CHARS],
+        })
+
+    edits = sum(1 for op in ops if op[0] != "equal")
+    return {
+        "spans": spans,
+        "spans_truncated": edits > len(spans),
+        "matched_tokens": matched,
+        "internal_tokens": len(a),
+        "external_tokens": len(b),
+        "coverage": round(matched / max(len(a), 1), 3),
+        "method": next((name for name in ("fallback", "chunked", "anchored") if stats[name]), "myers"),
+    }
+
+
+@instrument("ghost_autopsy")
 def compare_traces(internal_trace: str, external_output: str) -> Dict[str, object]:
     """Compare traces and return a divergence summary."""
     if not internal_trace or not external_output:
@@ -23,10 +314,10 @@ def compare_traces(internal_trace: str, external_output: str) -> Dict[str, objec
             "notes": ["missing trace data"],
         }
 
-    internal_tokens = _tokenize(internal_trace)
-    external_tokens = _tokenize(external_output)
-    internal_set = set(internal_tokens)
-    external_set = set(external_tokens)
+    internal = _tokenize_with_offsets(internal_trace)
+    external = _tokenize_with_offsets(external_output)
+    internal_set = set(internal[0])
+    external_set = set(external[0])
 
     overlap = len(internal_set & external_set) / max(len(internal_set | external_set), 1)
     delta = abs(len(internal_trace) - len(external_output))
@@ -41,9 +332,14 @@ def compare_traces(internal_trace: str, external_output: str) -> Dict[str, objec
     if overlap < 0.2 or delta > 400:
         verdict = "divergent"
 
+    alignment = _align(internal_trace, external_output, internal, external)
+    spans = alignment.pop("spans")
+
     return {
         "delta": delta,
         "overlap": round(overlap, 3),
         "verdict": verdict,
         "notes": notes,
+        "spans": spans,
+        "alignment": alignment,
     }
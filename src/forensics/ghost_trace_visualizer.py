@@ -0,0 +1,263 @@
+
+"""
+Ghost Trace Visualizer
+Function: "True latent intent vs output" visualization
+
+Renders layers x tokens x features activation traces as a tiled, multi-resolution
+heatmap. Activations are read from a memory-mapped .npy in token chunks sized by
+a byte budget, reduced to per-(layer, token) min/max/mean, and downsampled by
+powers of two into a pyramid stored as on-disk .npy memmaps, so memory stays
+bounded by the budget rather than the trace length or width. Only the requested
+zoom levels are written out as PNG tiles plus a static HTML viewer.
+"""
+
+import html
+import json
+import math
+import os
+import struct
+import zlib
+
+import numpy as np
+
+STATS = ("min", "max", "mean")
+
+DEFAULT_MEMORY_BUDGET = 64 * 2 ** 20
+
+# Anchor colors for a viridis-like colormap, interpolated linearly.
+_COLORMAP = np.array([
+    [68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37],
+], dtype=np.float64)
+
+SPAN_COLORS = {
+    "inserted": (230, 57, 70),
+    "omitted": (69, 123, 157),
+    "contradicting": (255, 159, 28),
+}
+
+
+def _write_png(path, rgb):
+    """Write an (h, w, 3) uint8 array as a PNG using only zlib."""
+    height, width, _ = rgb.shape
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgb.reshape(height, width * 3)], axis=1)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    with open(path, "wb") as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        handle.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        handle.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        handle.write(chunk(b"IEND", b""))
+
+
+def _colorize(values, low, high):
+    scale = (high - low) or 1.0
+    position = np.clip((values - low) / scale, 0.0, 1.0) * (len(_COLORMAP) - 1)
+    index = np.minimum(position.astype(np.int64), len(_COLORMAP) - 2)
+    frac = (position - index)[..., None]
+    colors = _COLORMAP[index] * (1 - frac) + _COLORMAP[index + 1] * frac
+    colors[np.isnan(values)] = 0
+    return colors.astype(np.uint8)
+
+
+def _open_activations(activations):
+    """Accept a .npy path or array; return a (layers, tokens, features) view."""
+    if isinstance(activations, (str, os.PathLike)):
+        activations = np.load(activations, mmap_mode="r")
+    if activations.ndim == 2:
+        activations = activations[:, :, None]
+    if activations.ndim != 3:
+        raise ValueError(f"expected layers x tokens x features activations, got shape {activations.shape}")
+    if activations.size == 0:
+        raise ValueError(f"activations are empty, got shape {activations.shape}")
+    return activations
+
+
+def _downsample(base_min, base_max, base_mean, size):
+    """Reduce per-token (layers, width) stats into blocks of `size` tokens."""
+    starts = np.arange(0, base_mean.shape[1], size)
+    counts = np.minimum(size, base_mean.shape[1] - starts)
+    return (
+        np.minimum.reduceat(base_min, starts, axis=1),
+        np.maximum.reduceat(base_max, starts, axis=1),
+        np.add.reduceat(base_mean, starts, axis=1) / counts,
+    )
+
+
+def _reduced_chunks(activations, block, chunk_tokens, memory_budget):
+    """
+    Yield (start, (min, max, mean)) per-token stats in runs of whole `block`s.
+
+    Activations are read at most chunk_tokens at a time, and fewer when the
+    float32 chunk would exceed memory_budget bytes. The small per-token stats
+    are carried over between chunks, so a block may straddle a chunk boundary.
+    """
+    layers, tokens, features = activations.shape
+    step = max(1, min(chunk_tokens, memory_budget // (4 * layers * features)))
+    carried = None
+    emitted = 0
+    for start in range(0, tokens, step):
+        chunk = np.asarray(activations[:, start:start + step, :], dtype=np.float32)
+        base = chunk.min(axis=2), chunk.max(axis=2), chunk.mean(axis=2)
+        if carried is not None:
+            base = tuple(np.concatenate(pair, axis=1) for pair in zip(carried, base))
+        width = base[0].shape[1]
+        ready = width if start + step >= tokens else (width // block) * block
+        if ready:
+            yield emitted, tuple(stat[:, :ready] for stat in base)
+            emitted += ready
+        carried = tuple(stat[:, ready:] for stat in base)
+
+
+def build_pyramid(activations, out_dir, levels, chunk_tokens=4096, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Reduce activations to min/max/mean per (layer, token) and downsample along
+    tokens by 2**level for each requested level, one token chunk at a time.
+
+    Each level is stored as out_dir/level_<k>.npy with shape (3, layers, columns).
+    Returns {level: memmap} plus the global (low, high) range of the means.
+    """
+    activations = _open_activations(activations)
+    layers, tokens, _ = activations.shape
+    levels = sorted(set(int(level) for level in levels))
+    if not levels or levels[0] < 0:
+        raise ValueError(f"levels must be a non-empty set of non-negative integers, got {levels}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    pyramid = {
+        level: np.lib.format.open_memmap(
+            os.path.join(out_dir, f"level_{level}.npy"), mode="w+", dtype=np.float32,
+            shape=(len(STATS), layers, math.ceil(tokens / 2 ** level)),
+        )
+        for level in levels
+    }
+    low, high = math.inf, -math.inf
+    for start, base in _reduced_chunks(activations, 2 ** levels[-1], chunk_tokens, memory_budget):
+        low, high = min(low, float(base[2].min())), max(high, float(base[2].max()))
+        for level, target in pyramid.items():
+            reduced = _downsample(*base, 2 ** level)
+            column = start // 2 ** level
+            target[:, :, column:column + reduced[0].shape[1]] = np.stack(reduced)
+    for target in pyramid.values():
+        target.flush()
+    return pyramid, (low, high)
+
+
+def _span_ranges(divergence):
+    """Internal-trace token ranges from a ghost_autopsy.compare_traces result."""
+    spans = (divergence or {}).get("spans", [])
+    return [
+        (span["type"], int(span["internal_start"]), int(span["internal_end"]))
+        for span in spans
+        if span.get("internal_end", 0) > span.get("internal_start", 0)
+    ]
+
+
+def render_tiles(pyramid, value_range, out_dir, tokens, tile_columns=512, row_height=4, spans=()):
+    """
+    Write PNG tiles of the mean heatmap for each pyramid level.
+
+    Divergence spans are drawn as a colored band above the heatmap and a tint
+    over the covered columns. Returns the tile manifest.
+    """
+    low, high = value_range
+    band = 6
+    manifest = {}
+    for level, stats in pyramid.items():
+        layers, columns = stats.shape[1], stats.shape[2]
+        size = 2 ** level
+        tiles = []
+        for tile, first in enumerate(range(0, columns, tile_columns)):
+            last = min(first + tile_columns, columns)
+            image = np.zeros((band + layers * row_height, last - first, 3), dtype=np.uint8)
+            image[band:] = np.repeat(_colorize(np.asarray(stats[2, :, first:last]), low, high), row_height, axis=0)
+            for kind, span_start, span_end in spans:
+                left = max(span_start // size, first) - first
+                right = min((span_end - 1) // size + 1, last) - first
+                if right <= left:
+                    continue
+                color = np.array(SPAN_COLORS.get(kind, (255, 255, 255)), dtype=np.uint16)
+                image[:band, left:right] = color
+                region = image[band:, left:right].astype(np.uint16)
+                image[band:, left:right] = ((region * 3 + color) // 4).astype(np.uint8)
+            name = f"level_{level}_tile_{tile}.png"
+            _write_png(os.path.join(out_dir, name), image)
+            tiles.append({"file": name, "first_token": first * size, "last_token": min(last * size, tokens)})
+        manifest[level] = {"tokens_per_column": size, "columns": columns, "tiles": tiles}
+    return manifest
+
+
+def _write_viewer(path, tile_dir, shape, manifest, value_range, spans):
+    rel = os.path.relpath(tile_dir, os.path.dirname(os.path.abspath(path)))
+    sections = []
+    for level, info in sorted(manifest.items()):
+        images = "".join(
+            f'<img src="{html.escape(rel)}/{tile["file"]}" title="tokens {tile["first_token"]}-{tile["last_token"]}">'
+            for tile in info["tiles"]
+        )
+        sections.append(
+            f'<h2>Zoom level {level} ({info["tokens_per_column"]} tokens/column)</h2><div class="strip">{images}</div>'
+        )
+    legend = "".join(
+        f'<li style="color: rgb{SPAN_COLORS.get(kind, (255, 255, 255))}">{html.escape(kind)}: tokens {start}-{end}</li>'
+        for kind, start, end in spans
+    )
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Ghost Trace</title><style>"
+            "body{background:#111;color:#ddd;font-family:monospace}"
+            ".strip{overflow-x:auto;white-space:nowrap}.strip img{image-rendering:pixelated}"
+            "</style></head><body>"
+            f"<h1>Ghost Trace: {shape[0]} layers x {shape[1]} tokens x {shape[2]} features</h1>"
+            f"<p>mean activation range [{value_range[0]:.4g}, {value_range[1]:.4g}]</p>"
+            f"<ul>{legend}</ul>{''.join(sections)}</body></html>"
+        )
+
+
+def visualize_trace(trace_data, output_path="trace_vis.html", levels=(0, 4, 8), divergence=None,
+                    chunk_tokens=4096, tile_columns=512, row_height=4, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Render a tiled activation heatmap viewer.
+
+    trace_data: path to a layers x tokens x features .npy (memory-mapped) or an array.
+    divergence: optional ghost_autopsy.compare_traces() result; its spans are
+        highlighted on the internal-trace token axis.
+    Tiles, pyramid memmaps and manifest.json go to <output_stem>_tiles/.
+    Returns the manifest summary, including the viewer and tile paths.
+    """
+    activations = _open_activations(trace_data)
+    tile_dir = os.path.splitext(output_path)[0] + "_tiles"
+    pyramid, value_range = build_pyramid(activations, tile_dir, levels, chunk_tokens, memory_budget)
+    spans = _span_ranges(divergence)
+    manifest = render_tiles(pyramid, value_range, tile_dir, activations.shape[1], tile_columns, row_height, spans)
+    _write_viewer(output_path, tile_dir, activations.shape, manifest, value_range, spans)
+    summary = {
+        "viewer": output_path,
+        "tile_dir": tile_dir,
+        "shape": list(activations.shape),
+        "value_range": list(value_range),
+        "levels": {str(level): info for level, info in manifest.items()},
+        "spans": [{"type": kind, "internal_start": start, "internal_end": end} for kind, start, end in spans],
+    }
+    with open(os.path.join(tile_dir, "manifest.json"), "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2)
+    return summary
+
+
+def generate_heatmap(activations, max_columns=2048, chunk_tokens=4096, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Return a (3, layers, columns) min/max/mean heatmap no wider than max_columns,
+    computed in budget-sized token chunks from an array or memory-mapped .npy path.
+    """
+    activations = _open_activations(activations)
+    tokens = activations.shape[1]
+    level = max(0, math.ceil(math.log2(max(tokens / max_columns, 1))))
+    block = 2 ** level
+    heatmap = np.empty((len(STATS), activations.shape[0], math.ceil(tokens / block)), dtype=np.float32)
+    for start, base in _reduced_chunks(activations, block, chunk_tokens, memory_budget):
+        reduced = _downsample(*base, block)
+        column = start // block
+        heatmap[:, :, column:column + reduced[0].shape[1]] = np.stack(reduced)
+    return heatmap
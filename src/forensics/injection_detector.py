@@ -3,7 +3,11 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import instrument
+from .normalization import decoded_payloads, fold, rot13, rot13_fold
+from .thresholds import get_threshold
 
 
 _INJECTION_PATTERNS = [
@@ -25,30 +29,134 @@ _HIGH_RISK_MARKERS = [
 ]
 
 
-def detect(text: str) -> Dict[str, object]:
-    """Detect likely prompt-injection attempts.
+def _anchor(pattern: "re.Pattern[str]") -> Optional[str]:
+    """Longest literal every match of ``pattern`` must contain, or None if it has none."""
+    pieces = re.split(r"\([^()]*\)", pattern.pattern)
+    if any(re.escape(piece).replace("\\ ", " ") != piece for piece in pieces):  # regex syntax outside the groups
+        return None
+    anchor = max(pieces, key=len).lower()
+    return anchor or None
+
+
+_PATTERN_ANCHORS = tuple((pattern, _anchor(pattern)) for pattern in _INJECTION_PATTERNS)
+# Case-sensitive twins for searching lowercased text; patterns with uppercase syntax keep IGNORECASE.
+_LOWERCASE_PATTERNS = tuple(
+    re.compile(pattern.pattern) if pattern.pattern.islower() else pattern for pattern in _INJECTION_PATTERNS
+)
+# Substrings of which at least one must be present (lowercased) for any indicator to match.
+_ANCHORS = {anchor for _, anchor in _PATTERN_ANCHORS} | set(_HIGH_RISK_MARKERS)
+# A pattern without a required literal disables the shortcut: every view is then scanned in full.
+_ANCHORS = () if None in _ANCHORS else tuple(sorted(_ANCHORS))
+_ROT13_ANCHORS = tuple(rot13(anchor) for anchor in _ANCHORS)
+_FOLDED_ANCHORS = tuple(rot13_fold(anchor) for anchor in _ANCHORS)
+# str.translate is only fast on ASCII; non-ASCII text is searched for both anchor sets instead.
+_BOTH_ANCHORS = _ANCHORS + _ROT13_ANCHORS
+
+# The only characters for which IGNORECASE and lower() disagree about ASCII letters (İ, ı, ſ and the
+# Kelvin sign). Elsewhere lower() keeps positions, so a lowercase pattern searched in text.lower()
+# matches exactly when the IGNORECASE pattern matches text; views holding one use the regexes as is.
+_CASE_AMBIGUOUS = re.compile("[\u0130\u0131\u017f\u212a]")
+
+DETECTION_THRESHOLD = 0.4
+
+# Confidence added when a phrase only appears after decoding or folding.
+OBFUSCATION_WEIGHT = 0.2
+
+
+def _case_ambiguous(text: str) -> bool:
+    return not text.isascii() and _CASE_AMBIGUOUS.search(text) is not None
+
+
+def _holds(text: str, lowered: str, anchors: Tuple[str, ...]) -> bool:
+    """Whether ``text`` (``lowered`` is ``text.lower()``) may contain any of ``anchors`` under IGNORECASE."""
+    return not _ANCHORS or any(anchor in lowered for anchor in anchors) or _case_ambiguous(text)
+
+
+def _candidate(text: str) -> bool:
+    """Cheap check that ``text`` or its ROT13 could produce an indicator; False means neither can."""
+    if text.isascii() and _ANCHORS:
+        folded = rot13_fold(text.lower())
+        return any(anchor in folded for anchor in _FOLDED_ANCHORS)
+    return _holds(text, text.lower(), _BOTH_ANCHORS)
+
 
-    Returns a dict with a boolean, confidence score, and indicators.
+def _forms(label: str, text: str, folded: str) -> List[Tuple[str, str]]:
+    # Narrow a candidate down to the forms that actually hold an anchor.
+    lowered = text.lower()
+    lowered_folded = lowered if folded == text else folded.lower()
+    forms: List[Tuple[str, str]] = []
+    if _holds(text, lowered, _ANCHORS):
+        forms.append((label, text))
+    if folded != text and _holds(folded, lowered_folded, _ANCHORS):
+        forms.append(("unicode", folded))
+    if _holds(folded, lowered_folded, _ROT13_ANCHORS):
+        forms.append((f"{label}>rot13" if label != "plain" else "rot13", rot13(folded)))
+    return forms
+
+
+def candidate_views(text: str) -> List[Tuple[str, str]]:
+    """The labelled forms of ``text`` worth scanning: plain, Unicode-folded, ROT13 and decoded payloads.
+
+    Views that cannot contain an indicator are left out, so an empty list
+    means :func:`detect` would find nothing.
     """
-    if not text:
-        return {"detected": False, "confidence": 0.0, "indicators": []}
+    views: List[Tuple[str, str]] = []
+    folded = fold(text)
+    if _candidate(text) or (folded != text and _candidate(folded)):
+        views.extend(_forms("plain", text, folded))
+    for label, payload in decoded_payloads(folded):
+        if _candidate(payload):
+            views.extend(_forms(label, payload, payload))
+    return views
+
 
+def _indicators(text: str) -> List[str]:
     lowered = text.lower()
-    indicators: List[str] = []
+    if _case_ambiguous(text):
+        found = [pattern.pattern for pattern in _INJECTION_PATTERNS if pattern.search(text)]
+    else:
+        # Case-sensitive search of lower() is cheaper than IGNORECASE, and skipped where the anchor is absent.
+        found = [
+            pattern.pattern
+            for (pattern, anchor), lowercase in zip(_PATTERN_ANCHORS, _LOWERCASE_PATTERNS)
+            if (anchor is None or anchor in lowered) and lowercase.search(lowered)
+        ]
+    found += [marker for marker in _HIGH_RISK_MARKERS if marker in lowered]
+    return found
 
-    for pattern in _INJECTION_PATTERNS:
-        if pattern.search(text):
-            indicators.append(pattern.pattern)
 
-    for marker in _HIGH_RISK_MARKERS:
-        if marker in lowered:
-            indicators.append(marker)
+@instrument("injection_detector", verdict_key="detected")
+def detect(
+    text: str, tenant: Optional[str] = None, views: Optional[List[Tuple[str, str]]] = None
+) -> Dict[str, object]:
+    """Detect likely prompt-injection attempts.
+
+    Returns a dict with a boolean, confidence score, and indicators. The
+    text is also matched after Unicode folding, base64/hex decoding and
+    ROT13 (see :mod:`.normalization`); ``obfuscation`` names the views that
+    revealed indicators the plain text did not. The detection cutoff is
+    read from the threshold store for ``tenant``. Callers that already ran
+    :func:`candidate_views` on ``text`` can pass its result as ``views``.
+    """
+    if not text:
+        return {"detected": False, "confidence": 0.0, "indicators": [], "obfuscation": []}
+
+    indicators: List[str] = []
+    obfuscation: List[str] = []
+    for label, view in candidate_views(text) if views is None else views:
+        new = [indicator for indicator in _indicators(view) if indicator not in indicators]
+        if new:
+            indicators.extend(new)
+            if label != "plain":
+                obfuscation.append(label)
 
-    confidence = min(1.0, 0.2 * len(indicators))
-    detected = confidence >= 0.4
+    confidence = 0.2 * len(indicators) + (OBFUSCATION_WEIGHT if obfuscation else 0.0)
+    confidence = min(1.0, confidence)
+    detected = confidence >= get_threshold("injection_detector", DETECTION_THRESHOLD, tenant)
 
     return {
         "detected": detected,
         "confidence": round(confidence, 2),
         "indicators": indicators,
+        "obfuscation": obfuscation,
     }
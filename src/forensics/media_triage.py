@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Media Triage - bulk evidence sniffing, hashing and metadata extraction
+
+Walks an evidence directory and, in a process pool, sniffs each file's type,
+hashes it with several digests in a single read pass, extracts format
+metadata (EXIF, image spectrum, audio stream info, container metadata) and
+records a strip_and_hash custody record for JPEGs. Derived from the scanner cells of
+notebooks/H4RB1NG3R_Forensic_Lab.ipynb.
+
+Format libraries (filetype, exifread, cv2, soundfile, librosa, hachoir) are
+optional and imported lazily, per worker, the first time a matching file is
+seen. Results are appended to a JSONL manifest as they complete; re-running
+against the same manifest skips files whose path, size and mtime are already
+recorded, so interrupted runs over large seizures resume where they stopped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .metadata_stripper import strip_and_hash
+
+DIGESTS = ('sha256', 'sha1', 'md5')
+READ_SIZE = 1 << 20
+# Sniffing and EXIF parsing only need the start of the file.
+HEAD_SIZE = 64 * 1024
+# Images up to this size are buffered during the hash pass for decoding and stripping.
+MAX_BUFFERED = 64 * 1024 * 1024
+BATCH_SIZE = 32
+
+# Byte markers carried over from the notebook's anomaly heuristics.
+_MARKERS = {
+    b'FFMPEG': 'VID_ENCODER_FFMPEG_DETECTED',
+    b'Lavf': 'VID_ENCODER_FFMPEG_DETECTED',
+    b'Photoshop': 'META_SOFTWARE_PHOTOSHOP',
+}
+_MARKER_OVERLAP = max(len(marker) for marker in _MARKERS) - 1
+
+# Fallback signatures when filetype is not installed.
+_MAGIC = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF8', 'image/gif'),
+    (0, b'II*\x00', 'image/tiff'),
+    (0, b'MM\x00*', 'image/tiff'),
+    (0, b'BM', 'image/bmp'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'fLaC', 'audio/x-flac'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'%PDF', 'application/pdf'),
+    (0, b'PK\x03\x04', 'application/zip'),
+    (0, b'\x1aE\xdf\xa3', 'video/x-matroska'),
+    (4, b'ftyp', 'video/mp4'),
+)
+
+
+@lru_cache(maxsize=None)
+def _optional(name: str):
+    """Import an optional dependency once per process, or None if unavailable."""
+    try:
+        return importlib.import_module(name)
+    except Exception:
+        return None
+
+
+def sniff(head: bytes) -> str:
+    """Guess a MIME type from the first bytes of a file."""
+    filetype = _optional('filetype')
+    if filetype is not None:
+        kind = filetype.guess(head)
+        if kind is not None:
+            return kind.mime
+    for offset, signature, mime in _MAGIC:
+        if head[offset:offset + len(signature)] == signature:
+            return mime
+    if head[:4] == b'RIFF':
+        return {b'WAVE': 'audio/x-wav', b'WEBP': 'image/webp', b'AVI ': 'video/x-msvideo'}.get(
+            head[8:12], 'application/octet-stream'
+        )
+    return 'unknown'
+
+
+def _image_metadata(head: bytes, blob: Optional[bytes]) -> Tuple[Dict[str, Any], List[str]]:
+    metadata: Dict[str, Any] = {}
+    missing = []
+    exifread = _optional('exifread')
+    if exifread is None:
+        missing.append('exifread')
+    else:
+        tags = exifread.process_file(io.BytesIO(head), details=False)
+        metadata['exif'] = {key: str(value)[:256] for key, value in tags.items()}
+
+    if blob is None:
+        return metadata, missing
+    cv2 = _optional('cv2')
+    np = _optional('numpy')
+    if cv2 is None or np is None:
+        missing.append('cv2')
+        return metadata, missing
+    image = cv2.imdecode(np.frombuffer(blob, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        return metadata, missing
+    metadata['height'], metadata['width'] = (int(size) for size in image.shape[:2])
+    scale = 512 / max(image.shape)
+    if scale < 1:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    magnitude = np.log1p(np.abs(np.fft.fftshift(np.fft.fft2(image.astype(np.float32)))))
+    h, w = magnitude.shape
+    center = magnitude[max(h // 2 - 10, 0):h // 2 + 10, max(w // 2 - 10, 0):w // 2 + 10]
+    metadata['fft_ratio'] = round(float(magnitude.mean() / (center.mean() + 1e-9)), 4)
+    return metadata, missing
+
+
+def _audio_metadata(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    soundfile = _optional('soundfile')
+    if soundfile is not None:
+        try:
+            info = soundfile.info(path)
+            return {
+                'samplerate': info.samplerate,
+                'channels': info.channels,
+                'duration': round(info.duration, 3),
+                'format': info.format,
+                'subtype': info.subtype,
+            }, []
+        except RuntimeError:
+            pass
+    librosa = _optional('librosa')
+    if librosa is None:
+        return {}, ['soundfile' if soundfile is None else 'librosa']
+    return {
+        'samplerate': int(librosa.get_samplerate(path)),
+        'duration': round(float(librosa.get_duration(path=path)), 3),
+    }, []
+
+
+def _container_metadata(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    parser_module = _optional('hachoir.parser')
+    metadata_module = _optional('hachoir.metadata')
+    if parser_module is None or metadata_module is None:
+        return {}, ['hachoir']
+    parser = parser_module.createParser(path)
+    if parser is None:
+        return {}, []
+    with parser:
+        extracted = metadata_module.extractMetadata(parser)
+    if extracted is None:
+        return {}, []
+    return {'container': extracted.exportDictionary()}, []
+
+
+def triage_file(path: str, root: str = '', strip_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Sniff, hash and extract metadata for one file.
+
+    The file is read once: every chunk feeds all DIGESTS and the marker
+    scan, and images small enough are buffered for decoding and
+    metadata stripping. Errors are recorded on the result, not raised.
+    """
+    started = time.perf_counter()
+    stat = os.stat(path)
+    result: Dict[str, Any] = {
+        'path': os.path.relpath(path, root) if root else path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    try:
+        hashers = [hashlib.new(name) for name in DIGESTS]
+        flags: Set[str] = set()
+        buffered: Optional[bytearray] = None
+        tail = b''
+        with open(path, 'rb') as handle:
+            head = handle.read(HEAD_SIZE)
+            mime = sniff(head)
+            if mime.startswith('image/') and stat.st_size <= MAX_BUFFERED:
+                buffered = bytearray()
+            chunk = head
+            while chunk:
+                for hasher in hashers:
+                    hasher.update(chunk)
+                # Markers split across a chunk boundary are caught by the small seam buffer.
+                seam = tail + chunk[:_MARKER_OVERLAP]
+                for marker, flag in _MARKERS.items():
+                    if marker in chunk or marker in seam:
+                        flags.add(flag)
+                tail = (tail + chunk)[-_MARKER_OVERLAP:] if len(chunk) < _MARKER_OVERLAP else chunk[-_MARKER_OVERLAP:]
+                if buffered is not None:
+                    buffered.extend(chunk)
+                chunk = handle.read(READ_SIZE)
+
+        result['mime'] = mime
+        result['digests'] = {name: hasher.hexdigest() for name, hasher in zip(DIGESTS, hashers)}
+        blob = bytes(buffered) if buffered is not None else None
+
+        if mime.startswith('image/'):
+            metadata, missing = _image_metadata(head, blob)
+        elif mime.startswith('audio/'):
+            metadata, missing = _audio_metadata(path)
+        elif mime.startswith('video/'):
+            metadata, missing = _container_metadata(path)
+        else:
+            metadata, missing = {}, []
+        result['metadata'] = metadata
+        if missing:
+            result['missing_dependencies'] = missing
+
+        if mime == 'image/jpeg' and blob is not None:
+            output = io.BytesIO()
+            custody = strip_and_hash(io.BytesIO(blob), output)
+            digest = custody['stripped_sha256']
+            result['stripped'] = {
+                'sha256': digest,
+                'payload_sha256': custody['payload_sha256'],
+                'removed_bytes': custody['original_bytes'] - custody['stripped_bytes'],
+                'removed_segments': custody['removed_segments'],
+            }
+            if strip_dir:
+                target = os.path.join(strip_dir, f'{digest}.jpg')
+                if not os.path.exists(target):
+                    temp = f'{target}.{os.getpid()}.tmp'
+                    with open(temp, 'wb') as handle:
+                        handle.write(output.getvalue())
+                    os.replace(temp, target)
+                result['stripped']['file'] = os.path.basename(target)
+        result['flags'] = sorted(flags)
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def _triage_batch(paths: List[str], root: str, strip_dir: Optional[str]) -> List[Dict[str, Any]]:
+    results = []
+    for path in paths:
+        try:
+            results.append(triage_file(path, root, strip_dir))
+        except OSError as exc:  # vanished or unreadable between walk and stat
+            results.append({'path': os.path.relpath(path, root), 'error': f'{type(exc).__name__}: {exc}'})
+    return results
+
+
+def walk_evidence(root: str, exclude: Tuple[str, ...] = ()) -> Iterator[os.DirEntry]:
+    """Yield regular files under root depth-first without following symlinks.
+
+    Paths in ``exclude`` (files or directories) are skipped.
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in reversed(entries):
+            if entry.is_dir(follow_symlinks=False) and os.path.abspath(entry.path) not in excluded:
+                stack.append(entry.path)
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and os.path.abspath(entry.path) not in excluded:
+                yield entry
+
+
+def load_manifest(manifest_path: str) -> Set[Tuple[str, int, int]]:
+    """Return (path, size, mtime_ns) keys already triaged without error."""
+    done: Set[Tuple[str, int, int]] = set()
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, 'r', encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:  # torn final line from an interrupted run
+                continue
+            if 'error' not in record and 'mtime_ns' in record:
+                done.add((record['path'], record['size'], record['mtime_ns']))
+    return done
+
+
+def triage_directory(
+    root: str,
+    manifest_path: str,
+    workers: Optional[int] = None,
+    strip_dir: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Triage every file under root, appending results to manifest_path.
+
+    Files are dispatched to a process pool in batches with a bounded number
+    in flight, so memory stays flat regardless of how many files the walk
+    yields. Returns a run summary.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    done = load_manifest(manifest_path)
+    if strip_dir:
+        os.makedirs(strip_dir, exist_ok=True)
+
+    summary: Dict[str, Any] = {'processed': 0, 'resumed': 0, 'errors': 0, 'bytes': 0, 'mime': {}, 'flags': {}}
+
+    def record(handle, results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            handle.write(json.dumps(result, sort_keys=True) + '\n')
+            summary['processed'] += 1
+            summary['bytes'] += result.get('size', 0)
+            if 'error' in result:
+                summary['errors'] += 1
+            mime = result.get('mime', 'unknown')
+            summary['mime'][mime] = summary['mime'].get(mime, 0) + 1
+            for flag in result.get('flags', ()):
+                summary['flags'][flag] = summary['flags'].get(flag, 0) + 1
+        handle.flush()
+
+    # Files that vanish or become unreadable between the walk and the stat.
+    walk_errors: List[Dict[str, Any]] = []
+
+    def batches() -> Iterator[List[str]]:
+        batch: List[str] = []
+        exclude = (manifest_path, strip_dir) if strip_dir else (manifest_path,)
+        for entry in walk_evidence(root, exclude):
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError as exc:
+                walk_errors.append({'path': os.path.relpath(entry.path, root), 'error': f'{type(exc).__name__}: {exc}'})
+                continue
+            if (os.path.relpath(entry.path, root), stat.st_size, stat.st_mtime_ns) in done:
+                summary['resumed'] += 1
+                continue
+            batch.append(entry.path)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with open(manifest_path, 'a', encoding='utf-8') as handle, ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        for batch in batches():
+            pending.add(pool.submit(_triage_batch, batch, root, strip_dir))
+            if walk_errors:
+                record(handle, walk_errors)
+                walk_errors.clear()
+            if len(pending) >= workers * 4:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(handle, future.result())
+        for future in pending:
+            record(handle, future.result())
+        record(handle, walk_errors)
+
+    summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    summary['manifest'] = manifest_path
+    return summary
+
+
+def main():
+    """CLI interface for media triage."""
+    usage = {
+        'error': 'Usage: media_triage.py <evidence_dir> [--manifest path] [--workers n] [--strip-dir dir]',
+        'defaults': {'manifest': 'triage_manifest.jsonl', 'workers': os.cpu_count()},
+    }
+    args = sys.argv[1:]
+    if not args or args[0].startswith('--'):
+        print(json.dumps(usage))
+        sys.exit(1)
+
+    root = args[0]
+    options = dict(zip(args[1::2], args[2::2]))
+    if not os.path.isdir(root) or set(options) - {'--manifest', '--workers', '--strip-dir'}:
+        print(json.dumps(usage))
+        sys.exit(1)
+
+    result = triage_directory(
+        root,
+        options.get('--manifest', 'triage_manifest.jsonl'),
+        workers=int(options['--workers']) if '--workers' in options else None,
+        strip_dir=options.get('--strip-dir'),
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
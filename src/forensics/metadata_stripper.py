@@ -2,6 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
+from typing import BinaryIO, Dict, List, Union
+
+_CHUNK_SIZE = 1 << 20
+
+_STRIPPED_MARKERS = {0xE1: "APP1", 0xED: "APP13"}
+
 
 def strip_metadata(blob: bytes) -> bytes:
     """Remove common metadata segments from JPEG blobs.
@@ -42,3 +50,129 @@ def strip_metadata(blob: bytes) -> bytes:
         pos = seg_end
 
     return bytes(output)
+
+
+class _HashingReader:
+    """File wrapper that hashes every byte as it is read."""
+
+    def __init__(self, handle: BinaryIO):
+        self.handle = handle
+        self.digest = hashlib.sha256()
+        self.consumed = 0
+
+    def read(self, size: int) -> bytes:
+        data = self.handle.read(size)
+        self.digest.update(data)
+        self.consumed += len(data)
+        return data
+
+    def exactly(self, size: int) -> bytes:
+        parts = []
+        while size > 0:
+            data = self.read(size)
+            if not data:
+                break
+            parts.append(data)
+            size -= len(data)
+        return b"".join(parts)
+
+
+def strip_and_hash(
+    source: Union[str, os.PathLike, BinaryIO],
+    destination: Union[str, os.PathLike, BinaryIO, None] = None,
+    chunk_size: int = _CHUNK_SIZE,
+) -> Dict[str, object]:
+    """Stream ``source`` once, writing the stripped copy and a custody record.
+
+    The output matches :func:`strip_metadata` byte for byte. Three SHA-256
+    digests are updated as the input is consumed: the original file, the
+    stripped output, and the JPEG payload (everything from the first Start
+    of Scan marker on, which stripping copies verbatim). Running this on the
+    stripped file yields the same ``payload_sha256``, proving the pixels
+    were not altered. ``destination`` may be omitted to only hash.
+    """
+    own_source = not hasattr(source, "read")
+    own_destination = destination is not None and not hasattr(destination, "write")
+    handle = open(source, "rb") if own_source else source
+    sink = open(destination, "wb") if own_destination else destination
+    reader = _HashingReader(handle)
+    stripped = hashlib.sha256()
+    payload = None
+    written = 0
+    payload_bytes = 0
+    removed: List[Dict[str, object]] = []
+
+    def emit(data: bytes) -> None:
+        nonlocal written
+        stripped.update(data)
+        written += len(data)
+        if sink is not None:
+            sink.write(data)
+
+    def copy_rest() -> None:
+        nonlocal payload_bytes
+        while True:
+            data = reader.read(chunk_size)
+            if not data:
+                return
+            emit(data)
+            if payload is not None:
+                payload.update(data)
+                payload_bytes += len(data)
+
+    def drain() -> None:
+        while reader.read(chunk_size):
+            pass
+
+    try:
+        head = reader.exactly(4)
+        is_jpeg = len(head) == 4 and head.startswith(b"\xff\xd8")
+        if not is_jpeg:
+            emit(head)
+            copy_rest()
+        else:
+            emit(head[:2])
+            pending = head[2:]
+            while True:
+                offset = reader.consumed - len(pending)
+                header = pending + reader.exactly(4 - len(pending))
+                pending = b""
+                if len(header) < 4 or header[0] != 0xFF:
+                    break
+                marker = header[1]
+                if marker == 0xDA:  # Start of Scan
+                    payload = hashlib.sha256(header)
+                    payload_bytes = len(header)
+                    emit(header)
+                    copy_rest()
+                    break
+                if marker == 0xD9:  # End of Image
+                    emit(header[:2])
+                    break
+
+                total = 2 + int.from_bytes(header[2:4], "big")
+                if total <= 4:
+                    segment, pending = header[:total], header[total:]
+                else:
+                    segment = header + reader.exactly(total - 4)
+                if marker in _STRIPPED_MARKERS:
+                    removed.append({"marker": _STRIPPED_MARKERS[marker], "offset": offset, "length": len(segment)})
+                else:
+                    emit(segment)
+            drain()
+    finally:
+        if own_source:
+            handle.close()
+        if own_destination:
+            sink.close()
+
+    return {
+        "format": "jpeg" if is_jpeg else "passthrough",
+        "original_sha256": reader.digest.hexdigest(),
+        "stripped_sha256": stripped.hexdigest(),
+        "payload_sha256": payload.hexdigest() if payload is not None else None,
+        "original_bytes": reader.consumed,
+        "stripped_bytes": written,
+        "payload_bytes": payload_bytes,
+        "removed_segments": removed,
+    }
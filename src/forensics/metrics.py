@@ -0,0 +1,314 @@
+"""Detector instrumentation exposed in Prometheus text format."""
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .profiling import get_profiler
+
+
+METRICS_ENV = "HARBINGER_METRICS"
+
+# Matches telemetry.prometheus.port in config/harbinger.yaml.
+DEFAULT_PORT = 9464
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+ENABLED = os.environ.get(METRICS_ENV, "1") != "0"
+
+
+class _Series:
+    """Counters for one detector in one thread's shard."""
+
+    __slots__ = ("calls", "errors", "latency", "latency_sum", "size", "size_sum", "cache_hits", "cache_misses",
+                 "verdicts")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.size = [0] * (len(SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.verdicts: Dict[str, int] = {}
+
+    def merge(self, other: "_Series") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.latency_sum += other.latency_sum
+        self.size = [a + b for a, b in zip(self.size, other.size)]
+        self.size_sum += other.size_sum
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        for verdict, count in list(other.verdicts.items()):
+            self.verdicts[verdict] = self.verdicts.get(verdict, 0) + count
+
+
+class MetricsRegistry:
+    """Per-thread detector counters aggregated on scrape.
+
+    Each thread writes only to its own shard, so recording takes no lock;
+    the registry lock is held only when a thread registers its shard and
+    while a scrape folds finished threads' shards into a retired total.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, Dict[str, _Series]]] = []
+        self._retired: Dict[str, _Series] = {}
+
+    def _series(self, detector: str) -> _Series:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        series = shard.get(detector)
+        if series is None:
+            series = shard[detector] = _Series()
+        return series
+
+    def observe(
+        self,
+        detector: str,
+        seconds: float,
+        size: Optional[int] = None,
+        verdict: Optional[str] = None,
+        error: bool = False,
+    ) -> None:
+        """Record one detector call."""
+        series = self._series(detector)
+        series.calls += 1
+        series.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series.latency_sum += seconds
+        if size is not None:
+            series.size[bisect_left(SIZE_BUCKETS, size)] += 1
+            series.size_sum += size
+        if error:
+            series.errors += 1
+        if verdict is not None:
+            series.verdicts[verdict] = series.verdicts.get(verdict, 0) + 1
+
+    def record_cache(self, detector: str, hit: bool) -> None:
+        """Count a cache lookup made on behalf of ``detector``."""
+        series = self._series(detector)
+        if hit:
+            series.cache_hits += 1
+        else:
+            series.cache_misses += 1
+
+    def collect(self) -> Dict[str, _Series]:
+        """Aggregate every shard into one series per detector."""
+        totals: Dict[str, _Series] = {}
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                    continue
+                for detector, series in shard.items():
+                    self._retired.setdefault(detector, _Series()).merge(series)
+            self._shards = live
+            shards = [self._retired] + [shard for _, shard in live]
+        for shard in shards:
+            for detector, series in list(shard.items()):
+                totals.setdefault(detector, _Series()).merge(series)
+        return totals
+
+    def reset(self) -> None:
+        with self._lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired = {}
+
+    def render(self) -> str:
+        """Render all detector metrics in the Prometheus text exposition format."""
+        totals = sorted(self.collect().items())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, buckets, attr: str) -> None:
+            for detector, series in totals:
+                label = f'detector="{_escape(detector)}"'
+                counts = getattr(series, attr)
+                running = 0
+                for bound, count in zip(buckets, counts):
+                    running += count
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {running}')
+                running += counts[-1]
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {running}')
+                lines.append(f"{name}_sum{{{label}}} {getattr(series, attr + '_sum')}")
+                lines.append(f"{name}_count{{{label}}} {running}")
+
+        family("harbinger_detector_calls_total", "counter", "Detector invocations.")
+        for detector, series in totals:
+            lines.append(f'harbinger_detector_calls_total{{detector="{_escape(detector)}"}} {series.calls}')
+        family("harbinger_detector_errors_total", "counter", "Detector invocations that raised.")
+        for detector, series in totals:
+            lines.append(f'harbinger_detector_errors_total{{detector="{_escape(detector)}"}} {series.errors}')
+        family("harbinger_detector_latency_seconds", "histogram", "Detector call latency.")
+        histogram("harbinger_detector_latency_seconds", LATENCY_BUCKETS, "latency")
+        family("harbinger_detector_input_size", "histogram", "Detector input size in characters or bytes.")
+        histogram("harbinger_detector_input_size", SIZE_BUCKETS, "size")
+        family("harbinger_detector_cache_hits_total", "counter", "Detector cache hits.")
+        for detector, series in totals:
+            lines.append(f'harbinger_detector_cache_hits_total{{detector="{_escape(detector)}"}} {series.cache_hits}')
+        family("harbinger_detector_cache_misses_total", "counter", "Detector cache misses.")
+        for detector, series in totals:
+            lines.append(f'harbinger_detector_cache_misses_total{{detector="{_escape(detector)}"}} {series.cache_misses}')
+        family("harbinger_detector_cache_hit_ratio", "gauge", "Cache hits over lookups since start.")
+        for detector, series in totals:
+            lookups = series.cache_hits + series.cache_misses
+            if lookups:
+                ratio = round(series.cache_hits / lookups, 6)
+                lines.append(f'harbinger_detector_cache_hit_ratio{{detector="{_escape(detector)}"}} {ratio}')
+        family("harbinger_detector_verdicts_total", "counter", "Detector verdicts by value.")
+        for detector, series in totals:
+            for verdict, count in sorted(series.verdicts.items()):
+                lines.append(
+                    f'harbinger_detector_verdicts_total{{detector="{_escape(detector)}",verdict="{_escape(verdict)}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def _input_size(args) -> Optional[int]:
+    sizes = [len(arg) for arg in args if isinstance(arg, (str, bytes, bytearray))]
+    return sum(sizes) if sizes else None
+
+
+def verdict_label(result, key: Optional[str]) -> Optional[str]:
+    """The metrics label for a detector result's verdict: ``result[key]`` as a string, or None."""
+    if key is None or not isinstance(result, dict) or key not in result:
+        return None
+    value = result[key]
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def instrument(detector: str, verdict_key: Optional[str] = "verdict") -> Callable:
+    """Decorate a detector entry point to record calls, latency, input size and verdicts.
+
+    Input size is the total length of the str/bytes positional arguments;
+    the verdict is ``result[verdict_key]`` when the detector returns a dict.
+    When the profiler is active, slow calls are captured and a sample of
+    calls is profiled (see :mod:`.profiling`). With ``HARBINGER_METRICS=0``
+    and profiling off, the function is returned unwrapped.
+    """
+    profiler = get_profiler()
+
+    def decorate(func: Callable) -> Callable:
+        if not ENABLED and not profiler.active:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            error = True
+            try:
+                if profiler.active:
+                    result = profiler.call(detector, func, args, kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                if ENABLED:
+                    _registry.observe(detector, elapsed, _input_size(args), verdict_label(result, verdict_key), error)
+                if profiler.active and elapsed >= profiler.slow_seconds:
+                    profiler.record_slow(detector, elapsed, args, kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class track:
+    """Context manager form of :func:`instrument` for code that is not a single call.
+
+    ``with track("media_triage", size=n) as call: ...; call.verdict = "ok"``
+    """
+
+    __slots__ = ("detector", "size", "verdict", "_started")
+
+    def __init__(self, detector: str, size: Optional[int] = None):
+        self.detector = detector
+        self.size = size
+        self.verdict: Optional[str] = None
+
+    def __enter__(self) -> "track":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if ENABLED:
+            _registry.observe(
+                self.detector, time.perf_counter() - self._started, self.size, self.verdict, exc_type is not None
+            )
+
+    def cache(self, hit: bool) -> None:
+        record_cache(self.detector, hit)
+
+
+def record_cache(detector: str, hit: bool) -> None:
+    """Count a cache hit or miss for ``detector``."""
+    if ENABLED:
+        _registry.record_cache(detector, hit)
+
+
+def render() -> str:
+    return _registry.render()
+
+
+def serve(port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+    """Serve ``/metrics`` from a daemon thread and return the server."""
+    # Imported here so detectors that never expose metrics skip http.server at import.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = _registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="harbinger-metrics", daemon=True).start()
+    return server
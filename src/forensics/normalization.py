@@ -0,0 +1,167 @@
+"""Obfuscation-resistant text views for detector matching."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+
+MAX_DEPTH = 2
+MAX_RUNS = 16
+MAX_DECODED_BYTES = 64 * 1024
+MIN_PRINTABLE_RATIO = 0.85
+MIN_RUN = 16
+
+# Zero-width, joiner, bidi-control, soft-hyphen, variation-selector and tag characters.
+_INVISIBLE_RANGES = (
+    (0x00AD, 0x00AD), (0x034F, 0x034F), (0x061C, 0x061C), (0x115F, 0x1160), (0x17B4, 0x17B5),
+    (0x180B, 0x180E), (0x200B, 0x200F), (0x202A, 0x202E), (0x2060, 0x2064), (0x2066, 0x206F),
+    (0x3164, 0x3164), (0xFE00, 0xFE0F), (0xFEFF, 0xFEFF), (0xFFA0, 0xFFA0), (0x1BCA0, 0x1BCA3),
+    (0xE0000, 0xE007F), (0xE0100, 0xE01EF),
+    # Combining diacritics left over after NFKC composition (stacked "zalgo" marks).
+    (0x0300, 0x036F), (0x1AB0, 0x1AFF), (0x1DC0, 0x1DFF), (0x20D0, 0x20FF), (0xFE20, 0xFE2F),
+)
+
+# Cyrillic, Greek and Latin look-alikes that NFKC leaves alone.
+_CONFUSABLES = {
+    "а": "a", "в": "b", "г": "r", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ԛ": "q",
+    "ԝ": "w", "һ": "h", "ӏ": "l", "ɡ": "g",
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O", "Р": "P", "С": "C", "Т": "T",
+    "У": "Y", "Х": "X", "Ѕ": "S", "І": "I", "Ј": "J", "Ԁ": "D", "Ԛ": "Q", "Ԝ": "W", "Һ": "H", "Ӏ": "I",
+    "α": "a", "β": "b", "γ": "y", "δ": "d", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w", "ϲ": "c", "ϳ": "j",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M", "Ν": "N", "Ο": "O",
+    "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X", "Ϲ": "C",
+    "ı": "i", "İ": "I", "ȷ": "j", "ɑ": "a", "ɩ": "i", "ɪ": "i", "ʏ": "y", "ℓ": "l", "ꓲ": "I", "ꭰ": "D",
+}
+
+
+# str.translate looks every non-ASCII character up in a dict, which dominates on long non-English
+# text; a character-class regex plus one C-level replace per confusable present is several times faster.
+_INVISIBLE = re.compile("[" + "".join(f"\\U{start:08x}-\\U{end:08x}" for start, end in _INVISIBLE_RANGES) + "]")
+_CONFUSABLE_ITEMS = tuple(_CONFUSABLES.items())
+
+
+def _fold_characters(text: str) -> str:
+    text = _INVISIBLE.sub("", text)
+    for confusable, replacement in _CONFUSABLE_ITEMS:
+        if confusable in text:
+            text = text.replace(confusable, replacement)
+    return text
+
+
+_ROT13 = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "NOPQRSTUVWXYZABCDEFGHIJKLMnopqrstuvwxyzabcdefghijklm",
+)
+
+# Maps each lowercase letter and its ROT13 partner to the same letter.
+_ROT13_PAIRS = str.maketrans("nopqrstuvwxyz", "abcdefghijklm")
+
+_RUN_BYTE = b"A"
+_RUN_MASK = bytes(
+    _RUN_BYTE[0] if chr(code).isascii() and (chr(code).isalnum() or chr(code) in "+/_-=\\") else 0x20
+    for code in range(256)
+)
+
+# Candidate runs: standard or URL-safe base64 of at least 12 bytes, or 8+ hex-encoded bytes
+# (bare or as \x escapes). Decoding is strict, so most prose matches are rejected cheaply.
+_ENCODED_RUN = re.compile(
+    r"(?P<hex>(?:\\x[0-9A-Fa-f]{2}){8,}|\b(?:[0-9A-Fa-f]{2}){8,}\b)"
+    r"|(?P<base64>[A-Za-z0-9+/_-]{16,}={0,2})"
+)
+
+
+def fold(text: str) -> str:
+    """Strip invisible characters, apply NFKC and map confusables to ASCII look-alikes.
+
+    ASCII input is returned unchanged without any work.
+    """
+    if text.isascii():
+        return text
+    folded = _fold_characters(text)
+    if not unicodedata.is_normalized("NFKC", folded):
+        # NFKC can produce new confusables (e.g. U+00B5 -> Greek mu) and new combining marks.
+        folded = _fold_characters(unicodedata.normalize("NFKC", folded))
+    return folded
+
+
+def rot13(text: str) -> str:
+    return text.translate(_ROT13)
+
+
+def rot13_fold(lowered: str) -> str:
+    """Fold lowercase text so that it and its ROT13 become identical.
+
+    A literal occurs in ``lowered`` or in ``rot13(lowered)`` only if
+    ``rot13_fold(literal)`` occurs in ``rot13_fold(lowered)``, so one
+    substring pass covers both.
+    """
+    return lowered.translate(_ROT13_PAIRS)
+
+
+def _may_contain_run(text: str) -> bool:
+    # bytes.translate and a substring test run in C; most prose has no 16-character candidate run.
+    mask = text.encode("utf-8", "surrogatepass").translate(_RUN_MASK)
+    return _RUN_BYTE * MIN_RUN in mask
+
+
+def _printable(decoded: str) -> bool:
+    printable = sum(character.isprintable() or character in "\t\r\n" for character in decoded)
+    return printable >= MIN_PRINTABLE_RATIO * len(decoded)
+
+
+def _decode(kind: str, run: str) -> str:
+    if kind == "hex":
+        raw = binascii.unhexlify(run.replace("\\x", ""))
+    else:
+        if run.isalpha() and run.islower():  # long ordinary words are not payloads
+            return ""
+        run = run.rstrip("=")
+        padded = run + "=" * (-len(run) % 4)
+        altchars = b"-_" if ("-" in run or "_" in run) else None
+        raw = base64.b64decode(padded, altchars=altchars, validate=True)
+    decoded = raw.decode("utf-8")
+    return decoded if decoded and _printable(decoded) else ""
+
+
+def decoded_payloads(text: str, depth: int = MAX_DEPTH) -> List[Tuple[str, str]]:
+    """Decode base64 and hex runs in ``text``, recursing into decoded text up to ``depth`` levels.
+
+    Returns ``(encoding path, folded decoded text)`` pairs, e.g.
+    ``("base64>hex", ...)``. At most :data:`MAX_RUNS` runs and
+    :data:`MAX_DECODED_BYTES` of decoded text are produced per call.
+    """
+    payloads: List[Tuple[str, str]] = []
+    budget = [MAX_RUNS, MAX_DECODED_BYTES]
+
+    def walk(source: str, prefix: str, remaining: int) -> None:
+        # str.split runs in C; only whitespace-free tokens long enough to hold a run reach the regex.
+        for token in source.split():
+            if len(token) < MIN_RUN:
+                continue
+            for match in _ENCODED_RUN.finditer(token):
+                if budget[0] <= 0 or budget[1] <= 0:
+                    return
+                kind = match.lastgroup
+                try:
+                    decoded = _decode(kind, match.group(kind))
+                except (ValueError, binascii.Error, UnicodeDecodeError):
+                    continue
+                if not decoded:
+                    continue
+                budget[0] -= 1
+                decoded = fold(decoded[:budget[1]])
+                budget[1] -= len(decoded)
+                label = f"{prefix}>{kind}" if prefix else kind
+                payloads.append((label, decoded))
+                if remaining > 1:
+                    walk(decoded, label, remaining - 1)
+
+    if depth > 0 and _may_contain_run(text):
+        walk(text, "", depth)
+    return payloads
@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
+import math
 from statistics import mean
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the batched API
+    np = None
 
-def recalibrate(probe_state: Dict[str, object]) -> Dict[str, object]:
-    """Recalibrate probe thresholds based on recent drift signals."""
+
+MAX_HISTORY = 512
+
+_METHODS = ("cusum", "page_hinkley")
+
+
+def recalibrate(probe_state: Dict[str, object], max_history: Optional[int] = MAX_HISTORY) -> Dict[str, object]:
+    """Recalibrate probe thresholds based on recent drift signals.
+
+    ``drift_history`` is trimmed in place to the newest ``max_history``
+    entries so long-lived probe states stay bounded; pass ``None`` to keep
+    the full history.
+    """
     history = probe_state.get("drift_history", [])
     if isinstance(history, list) and history:
+        if max_history is not None and len(history) > max_history:
+            del history[:-max_history]
         numeric_history: List[float] = [float(value) for value in history if isinstance(value, (int, float))]
         if numeric_history:
             probe_state["drift_baseline"] = round(mean(numeric_history), 3)
@@ -18,3 +36,317 @@ def recalibrate(probe_state: Dict[str, object]) -> Dict[str, object]:
     probe_state["recalibrated"] = True
     probe_state.setdefault("last_action", "baseline updated")
     return probe_state
+
+
+class StreamingRecalibrator:
+    """Constant-memory drift tracker for a single probe.
+
+    Keeps an exponentially weighted mean and variance of the drift signal
+    plus a fixed-size ring buffer of recent values. The baseline is only
+    moved when a CUSUM or Page-Hinkley test (in units of the baseline's
+    standard deviation) detects that drift has actually shifted. CUSUM
+    measures deviations from the frozen baseline; Page-Hinkley measures
+    them from the running mean of the segment since the last change.
+
+    On a shift the baseline jumps to the mean of the samples since the
+    estimated change point, then detection pauses while the statistics
+    re-warm on the new level and the baseline is refined once more. Those
+    samples count towards the re-warm, but at least one new observation is
+    always needed before detection resumes.
+    """
+
+    __slots__ = (
+        "alpha", "window", "method", "k", "h", "warmup",
+        "count", "fresh", "mean", "var", "baseline", "scale",
+        "pos", "neg", "pos_min", "neg_min", "pos_n", "neg_n", "pos_sum", "neg_sum",
+        "segment_count", "segment_mean",
+        "ring", "ring_pos", "recalibrations",
+    )
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        window: int = 64,
+        method: str = "cusum",
+        k: float = 0.5,
+        h: float = 5.0,
+        warmup: int = 32,
+    ):
+        if method not in _METHODS:
+            raise ValueError(f"Unknown change detector: {method} (expected one of {_METHODS})")
+        self.alpha = alpha
+        self.window = window
+        self.method = method
+        self.k = k
+        self.h = h
+        self.warmup = warmup
+        self.count = 0
+        self.fresh = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.baseline: Optional[float] = None
+        self.scale = 1.0
+        self.pos = self.neg = self.pos_min = self.neg_min = 0.0
+        self.pos_n = self.neg_n = 0
+        self.pos_sum = self.neg_sum = 0.0
+        self.segment_count = 0
+        self.segment_mean = 0.0
+        self.ring: List[float] = []
+        self.ring_pos = 0
+        self.recalibrations = 0
+
+    def _reset_detector(self, rescale: bool) -> None:
+        self.baseline = self.mean
+        if rescale:
+            self.scale = math.sqrt(self.var) or 1.0
+        self.pos = self.neg = self.pos_min = self.neg_min = 0.0
+        self.pos_n = self.neg_n = 0
+        self.pos_sum = self.neg_sum = 0.0
+        self.segment_count = 0
+        self.segment_mean = 0.0
+        self.recalibrations += 1
+
+    def update(self, value: float) -> bool:
+        """Fold one drift observation in; return True if it triggered recalibration."""
+        value = float(value)
+        if len(self.ring) < self.window:
+            self.ring.append(value)
+        else:
+            self.ring[self.ring_pos] = value
+        self.ring_pos = (self.ring_pos + 1) % self.window
+
+        # Weight 1/n until it drops below alpha: exact mean/variance while
+        # warming up, exponentially weighted afterwards.
+        self.count += 1
+        self.fresh += 1
+        weight = max(self.alpha, 1.0 / self.fresh)
+        diff = value - self.mean
+        increment = weight * diff
+        self.mean += increment
+        self.var = (1 - weight) * (self.var + diff * increment)
+
+        if self.fresh < self.warmup:
+            return False
+        if self.fresh == self.warmup:
+            self._reset_detector(rescale=True)
+            return True
+
+        if self.method == "cusum":
+            z = (value - self.baseline) / self.scale
+            self.pos = max(0.0, self.pos + z - self.k)
+            self.neg = max(0.0, self.neg - z - self.k)
+        else:
+            self.segment_count += 1
+            self.segment_mean += (value - self.segment_mean) / self.segment_count
+            z = (value - self.segment_mean) / self.scale
+            self.pos += z - self.k
+            self.neg += -z - self.k
+
+        if self.pos <= self.pos_min:
+            self.pos_min, self.pos_n, self.pos_sum = self.pos, 0, 0.0
+        else:
+            self.pos_n += 1
+            self.pos_sum += value
+        if self.neg <= self.neg_min:
+            self.neg_min, self.neg_n, self.neg_sum = self.neg, 0, 0.0
+        else:
+            self.neg_n += 1
+            self.neg_sum += value
+
+        if self.pos - self.pos_min > self.h:
+            run, total = self.pos_n, self.pos_sum
+        elif self.neg - self.neg_min > self.h:
+            run, total = self.neg_n, self.neg_sum
+        else:
+            return False
+        self.mean = total / run
+        self.var = self.scale ** 2
+        self.fresh = min(run, self.warmup - 1)
+        self._reset_detector(rescale=False)
+        return True
+
+    def recent(self) -> List[float]:
+        """Ring buffer contents, oldest first."""
+        if len(self.ring) < self.window:
+            return list(self.ring)
+        return self.ring[self.ring_pos:] + self.ring[:self.ring_pos]
+
+    def to_state(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> "StreamingRecalibrator":
+        recalibrator = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(recalibrator, name, state[name])
+        recalibrator.ring = list(recalibrator.ring)
+        return recalibrator
+
+
+def update_probe(probe_state: Dict[str, object], value: float, **params: object) -> Dict[str, object]:
+    """Streaming counterpart of :func:`recalibrate`.
+
+    Keeps the compact recalibrator state under ``probe_state["stream"]``
+    instead of appending to ``drift_history``, and only moves
+    ``drift_baseline`` when the change detector fires.
+    """
+    stream = probe_state.get("stream")
+    if isinstance(stream, dict):
+        recalibrator = StreamingRecalibrator.from_state(stream)
+    else:
+        recalibrator = StreamingRecalibrator(**params)
+
+    triggered = recalibrator.update(value)
+    if triggered:
+        probe_state["drift_baseline"] = round(recalibrator.baseline, 3)
+        probe_state["drift_window"] = len(recalibrator.ring)
+        probe_state["recalibrated"] = True
+        probe_state["last_action"] = "baseline updated"
+    else:
+        probe_state["recalibrated"] = False
+    probe_state["stream"] = recalibrator.to_state()
+    return probe_state
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for the batched probe recalibration API")
+
+
+def recalibrate_batch(histories: "np.ndarray", window: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+    """Vectorized :func:`recalibrate` for many probes at once.
+
+    Args:
+        histories: ``(n_probes, n_samples)`` drift values, NaN-padded where a
+            probe has fewer samples.
+        window: Only use each row's last ``window`` columns.
+
+    Returns ``drift_baseline`` (NaN for probes without data) and
+    ``drift_window`` arrays.
+    """
+    _require_numpy()
+    histories = np.atleast_2d(np.asarray(histories, dtype=np.float64))
+    if window is not None:
+        histories = histories[:, -window:]
+    valid = ~np.isnan(histories)
+    counts = valid.sum(axis=1)
+    totals = np.where(valid, histories, 0.0).sum(axis=1)
+    baselines = np.full(histories.shape[0], np.nan)
+    np.divide(totals, counts, out=baselines, where=counts > 0)
+    return {"drift_baseline": np.round(baselines, 3), "drift_window": counts}
+
+
+class BatchRecalibrator:
+    """:class:`StreamingRecalibrator` over a fleet of probes as NumPy arrays.
+
+    Every call to :meth:`update` takes one value per probe (NaN to skip a
+    probe this tick) and updates all statistics, ring buffers and change
+    detectors with array operations.
+    """
+
+    def __init__(
+        self,
+        n_probes: int,
+        alpha: float = 0.05,
+        window: int = 64,
+        method: str = "cusum",
+        k: float = 0.5,
+        h: float = 5.0,
+        warmup: int = 32,
+    ):
+        _require_numpy()
+        if method not in _METHODS:
+            raise ValueError(f"Unknown change detector: {method} (expected one of {_METHODS})")
+        self.alpha = alpha
+        self.window = window
+        self.method = method
+        self.k = k
+        self.h = h
+        self.warmup = warmup
+        self.count = np.zeros(n_probes, dtype=np.int64)
+        self.fresh = np.zeros(n_probes, dtype=np.int64)
+        self.mean = np.zeros(n_probes)
+        self.var = np.zeros(n_probes)
+        self.baseline = np.full(n_probes, np.nan)
+        self.scale = np.ones(n_probes)
+        self.pos = np.zeros(n_probes)
+        self.neg = np.zeros(n_probes)
+        self.pos_min = np.zeros(n_probes)
+        self.neg_min = np.zeros(n_probes)
+        self.pos_n = np.zeros(n_probes, dtype=np.int64)
+        self.neg_n = np.zeros(n_probes, dtype=np.int64)
+        self.pos_sum = np.zeros(n_probes)
+        self.neg_sum = np.zeros(n_probes)
+        self.segment_count = np.zeros(n_probes, dtype=np.int64)
+        self.segment_mean = np.zeros(n_probes)
+        self.ring = np.full((n_probes, window), np.nan)
+        self.recalibrations = np.zeros(n_probes, dtype=np.int64)
+
+    def _reset_detector(self, mask: "np.ndarray", rescale: "np.ndarray") -> None:
+        self.baseline[mask] = self.mean[mask]
+        std = np.sqrt(self.var[rescale])
+        self.scale[rescale] = np.where(std > 0, std, 1.0)
+        for stat in (self.pos, self.neg, self.pos_min, self.neg_min, self.pos_sum, self.neg_sum, self.segment_mean):
+            stat[mask] = 0.0
+        for counter in (self.pos_n, self.neg_n, self.segment_count):
+            counter[mask] = 0
+        self.recalibrations[mask] += 1
+
+    def update(self, values: "np.ndarray") -> "np.ndarray":
+        """Fold one observation per probe in; return the mask of probes recalibrated."""
+        values = np.asarray(values, dtype=np.float64)
+        seen = ~np.isnan(values)
+        rows = np.flatnonzero(seen)
+        self.ring[rows, self.count[rows] % self.window] = values[rows]
+
+        self.count[seen] += 1
+        self.fresh[seen] += 1
+        weight = np.maximum(self.alpha, 1.0 / np.maximum(self.fresh, 1))
+        diff = np.where(seen, values - self.mean, 0.0)
+        increment = weight * diff
+        self.mean = self.mean + increment
+        self.var = np.where(seen, (1 - weight) * (self.var + diff * increment), self.var)
+
+        warmed = seen & (self.fresh == self.warmup)
+        active = seen & (self.fresh > self.warmup)
+
+        if self.method == "cusum":
+            z = np.where(active, values - self.baseline, 0.0) / self.scale
+            self.pos = np.where(active, np.maximum(0.0, self.pos + z - self.k), self.pos)
+            self.neg = np.where(active, np.maximum(0.0, self.neg - z - self.k), self.neg)
+        else:
+            self.segment_count[active] += 1
+            step = np.where(active, values - self.segment_mean, 0.0) / np.maximum(self.segment_count, 1)
+            self.segment_mean = self.segment_mean + step
+            z = np.where(active, values - self.segment_mean, 0.0) / self.scale
+            self.pos = np.where(active, self.pos + z - self.k, self.pos)
+            self.neg = np.where(active, self.neg - z - self.k, self.neg)
+
+        for stat, low, n, total in (
+            (self.pos, self.pos_min, self.pos_n, self.pos_sum),
+            (self.neg, self.neg_min, self.neg_n, self.neg_sum),
+        ):
+            at_min = active & (stat <= low)
+            run = active & ~at_min
+            low[at_min] = stat[at_min]
+            n[at_min] = 0
+            total[at_min] = 0.0
+            n[run] += 1
+            total[run] += values[run]
+
+        pos_shift = active & (self.pos - self.pos_min > self.h)
+        neg_shift = active & ~pos_shift & (self.neg - self.neg_min > self.h)
+        for shift, n, total in ((pos_shift, self.pos_n, self.pos_sum), (neg_shift, self.neg_n, self.neg_sum)):
+            self.mean[shift] = total[shift] / n[shift]
+            self.var[shift] = self.scale[shift] ** 2
+            self.fresh[shift] = np.minimum(n[shift], self.warmup - 1)
+
+        triggered = warmed | pos_shift | neg_shift
+        self._reset_detector(triggered, rescale=warmed)
+        return triggered
+
+    def recent(self) -> "np.ndarray":
+        """Ring buffers as ``(n_probes, window)``, oldest first, NaN-padded."""
+        shift = (self.count % self.window)[:, None]
+        columns = (np.arange(self.window)[None, :] + shift) % self.window
+        return np.take_along_axis(self.ring, columns, axis=1)
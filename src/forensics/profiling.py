@@ -0,0 +1,275 @@
+"""Opt-in slow-call capture and sampled profiling for detector calls."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+PROFILE_ENV = "HARBINGER_PROFILE"
+SLOW_MS_ENV = "HARBINGER_PROFILE_SLOW_MS"
+SAMPLE_ENV = "HARBINGER_PROFILE_SAMPLE"
+MODE_ENV = "HARBINGER_PROFILE_MODE"
+DIR_ENV = "HARBINGER_PROFILE_DIR"
+RING_ENV = "HARBINGER_PROFILE_RING"
+
+MODES = ("cprofile", "stack")
+
+_HASH_CHARS = 16
+_STACK_DEPTH = 64
+
+
+def _describe(value: Any) -> Dict[str, Any]:
+    """Size and truncated digest of one argument, without keeping the value."""
+    if isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+    else:
+        size = len(value) if hasattr(value, "__len__") else None
+        return {"type": type(value).__name__, "size": size}
+    return {"type": type(value).__name__, "size": len(value), "sha256": hashlib.sha256(data).hexdigest()[:_HASH_CHARS]}
+
+
+class Profiler:
+    """Slow-call ring buffer plus cProfile or stack sampling on a fraction of calls.
+
+    Disabled by default; instrumented detectors then pay a single attribute
+    check per call. When ``active``, calls slower than ``slow_ms`` are kept
+    (sizes and truncated hashes of the inputs, never the inputs themselves)
+    in a ring of ``ring_size`` entries, and ``sample_rate`` of calls are run
+    under cProfile or marked for a background stack sampler. Aggregates are
+    written by :meth:`dump`, which :meth:`install_signal_handler` binds to a
+    signal.
+    """
+
+    def __init__(
+        self,
+        active: bool = False,
+        slow_ms: float = 50.0,
+        sample_rate: float = 0.0,
+        mode: str = "cprofile",
+        dump_dir: str = ".",
+        ring_size: int = 256,
+        sample_interval: float = 0.005,
+    ):
+        self.active = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self._stats: Dict[str, "pstats.Stats"] = {}
+        self._stacks: Dict[Tuple[str, str], int] = {}
+        self._marked: Dict[int, str] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.configure(active, slow_ms, sample_rate, mode, dump_dir, ring_size, sample_interval)
+
+    def configure(
+        self,
+        active: Optional[bool] = None,
+        slow_ms: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+        mode: Optional[str] = None,
+        dump_dir: Optional[str] = None,
+        ring_size: Optional[int] = None,
+        sample_interval: Optional[float] = None,
+    ) -> None:
+        """Update settings; arguments left as None keep their current value."""
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected one of {MODES})")
+        if slow_ms is not None:
+            self.slow_seconds = slow_ms / 1000.0
+        if sample_rate is not None:
+            self.sample_rate = max(0.0, min(1.0, sample_rate))
+        if mode is not None:
+            self.mode = mode
+        if dump_dir is not None:
+            self.dump_dir = dump_dir
+        if ring_size is not None and ring_size != self._slow.maxlen:
+            self._slow = deque(self._slow, maxlen=ring_size)
+        if sample_interval is not None:
+            self.sample_interval = sample_interval
+        if active is not None:
+            self.active = active
+            if not active:
+                self._stop.set()
+
+    def call(self, detector: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run ``func``, sampling it when selected; the caller times the call."""
+        if not self.sample_rate or random.random() >= self.sample_rate or getattr(self._local, "busy", False):
+            return func(*args, **kwargs)
+        self._local.busy = True
+        try:
+            if self.mode == "cprofile":
+                return self._profile_call(detector, func, args, kwargs)
+            return self._mark_call(detector, func, args, kwargs)
+        finally:
+            self._local.busy = False
+
+    def _profile_call(self, detector: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        # cProfile and pstats cost more to import than most detectors; load them only once sampling starts.
+        import cProfile
+        import io
+        import pstats
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler already owns this interpreter
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            stats = pstats.Stats(profile, stream=io.StringIO())
+            with self._lock:
+                if detector in self._stats:
+                    self._stats[detector].add(stats)
+                else:
+                    self._stats[detector] = stats
+
+    def _mark_call(self, detector: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        self._ensure_sampler()
+        ident = threading.get_ident()
+        self._marked[ident] = detector
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._marked.pop(ident, None)
+
+    def _ensure_sampler(self) -> None:
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive():
+                return
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="harbinger-profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.sample_interval):
+            if not self._marked:
+                continue
+            frames = sys._current_frames()
+            for ident, detector in list(self._marked.items()):
+                frame = frames.get(ident)
+                parts: List[str] = []
+                while frame is not None and len(parts) < _STACK_DEPTH:
+                    code = frame.f_code
+                    parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = (detector, ";".join(reversed(parts)))
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+
+    def record_slow(self, detector: str, seconds: float, args: tuple, kwargs: dict) -> None:
+        """Keep a slow call's timing and input fingerprints in the ring."""
+        self._slow.append({
+            "detector": detector,
+            "at": time.time(),
+            "elapsed_ms": round(seconds * 1000, 3),
+            "thread": threading.current_thread().name,
+            "args": [_describe(value) for value in args],
+            "kwargs": {name: _describe(value) for name, value in kwargs.items()},
+        })
+
+    def slow_calls(self) -> List[Dict[str, Any]]:
+        return list(self._slow)
+
+    def snapshot(self, top: int = 25) -> Dict[str, Any]:
+        """Slow calls, the top cumulative cProfile rows per detector and folded stacks."""
+        profiles = {}
+        with self._lock:
+            for detector, stats in self._stats.items():
+                rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+                profiles[detector] = [
+                    {
+                        "function": f"{os.path.basename(filename)}:{line}({name})",
+                        "calls": primitive,
+                        "total_seconds": round(total, 6),
+                        "cumulative_seconds": round(cumulative, 6),
+                    }
+                    for (filename, line, name), (primitive, _, total, cumulative, _) in rows
+                ]
+            stacks = dict(self._stacks)
+        return {
+            "slow_calls": self.slow_calls(),
+            "slow_ms": self.slow_seconds * 1000,
+            "sample_rate": self.sample_rate,
+            "mode": self.mode,
+            "profiles": profiles,
+            "stacks": {f"{detector};{stack}": count for (detector, stack), count in stacks.items()},
+        }
+
+    def dump(self, directory: Optional[str] = None) -> List[str]:
+        """Write the snapshot as JSON, pstats files per detector and a folded stack file."""
+        directory = directory or self.dump_dir
+        os.makedirs(directory, exist_ok=True)
+        stamp = f"{os.getpid()}-{int(time.time())}"
+        written = []
+        path = os.path.join(directory, f"harbinger-profile-{stamp}.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.snapshot(), handle, indent=2)
+        written.append(path)
+        with self._lock:
+            stats = dict(self._stats)
+            stacks = dict(self._stacks)
+        for detector, detector_stats in stats.items():
+            path = os.path.join(directory, f"harbinger-profile-{stamp}-{detector}.pstats")
+            detector_stats.dump_stats(path)
+            written.append(path)
+        if stacks:
+            path = os.path.join(directory, f"harbinger-profile-{stamp}.folded")
+            with open(path, "w", encoding="utf-8") as handle:
+                for (detector, stack), count in sorted(stacks.items()):
+                    handle.write(f"{detector};{stack} {count}\n")
+            written.append(path)
+        return written
+
+    def reset(self) -> None:
+        with self._lock:
+            self._slow.clear()
+            self._stats.clear()
+            self._stacks.clear()
+
+    def install_signal_handler(self, signum: Optional[int] = None) -> bool:
+        """Dump on ``signum`` (SIGUSR1 by default). Only possible from the main thread."""
+        signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, self._dump_from_signal)
+        return True
+
+    def _dump_from_signal(self, *_: Any) -> None:
+        # The handler runs on the main thread between bytecodes, possibly while that thread holds
+        # self._lock; dumping on another thread lets it wait for the lock instead of deadlocking.
+        threading.Thread(target=self.dump, name="harbinger-profile-dump", daemon=True).start()
+
+
+def _from_env() -> Profiler:
+    profiler = Profiler(
+        active=os.environ.get(PROFILE_ENV, "0") not in ("", "0"),
+        slow_ms=float(os.environ.get(SLOW_MS_ENV, 50.0)),
+        sample_rate=float(os.environ.get(SAMPLE_ENV, 0.0)),
+        mode=os.environ.get(MODE_ENV, "cprofile"),
+        dump_dir=os.environ.get(DIR_ENV, "."),
+        ring_size=int(os.environ.get(RING_ENV, 256)),
+    )
+    if profiler.active:
+        profiler.install_signal_handler()
+    return profiler
+
+
+_profiler = _from_env()
+
+
+def get_profiler() -> Profiler:
+    return _profiler
@@ -5,6 +5,8 @@ from __future__ import annotations
 import re
 from typing import Dict
 
+from .metrics import instrument
+
 
 _PSYOP_TERMS = [
     "propaganda",
@@ -32,7 +34,11 @@ _AUTHORITATIVE_TERMS = [
     "leaked",
 ]
 
+# Every term score_influence() counts; it matches them as substrings of text.lower().
+INFLUENCE_TERMS = tuple(_PSYOP_TERMS + _EMOTION_TERMS + _AUTHORITATIVE_TERMS)
+
 
+@instrument("psyop_scorer", verdict_key=None)
 def score_influence(text: str) -> Dict[str, float]:
     """Score persuasive influence cues in text."""
     if not text:
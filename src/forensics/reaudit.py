@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Transcript Re-Audit
+
+Re-scores archived JSONL transcript stores with the current detectors after
+a detector or threshold update, without spawning a CLI per record.
+
+Each input file is memory-mapped and cut into byte-range shards that end on
+line boundaries. Shards are scored in a process pool; every shard writes its
+own result file (atomically, via rename) and is recorded in a checkpoint, so
+an interrupted run resumes with only the unfinished shards. When all shards
+are done their results are concatenated, in input order, into one merged
+file.
+
+Each transcript line is a JSON object. Detectors read:
+  machiavellian_delta  internal_trace (or reasoning) + external_output
+  injection_detector   prompt (or input), falling back to the output text
+  psyop_scorer, sere_evaluator, watermark_scanner
+                       external_output (or output, response, text, content)
+An optional tenant field is passed to the tenant-aware detectors. Detectors
+whose fields are missing are skipped for that record.
+
+Usage:
+    reaudit.py <out_dir> <transcripts.jsonl> [more.jsonl ...] [--workers n] [--shard-mb n] [--detectors a,b]
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import verdict_label
+from .registry import get_detector
+
+DEFAULT_DETECTORS = (
+    'machiavellian_delta',
+    'injection_detector',
+    'psyop_scorer',
+    'sere_evaluator',
+    'watermark_scanner',
+)
+
+MAX_SHARD_BYTES = 64 << 20
+MIN_SHARD_BYTES = 1 << 20
+
+CHECKPOINT_NAME = 'checkpoint.jsonl'
+MERGED_NAME = 'reaudit.jsonl'
+SHARD_DIR = 'shards'
+
+_OUTPUT_FIELDS = ('external_output', 'output', 'response', 'text', 'content')
+_PROMPT_FIELDS = ('prompt', 'input')
+_TRACE_FIELDS = ('internal_trace', 'reasoning')
+_ID_FIELDS = ('id', 'transcript_id', 'session_id')
+# Shard stats saved in each checkpoint entry, with their values for entries that predate them.
+_EMPTY_STATS = (('records', 0), ('errors', 0), ('skipped', {}), ('verdicts', {}))
+
+
+def _first(record: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def _pair_args(record: Dict[str, Any]) -> Optional[tuple]:
+    internal, external = _first(record, _TRACE_FIELDS), _first(record, _OUTPUT_FIELDS)
+    if internal is None or external is None:
+        return None
+    return internal, external, record.get('tenant')
+
+
+def _prompt_args(record: Dict[str, Any]) -> Optional[tuple]:
+    text = _first(record, _PROMPT_FIELDS) or _first(record, _OUTPUT_FIELDS)
+    return None if text is None else (text, record.get('tenant'))
+
+
+def _output_args(record: Dict[str, Any]) -> Optional[tuple]:
+    text = _first(record, _OUTPUT_FIELDS)
+    return None if text is None else (text,)
+
+
+def _tenant_output_args(record: Dict[str, Any]) -> Optional[tuple]:
+    text = _first(record, _OUTPUT_FIELDS)
+    return None if text is None else (text, record.get('tenant'))
+
+
+# registry name -> (builds positional arguments from a record or None to skip, verdict key)
+_DETECTORS: Dict[str, Tuple[Callable[[Dict[str, Any]], Optional[tuple]], Optional[str]]] = {
+    'machiavellian_delta': (_pair_args, 'verdict'),
+    'injection_detector': (_prompt_args, 'detected'),
+    'psyop_scorer': (_output_args, None),
+    'sere_evaluator': (_tenant_output_args, 'recommendation'),
+    'watermark_scanner': (_output_args, 'detected'),
+}
+
+
+def plan_shards(path: str, shard_bytes: int) -> List[Tuple[int, int]]:
+    """Split a file into [start, end) byte ranges of about shard_bytes, each ending after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    shards = []
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        start = 0
+        while start < size:
+            end = start + shard_bytes
+            if end >= size:
+                end = size
+            else:
+                newline = mapped.find(b'\n', end - 1)
+                end = size if newline == -1 else newline + 1
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def _iter_lines(mapped: mmap.mmap, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    position = start
+    while position < end:
+        newline = mapped.find(b'\n', position, end)
+        stop = end if newline == -1 else newline
+        yield position, mapped[position:stop]
+        position = stop + 1
+
+
+def audit_shard(path: str, start: int, end: int, detectors: Tuple[str, ...], out_path: str) -> Dict[str, Any]:
+    """Score every record in one shard and write the results to out_path.
+
+    Results go to a temporary file renamed into place at the end, so a
+    result file only exists once its shard is complete.
+    """
+    functions = {name: get_detector(name) for name in detectors}
+    stats: Dict[str, Any] = {'records': 0, 'errors': 0, 'skipped': {}, 'verdicts': {}}
+    partial = out_path + '.part'
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+            open(partial, 'w', encoding='utf-8') as output:
+        for offset, line in _iter_lines(mapped, start, end):
+            if not line.strip():
+                continue
+            stats['records'] += 1
+            result: Dict[str, Any] = {'source': path, 'offset': offset}
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError('record is not a JSON object')
+            except ValueError as exc:
+                stats['errors'] += 1
+                result['error'] = f'{type(exc).__name__}: {exc}'
+                output.write(json.dumps(result, sort_keys=True) + '\n')
+                continue
+
+            record_id = next((record[field] for field in _ID_FIELDS if record.get(field) is not None), None)
+            if record_id is not None:
+                result['id'] = record_id
+            scores: Dict[str, Any] = {}
+            for name, function in functions.items():
+                build, verdict_key = _DETECTORS[name]
+                args = build(record)
+                if args is None:
+                    stats['skipped'][name] = stats['skipped'].get(name, 0) + 1
+                    continue
+                try:
+                    scores[name] = function(*args)
+                except Exception as exc:  # one bad record must not lose the shard
+                    stats['errors'] += 1
+                    scores[name] = {'error': f'{type(exc).__name__}: {exc}'}
+                    continue
+                verdict = verdict_label(scores[name], verdict_key)
+                if verdict is not None:
+                    counts = stats['verdicts'].setdefault(name, {})
+                    counts[verdict] = counts.get(verdict, 0) + 1
+            result['scores'] = scores
+            output.write(json.dumps(result, sort_keys=True, default=str) + '\n')
+    os.replace(partial, out_path)
+    return stats
+
+
+def _shard_key(source: Dict[str, Any], start: int, end: int, detectors: Tuple[str, ...]) -> Tuple:
+    return source['path'], source['size'], source['mtime_ns'], start, end, ','.join(detectors)
+
+
+def load_checkpoint(checkpoint_path: str) -> Tuple[Dict[Tuple, Dict[str, Any]], Optional[int]]:
+    """Return the shards completed by earlier runs, keyed to their stats, and the shard size they used."""
+    done: Dict[Tuple, Dict[str, Any]] = {}
+    shard_bytes = None
+    if not os.path.exists(checkpoint_path):
+        return done, shard_bytes
+    with open(checkpoint_path, 'r', encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:  # torn final line from an interrupted run
+                continue
+            if os.path.exists(entry.get('result', '')):
+                key = (entry['path'], entry['size'], entry['mtime_ns'], entry['start'], entry['end'],
+                       entry['detectors'])
+                done[key] = {field: entry.get(field, empty) for field, empty in _EMPTY_STATS}
+                shard_bytes = entry.get('shard_bytes', shard_bytes)
+    return done, shard_bytes
+
+
+def _add_stats(summary: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    summary['records'] += stats['records']
+    summary['errors'] += stats['errors']
+    for name, count in stats['skipped'].items():
+        summary['skipped'][name] = summary['skipped'].get(name, 0) + count
+    for name, counts in stats['verdicts'].items():
+        totals = summary['verdicts'].setdefault(name, {})
+        for verdict, count in counts.items():
+            totals[verdict] = totals.get(verdict, 0) + count
+
+
+def _merge(shards: List[Tuple[Dict[str, Any], int, int, str]], merged_path: str) -> None:
+    partial = merged_path + '.part'
+    with open(partial, 'wb') as output:
+        for _, _, _, result_path in shards:
+            with open(result_path, 'rb') as handle:
+                shutil.copyfileobj(handle, output, MIN_SHARD_BYTES)
+    os.replace(partial, merged_path)
+
+
+def reaudit(
+    paths: List[str],
+    out_dir: str,
+    detectors: Tuple[str, ...] = DEFAULT_DETECTORS,
+    workers: Optional[int] = None,
+    shard_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Re-score JSONL transcript files across a process pool, resuming from out_dir's checkpoint.
+
+    Without ``shard_bytes`` the input is cut into about four shards per
+    worker (between 1 and 64 MiB each) so uneven shards still balance; a
+    resumed run reuses the checkpoint's shard size. Changing the detectors
+    or modifying an input file rescores the affected shards. Returns a run
+    summary.
+    """
+    started = time.perf_counter()
+    unknown = [name for name in detectors if name not in _DETECTORS]
+    if unknown:
+        raise KeyError(f'Unsupported detectors: {unknown} (supported: {", ".join(_DETECTORS)})')
+    workers = workers or os.cpu_count() or 1
+    sources = []
+    for path in paths:
+        stat = os.stat(path)
+        sources.append({'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+    total_bytes = sum(source['size'] for source in sources)
+
+    shard_dir = os.path.join(out_dir, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    checkpoint_path = os.path.join(out_dir, CHECKPOINT_NAME)
+    done, previous_shard_bytes = load_checkpoint(checkpoint_path)
+    if shard_bytes is None:
+        shard_bytes = previous_shard_bytes or min(
+            MAX_SHARD_BYTES, max(MIN_SHARD_BYTES, total_bytes // (workers * 4) + 1)
+        )
+
+    shards = []
+    for index, source in enumerate(sources):
+        stem = os.path.splitext(os.path.basename(source['path']))[0]
+        for start, end in plan_shards(source['path'], shard_bytes):
+            result_path = os.path.join(shard_dir, f'{index:04d}-{stem}-{start:014d}.jsonl')
+            shards.append((source, start, end, result_path))
+
+    summary: Dict[str, Any] = {
+        'files': len(sources), 'bytes': total_bytes, 'shards': len(shards), 'resumed_shards': 0,
+        'records': 0, 'errors': 0, 'skipped': {}, 'verdicts': {}, 'workers': workers, 'shard_bytes': shard_bytes,
+    }
+
+    def record(checkpoint, shard, stats: Dict[str, Any]) -> None:
+        source, start, end, result_path = shard
+        entry = {**source, 'start': start, 'end': end, 'detectors': ','.join(detectors), 'result': result_path,
+                 'shard_bytes': shard_bytes, **stats}
+        checkpoint.write(json.dumps(entry, sort_keys=True) + '\n')
+        checkpoint.flush()
+        _add_stats(summary, stats)
+
+    with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, ProcessPoolExecutor(workers) as pool:
+        pending = {}
+        for shard in shards:
+            source, start, end, result_path = shard
+            resumed = done.get(_shard_key(source, start, end, detectors))
+            if resumed is not None:
+                summary['resumed_shards'] += 1
+                _add_stats(summary, resumed)
+                continue
+            pending[pool.submit(audit_shard, source['path'], start, end, detectors, result_path)] = shard
+            if len(pending) >= workers * 4:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(checkpoint, pending.pop(future), future.result())
+        for future in list(pending):
+            record(checkpoint, pending.pop(future), future.result())
+
+    merged_path = os.path.join(out_dir, MERGED_NAME)
+    _merge(shards, merged_path)
+    summary['merged'] = merged_path
+    summary['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def main():
+    """CLI interface for transcript re-audit."""
+    usage = {
+        'error': 'Usage: reaudit.py <out_dir> <transcripts.jsonl> [more.jsonl ...] '
+                 '[--workers n] [--shard-mb n] [--detectors a,b]',
+        'defaults': {'workers': os.cpu_count(), 'detectors': list(DEFAULT_DETECTORS)},
+    }
+    args = sys.argv[1:]
+    positional = []
+    while args and not args[0].startswith('--'):
+        positional.append(args.pop(0))
+    options = dict(zip(args[::2], args[1::2]))
+    if len(positional) < 2 or len(args) % 2 or set(options) - {'--workers', '--shard-mb', '--detectors'}:
+        print(json.dumps(usage))
+        sys.exit(1)
+
+    out_dir, paths = positional[0], positional[1:]
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        print(json.dumps({'error': f'Transcript files not found: {missing}'}))
+        sys.exit(1)
+
+    try:
+        result = reaudit(
+            paths,
+            out_dir,
+            tuple(options['--detectors'].split(',')) if '--detectors' in options else DEFAULT_DETECTORS,
+            workers=int(options['--workers']) if '--workers' in options else None,
+            shard_bytes=int(float(options['--shard-mb']) * (1 << 20)) if '--shard-mb' in options else None,
+        )
+    except KeyError as exc:
+        print(json.dumps({'error': str(exc.args[0])}))
+        sys.exit(1)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
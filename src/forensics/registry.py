@@ -0,0 +1,96 @@
+"""Detector registry with lazy resolution."""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class DetectorSpec:
+    """Where a detector lives and what it needs.
+
+    ``target`` is ``"module:attribute"`` relative to this package; the
+    module is imported only when the detector is first requested.
+    ``requires`` lists optional third-party imports.
+    """
+
+    name: str
+    target: str
+    summary: str
+    requires: Tuple[str, ...] = ()
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(":")[0]
+
+
+DETECTORS: Dict[str, DetectorSpec] = {
+    spec.name: spec
+    for spec in (
+        DetectorSpec("injection_detector", "injection_detector:detect", "Prompt-injection indicators."),
+        DetectorSpec("sere_evaluator", "sere_evaluator:evaluate_response", "Safety-posture adherence of a response."),
+        DetectorSpec("psyop_scorer", "psyop_scorer:score_influence", "Persuasive influence cues."),
+        DetectorSpec("trigger_engine", "TriggerEngine:evaluate_triggers", "Residual-monitoring triggers."),
+        DetectorSpec("watermark_scanner", "watermark_scanner:scan", "Textual provenance watermarks."),
+        DetectorSpec("machiavellian_delta", "machiavellian_delta:calculate", "Quick internal/external divergence."),
+        DetectorSpec(
+            "machiavellian_delta_report",
+            "machiavellian_delta:calculate_machiavellian_delta",
+            "Full Machiavellian Delta analysis with risk level.",
+        ),
+        DetectorSpec(
+            "machiavellian_divergence", "machiavellian_delta:score_divergence", "Jaccard divergence with verdict."
+        ),
+        DetectorSpec("ghost_autopsy", "ghost_autopsy:compare_traces", "Token-aligned split-brain comparison."),
+        DetectorSpec(
+            "epistemic_narrowing_monitor", "epistemic_narrowing_monitor:monitor", "Single-text diversity check."
+        ),
+        DetectorSpec(
+            "epistemic_narrowing_report",
+            "epistemic_narrowing_monitor:monitor_epistemic_narrowing",
+            "Interaction-history narrowing and reinforcement loops.",
+        ),
+        DetectorSpec("bec_i", "bec_i_calculator:calculate_coupling", "Behavior-environment coupling index."),
+        DetectorSpec("sandbagging", "audit_tools:detect_sandbagging", "Expressed vs latent capability gap."),
+        DetectorSpec("star_chamber", "star_chamber_consensus:initiate_star_chamber", "Open a consensus session."),
+        DetectorSpec("wazuh_compile", "wazuh_mcp_bridge:compile_nl_to_siem", "Compile security intent to a rule."),
+        DetectorSpec("wazuh_query", "wazuh_mcp_bridge:query_siem_logs", "Compile a SIEM log query."),
+        DetectorSpec("cascade", "cascade:evaluate", "Prefilter-gated run of the expensive analyses."),
+        DetectorSpec("metadata_stripper", "metadata_stripper:strip_and_hash", "Strip JPEG metadata with custody."),
+        DetectorSpec(
+            "media_triage", "media_triage:triage_file", "Sniff, hash and extract media metadata.",
+            ("filetype", "exifread", "cv2", "soundfile", "librosa", "hachoir"),
+        ),
+    )
+}
+
+_resolved: Dict[str, Callable] = {}
+
+
+def list_detectors() -> List[Dict[str, object]]:
+    """Describe every registered detector without importing any of them."""
+    return [
+        {"name": spec.name, "target": spec.target, "summary": spec.summary, "requires": list(spec.requires)}
+        for spec in DETECTORS.values()
+    ]
+
+
+def get_detector(name: str) -> Callable:
+    """Import the detector's module on first use and return its entry point."""
+    detector = _resolved.get(name)
+    if detector is not None:
+        return detector
+    spec = DETECTORS.get(name)
+    if spec is None:
+        raise KeyError(f"Unknown detector: {name} (known: {', '.join(sorted(DETECTORS))})")
+    module_name, _, attribute = spec.target.partition(":")
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    detector = _resolved[name] = getattr(module, attribute)
+    return detector
+
+
+def run(name: str, *args, **kwargs):
+    """Resolve and call a detector."""
+    return get_detector(name)(*args, **kwargs)
@@ -0,0 +1,441 @@
+"""Streaming aggregations over local Wazuh alert files.
+
+One pass over JSON-lines alert files (e.g. ``/var/ossec/logs/alerts/alerts.json``)
+evaluates a compiled query and feeds every matching alert to a set of
+operators, each in bounded memory:
+
+* ``count``: exact counts per group of ``by`` fields (at most :data:`MAX_GROUPS` groups)
+* ``histogram``: counts per time bucket of ``interval`` (e.g. ``"1h"``), optionally per group
+* ``distinct``: approximate distinct values of ``field`` via :class:`HyperLogLog`
+* ``top``: the ``k`` heaviest values of ``field`` via Space-Saving, with error bounds
+
+Fields are dotted paths (``rule.id``, ``data.srcip``); list values such as
+``rule.groups`` count once per element.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .event_log_index import _to_epoch
+from .fleet_themes import SpaceSaving
+from .streaming import iter_lines
+
+
+DEFAULT_ALERTS_PATH = "/var/ossec/logs/alerts/alerts.json"
+MAX_GROUPS = 10_000
+MAX_DISTINCT_GROUPS = 1024
+DEFAULT_PRECISION = 12
+DEFAULT_TOP_K = 10
+DEFAULT_LIMIT = 100
+
+OTHER = "__other__"
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$")
+_TERM = re.compile(r"^([\w.@-]+)(<=|>=|!=|=|<|>|~)(.*)$")
+# Values that appear verbatim in any JSON encoding of a line that matches them. Non-ASCII characters
+# and "/" may be written as escapes ("\u00e9", "\/"), so only ASCII letters, digits and ._:@- qualify.
+_LITERAL = re.compile(r"^[A-Za-z_][\w.:@-]*$", re.ASCII)
+
+
+def parse_duration(value: Any) -> float:
+    """Seconds in ``value``: a number of seconds or a string such as ``"15m"``, ``"1h"``, ``"7d"``."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        match = _DURATION.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid duration: {value!r}")
+        seconds = float(match.group(1)) * _UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: {value!r}")
+    return seconds
+
+
+def _epoch(value: Any) -> Optional[float]:
+    # Wazuh writes offsets without a colon ("...000+0000"), which fromisoformat only accepts from 3.11.
+    if isinstance(value, str) and len(value) > 5 and value[-5] in "+-" and value[-4:].isdigit():
+        value = f"{value[:-2]}:{value[-2:]}"
+    return _to_epoch(value)
+
+
+def _getter(field: str) -> Callable[[Dict[str, Any]], List[Any]]:
+    """An accessor for a dotted field path returning its scalar values (``[]`` when missing)."""
+    path = tuple(field.split("."))
+
+    def values(record: Dict[str, Any]) -> List[Any]:
+        value: Any = record
+        try:
+            for part in path:
+                value = value[part]
+        except (KeyError, TypeError, IndexError):
+            return []
+        if isinstance(value, list):
+            return [item for item in value if item is not None and not isinstance(item, (dict, list))]
+        if value is None or isinstance(value, dict):
+            return []
+        return [value]
+
+    return values
+
+
+def _compare(value: Any, operator: str, expected: str) -> bool:
+    if operator == "~":
+        return expected.lower() in str(value).lower()
+    try:
+        left, right = float(value), float(expected)
+    except (TypeError, ValueError):
+        left, right = str(value), expected
+    if operator == "=":
+        return left == right
+    if operator == "!=":
+        return left != right
+    if operator == ">=":
+        return left >= right
+    if operator == "<=":
+        return left <= right
+    if operator == ">":
+        return left > right
+    return left < right
+
+
+def _numeric(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def compile_query(query: Optional[str]) -> Tuple[Callable[[Dict[str, Any]], bool], List[str]]:
+    """Compile a Wazuh API style query (``;`` = and, ``,`` = or) into a predicate.
+
+    Terms are ``field<op>value`` with ``=``, ``!=``, ``<``, ``<=``, ``>``,
+    ``>=`` or ``~`` (case-insensitive substring). Also returns literals
+    that every matching line must contain, used to skip parsing lines that
+    cannot match.
+    """
+    clauses = []
+    required = []
+    for clause in filter(None, (query or "").split(";")):
+        alternatives = []
+        for term in clause.split(","):
+            match = _TERM.match(term.strip())
+            if not match:
+                raise ValueError(f"Invalid query term: {term!r}")
+            field, operator, expected = match.groups()
+            alternatives.append((_getter(field), operator, expected))
+        clauses.append(alternatives)
+        if len(alternatives) == 1:
+            _, operator, expected = alternatives[0]
+            if operator == "=" and _LITERAL.match(expected) and not _numeric(expected):
+                required.append(expected)
+
+    def matches(record: Dict[str, Any]) -> bool:
+        for alternatives in clauses:
+            for values_of, operator, expected in alternatives:
+                values = values_of(record)
+                if operator == "!=" and not values:
+                    break
+                if any(_compare(value, operator, expected) for value in values):
+                    break
+            else:
+                return False
+        return True
+
+    return matches, required
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with ``2 ** precision`` one-byte registers.
+
+    The standard error is about ``1.04 / sqrt(2 ** precision)`` (1.6% at
+    the default precision of 12, in 4 KiB); small cardinalities fall back
+    to linear counting. Sketches with equal precision merge losslessly.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+        width = 64 - self.precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        histogram = Counter(self.registers)
+        estimate = alpha * m * m / sum(count * 2.0 ** -rank for rank, count in histogram.items())
+        zeros = histogram.get(0, 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": self.registers.hex()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray.fromhex(state["registers"])
+        return sketch
+
+
+def _bucket_label(start: float) -> str:
+    return datetime.fromtimestamp(start, timezone.utc).isoformat()
+
+
+_NO_GROUP: List[Tuple] = [()]
+
+
+def _keyer(by: List[str]) -> Callable[[Dict[str, Any]], Iterable[Tuple]]:
+    """Group keys of a record for the ``by`` fields: one per combination of their values."""
+    if not by:
+        return lambda record: _NO_GROUP
+    getters = [_getter(field) for field in by]
+    if len(getters) == 1:
+        values_of = getters[0]
+        return lambda record: [(str(value),) for value in values_of(record)]
+    return lambda record: itertools.product(*(map(str, values_of(record)) for values_of in getters))
+
+
+class _Aggregator:
+    """One operator's state; ``add`` sees every matching alert and its epoch timestamp."""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.op = spec.get("op")
+        by = spec.get("by") or []
+        self.by = [by] if isinstance(by, str) else list(by)
+        self._keys = _keyer(self.by)
+        self.field = spec.get("field")
+        self._values = _getter(self.field) if self.field else None
+        self.limit = int(spec.get("limit", DEFAULT_LIMIT))
+        self.name = spec.get("name") or ":".join([self.op or "?"] + ([self.field] if self.field else []) + self.by)
+        self.truncated = False
+
+        if self.op in ("distinct", "top") and not self.field:
+            raise ValueError(f"Aggregation {self.name} needs a field")
+        # The operator's update is chosen once here; add() runs for every matching alert.
+        if self.op == "count":
+            self.groups: Dict[Tuple, int] = {}
+            self.add = self._add_count
+        elif self.op == "histogram":
+            self.interval = parse_duration(spec.get("interval", "1h"))
+            self.groups = {}
+            self._series: set = set()
+            self.add = self._add_histogram
+        elif self.op == "distinct":
+            self.precision = int(spec.get("precision", DEFAULT_PRECISION))
+            self.sketches: Dict[Tuple, HyperLogLog] = {}
+            self.add = self._add_distinct
+        elif self.op == "top":
+            self.k = int(spec.get("k", DEFAULT_TOP_K))
+            # Extra counters make the reported top k reliable under skew.
+            self.summary = SpaceSaving(int(spec.get("capacity", max(10 * self.k, 100))))
+            self.add = self._add_top
+        else:
+            raise ValueError(f"Unknown aggregation op: {self.op!r}")
+
+    def _slot(self, table: Any, key: Tuple, cap: int) -> Tuple:
+        if key in table or len(table) < cap:
+            return key
+        # Past the cap, new groups share one catch-all group.
+        self.truncated = True
+        return (OTHER,) * len(key)
+
+    def _add_count(self, record: Dict[str, Any], timestamp: Optional[float]) -> None:
+        groups = self.groups
+        for key in self._keys(record):
+            if key not in groups:
+                key = self._slot(groups, key, MAX_GROUPS)
+                groups.setdefault(key, 0)
+            groups[key] += 1
+
+    def _add_histogram(self, record: Dict[str, Any], timestamp: Optional[float]) -> None:
+        if timestamp is None:
+            return
+        bucket = timestamp // self.interval * self.interval
+        groups, series = self.groups, self._series
+        for key in self._keys(record):
+            if key not in series:
+                key = self._slot(series, key, MAX_GROUPS)
+                series.add(key)
+            slot = key + (bucket,)
+            groups[slot] = groups.get(slot, 0) + 1
+
+    def _add_distinct(self, record: Dict[str, Any], timestamp: Optional[float]) -> None:
+        values = self._values(record)
+        if not values:
+            return
+        for key in self._keys(record):
+            sketch = self.sketches.get(key)
+            if sketch is None:
+                key = self._slot(self.sketches, key, MAX_DISTINCT_GROUPS)
+                sketch = self.sketches.get(key)
+                if sketch is None:
+                    sketch = self.sketches[key] = HyperLogLog(self.precision)
+            for value in values:
+                sketch.add(value)
+
+    def _add_top(self, record: Dict[str, Any], timestamp: Optional[float]) -> None:
+        for value in self._values(record):
+            self.summary.add(str(value))
+
+    def _labels(self, key: Tuple) -> Dict[str, Any]:
+        return dict(zip(self.by, key))
+
+    def result(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"op": self.op}
+        if self.field:
+            result["field"] = self.field
+        if self.by:
+            result["by"] = self.by
+        if self.op == "count":
+            ranked = sorted(self.groups.items(), key=lambda item: (-item[1], item[0]))
+            result["groups"] = [{"key": self._labels(key), "count": count} for key, count in ranked[:self.limit]]
+            result["total_groups"] = len(self.groups)
+        elif self.op == "histogram":
+            series: Dict[Tuple, List[Tuple[float, int]]] = {}
+            for key, count in self.groups.items():
+                series.setdefault(key[:-1], []).append((key[-1], count))
+            totals = sorted(series, key=lambda key: (-sum(count for _, count in series[key]), key))
+            result["interval_seconds"] = self.interval
+            result["series"] = [
+                {
+                    "key": self._labels(key),
+                    "buckets": [{"start": _bucket_label(start), "count": count} for start, count in sorted(series[key])],
+                }
+                for key in totals[:self.limit]
+            ]
+            result["total_series"] = len(series)  # includes the catch-all series when truncated
+        elif self.op == "distinct":
+            estimates = sorted(
+                ((key, sketch.count()) for key, sketch in self.sketches.items()), key=lambda item: (-item[1], item[0])
+            )
+            result["relative_error"] = round(1.04 / math.sqrt(1 << self.precision), 4)
+            if self.by:
+                result["groups"] = [
+                    {"key": self._labels(key), "estimate": round(estimate)} for key, estimate in estimates[:self.limit]
+                ]
+            else:
+                result["estimate"] = round(estimates[0][1]) if estimates else 0
+        else:
+            result["k"] = self.k
+            result["items"] = [
+                {"value": value, "count": count, "error": error} for value, count, error in self.summary.top(self.k)
+            ]
+        result["truncated"] = self.truncated
+        return result
+
+
+def _time_bounds(time_range: Optional[Dict[str, Any]], now: Optional[float]) -> Tuple[Optional[float], Optional[float]]:
+    if not time_range:
+        return None, None
+    start, end = _epoch(time_range.get("from")), _epoch(time_range.get("to"))
+    if time_range.get("last") is not None:
+        start = (time.time() if now is None else now) - parse_duration(time_range["last"])
+    return start, end
+
+
+def aggregate_alerts(
+    alerts: Iterable[Any],
+    aggregations: Sequence[Dict[str, Any]],
+    query: Optional[str] = None,
+    time_range: Optional[Dict[str, Any]] = None,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Run ``aggregations`` over the alerts matching ``query`` and ``time_range`` in one pass.
+
+    ``alerts`` may hold dicts or JSON lines as strings; lines that cannot match a
+    literal ``field=value`` term are skipped without parsing, and malformed
+    lines are counted and skipped. ``time_range`` takes ``last`` (e.g.
+    ``"24h"`` before ``now``) or ``from``/``to`` timestamps.
+    """
+    started = time.perf_counter()
+    aggregators = [_Aggregator(spec) for spec in aggregations]
+    names = [aggregator.name for aggregator in aggregators]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate aggregation names: {names}")
+    matches, required = compile_query(query)
+    start, end = _time_bounds(time_range, now)
+    bounded = start is not None or end is not None
+    needs_time = bounded or any(aggregator.op == "histogram" for aggregator in aggregators)
+
+    scanned = skipped = malformed = matched = 0
+    for alert in alerts:
+        scanned += 1
+        if isinstance(alert, str):
+            if required and not all(literal in alert for literal in required):
+                skipped += 1
+                continue
+            if not alert.strip():
+                continue
+            try:
+                alert = json.loads(alert)
+            except ValueError:
+                malformed += 1
+                continue
+            if not isinstance(alert, dict):
+                malformed += 1
+                continue
+        if not matches(alert):
+            continue
+        timestamp = _epoch(alert.get("timestamp")) if needs_time else None
+        if bounded and (timestamp is None or (start is not None and timestamp < start)
+                        or (end is not None and timestamp > end)):
+            continue
+        matched += 1
+        for aggregator in aggregators:
+            aggregator.add(alert, timestamp)
+
+    return {
+        "aggregations": {aggregator.name: aggregator.result() for aggregator in aggregators},
+        "scan": {
+            "alerts_scanned": scanned,
+            "alerts_matched": matched,
+            "skipped_unparsed": skipped,
+            "malformed": malformed,
+            "seconds": round(time.perf_counter() - started, 6),
+        },
+    }
+
+
+def aggregate_alert_files(
+    paths: Any,
+    aggregations: Sequence[Dict[str, Any]],
+    query: Optional[str] = None,
+    time_range: Optional[Dict[str, Any]] = None,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """:func:`aggregate_alerts` over one or more JSON-lines alert files (``-`` for stdin)."""
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    lines = itertools.chain.from_iterable(iter_lines(path) for path in paths)
+    result = aggregate_alerts(lines, aggregations, query, time_range, now)
+    result["scan"]["files"] = paths
+    return result
@@ -6,15 +6,30 @@ Implements multi-agent threshold authorization for high-risk actions.
 Requires unanimous or supermajority consensus from specialized agents.
 
 Implements the operational integrity consensus layer described in H4RB1NG3R v0.05.
+
+Chambers and votes persist across processes when HARBINGER_STAR_CHAMBER_DIR
+names a state directory (see star_chamber_journal); the vote and
+check_status actions require it. Votes carry per-agent keyed signatures
+(see star_chamber_signing); verify re-checks every signature in a log
+segment or state directory.
+
+Usage:
+    star_chamber_consensus.py initiate '{"action_id": "a1", "action_type": "delete_evidence"}'
+    star_chamber_consensus.py vote '{"action_id": "a1", "agent_role": "ciso", "decision": "approve"}'
+    star_chamber_consensus.py check_status '{"action_id": "a1"}'
+    star_chamber_consensus.py verify '{"path": "/var/lib/harbinger/star_chamber"}'
 """
 
 import json
+import os
 import sys
 from typing import Dict, List, Any, Optional
 from enum import Enum
 import hashlib
 from datetime import datetime, timedelta
 
+from .star_chamber_signing import get_keyring, verify_votes
+
 
 class ConsensusType(Enum):
     """Types of consensus requirements."""
@@ -38,13 +53,14 @@ class AgentRole(Enum):
 class Vote:
     """Represents a single agent vote."""
 
-    def __init__(self, agent_role: str, decision: str, rationale: str, confidence: float, signature: str):
+    def __init__(self, agent_role: str, decision: str, rationale: str, confidence: float, signature: str,
+                 timestamp: Optional[str] = None):
         self.agent_role = agent_role
         self.decision = decision  # "approve", "reject", "abstain"
         self.rationale = rationale
         self.confidence = confidence  # 0.0 to 1.0
-        self.signature = signature
-        self.timestamp = datetime.utcnow().isoformat()
+        self.signature = signature  # "<algorithm>:<key id>:<hex>" (see star_chamber_signing)
+        self.timestamp = timestamp or datetime.utcnow().isoformat()
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -56,6 +72,12 @@ class Vote:
             'timestamp': self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Vote':
+        """Restore a vote exported by to_dict(), keeping its original timestamp."""
+        return cls(data['agent_role'], data['decision'], data['rationale'], data['confidence'], data['signature'],
+                   data['timestamp'])
+
 
 class StarChamber:
     """Manages multi-agent consensus for high-risk actions."""
@@ -67,7 +89,8 @@ class StarChamber:
         required_agents: List[str],
         consensus_type: str = "supermajority",
         threshold: Optional[tuple] = None,
-        timeout_seconds: int = 300
+        timeout_seconds: int = 300,
+        keyring=None
     ):
         self.action_id = action_id
         self.action_description = action_description
@@ -75,14 +98,29 @@ class StarChamber:
         self.consensus_type = ConsensusType(consensus_type)
         self.threshold = threshold  # (required_approvals, total_agents)
         self.timeout_seconds = timeout_seconds
+        self.keyring = keyring  # signs and verifies votes; the process-wide KeyRing when None
 
         self.votes: List[Vote] = []
         self.created_at = datetime.utcnow()
         self.resolved_at: Optional[datetime] = None
         self.final_decision: Optional[str] = None
 
-    def add_vote(self, agent_role: str, decision: str, rationale: str, confidence: float) -> Dict[str, Any]:
-        """Add a vote from an agent."""
+    def add_vote(
+        self,
+        agent_role: str,
+        decision: str,
+        rationale: str,
+        confidence: float,
+        signature: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a vote from an agent.
+
+        Without a signature the vote is signed with the agent's key from the
+        keyring. A vote the agent signed itself (over the same fields and
+        its timestamp) is accepted only if the signature verifies.
+        """
         if agent_role not in self.required_agents:
             return {
                 'success': False,
@@ -99,11 +137,17 @@ class StarChamber:
                 'existing_vote': existing_vote.to_dict()
             }
 
-        # Generate cryptographic signature for vote
-        vote_data = f"{agent_role}{decision}{rationale}{confidence}{self.action_id}"
-        signature = hashlib.sha256(vote_data.encode()).hexdigest()[:32]
-
-        vote = Vote(agent_role, decision, rationale, confidence, signature)
+        keyring = self.keyring or get_keyring()
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        if signature is None:
+            try:
+                signature = keyring.sign(self.action_id, agent_role, decision, rationale, confidence, timestamp)
+            except KeyError:
+                return {'success': False, 'error': f'No signing key for agent {agent_role}'}
+        elif not keyring.verify(self.action_id, agent_role, decision, rationale, confidence, timestamp, signature):
+            return {'success': False, 'error': f'Invalid signature from agent {agent_role}'}
+
+        vote = Vote(agent_role, decision, rationale, confidence, signature, timestamp)
         self.votes.append(vote)
 
         # Check if consensus reached
@@ -193,6 +237,10 @@ class StarChamber:
             'voting_record': [v.to_dict() for v in self.votes]
         }
 
+    def verify_votes(self) -> Dict[str, Any]:
+        """Re-verify every vote signature in the voting record."""
+        return verify_votes(((self.action_id, v.to_dict()) for v in self.votes), self.keyring)
+
     def check_timeout(self) -> bool:
         """Check if consensus window has timed out."""
         elapsed = (datetime.utcnow() - self.created_at).total_seconds()
@@ -214,12 +262,35 @@ class StarChamber:
             'timed_out': self.check_timeout()
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], keyring=None) -> 'StarChamber':
+        """Restore a Star Chamber exported by to_dict() (timed_out is recomputed).
+
+        The keyring is not part of the exported state; pass the one the
+        chamber was opened with, or None for the process-wide KeyRing.
+        """
+        chamber = cls(
+            action_id=data['action_id'],
+            action_description=data['action_description'],
+            required_agents=list(data['required_agents']),
+            consensus_type=data['consensus_type'],
+            threshold=tuple(data['threshold']) if data.get('threshold') else None,
+            timeout_seconds=data['timeout_seconds'],
+            keyring=keyring
+        )
+        chamber.created_at = datetime.fromisoformat(data['created_at'])
+        chamber.resolved_at = datetime.fromisoformat(data['resolved_at']) if data.get('resolved_at') else None
+        chamber.final_decision = data.get('final_decision')
+        chamber.votes = [Vote.from_dict(vote) for vote in data.get('votes', [])]
+        return chamber
+
 
 def initiate_star_chamber(
     action_id: str,
     action_description: str,
     action_type: str,
-    context: Dict[str, Any] = None
+    context: Dict[str, Any] = None,
+    journal=None
 ) -> Dict[str, Any]:
     """
     Initiate a Star Chamber consensus process.
@@ -229,6 +300,8 @@ def initiate_star_chamber(
         action_description: Human-readable description
         action_type: Type of action (determines required agents and consensus type)
         context: Optional additional context
+        journal: Optional ChamberJournal that records the chamber so votes
+            survive a restart (see star_chamber_journal)
 
     Returns:
         Dictionary containing Star Chamber session details
@@ -279,6 +352,8 @@ def initiate_star_chamber(
         consensus_type=config['consensus_type'],
         timeout_seconds=context.get('timeout_seconds', 300)
     )
+    if journal is not None:
+        journal.open_chamber(chamber, durable=True)
 
     # Generate evidence span
     evidence_span_id = hashlib.sha256(
@@ -301,22 +376,57 @@ def main():
     if len(sys.argv) < 2:
         print(json.dumps({
             'error': 'Usage: star_chamber_consensus.py <action> <parameters_json>',
-            'actions': ['initiate', 'vote', 'check_status']
+            'actions': ['initiate', 'vote', 'check_status', 'verify']
         }))
         sys.exit(1)
 
     action = sys.argv[1]
     params = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
 
-    if action == 'initiate':
-        result = initiate_star_chamber(
-            action_id=params.get('action_id', 'action_' + str(abs(hash(str(params))))),
-            action_description=params.get('action_description', 'No description provided'),
-            action_type=params.get('action_type', 'unknown'),
-            context=params.get('context', {})
-        )
-    else:
-        result = {'error': f'Unknown action: {action}', 'supported_actions': ['initiate', 'vote', 'check_status']}
+    if action not in ('initiate', 'vote', 'check_status', 'verify'):
+        print(json.dumps({'error': f'Unknown action: {action}', 'supported_actions': ['initiate', 'vote', 'check_status', 'verify']}, indent=2))
+        return
+
+    from .star_chamber_journal import STATE_DIR_ENV, get_journal, iter_logged_votes
+    if action == 'verify':
+        path = params.get('path') or os.environ.get(STATE_DIR_ENV)
+        if not path:
+            print(json.dumps({'error': f'verify requires a path or {STATE_DIR_ENV}'}))
+            sys.exit(1)
+        print(json.dumps(verify_votes(iter_logged_votes(path)), indent=2))
+        return
+
+    journal = get_journal()
+    if journal is None and action != 'initiate':
+        print(json.dumps({'error': f'{action} requires {STATE_DIR_ENV} to name a Star Chamber state directory'}))
+        sys.exit(1)
+
+    try:
+        if action == 'initiate':
+            result = initiate_star_chamber(
+                action_id=params.get('action_id', 'action_' + str(abs(hash(str(params))))),
+                action_description=params.get('action_description', 'No description provided'),
+                action_type=params.get('action_type', 'unknown'),
+                context=params.get('context', {}),
+                journal=journal
+            )
+        elif action == 'vote':
+            result = journal.vote(
+                params['action_id'], params['agent_role'], params['decision'],
+                params.get('rationale', ''), float(params.get('confidence', 1.0)),
+                signature=params.get('signature'), timestamp=params.get('timestamp'), durable=True
+            )
+        else:
+            chamber = journal.get(params['action_id'])
+            if chamber is None:
+                result = {'success': False, 'error': f"Unknown Star Chamber: {params['action_id']}"}
+            else:
+                result = {'success': True, 'chamber_session': chamber.to_dict(), 'consensus': chamber.check_consensus()}
+    except (KeyError, ValueError) as exc:
+        result = {'success': False, 'error': str(exc).strip("'")}
+    finally:
+        if journal is not None:
+            journal.close()
 
     print(json.dumps(result, indent=2))
 
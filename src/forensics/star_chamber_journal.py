@@ -0,0 +1,512 @@
+"""Crash-safe Star Chamber state: a write-ahead log with group-commit fsync and snapshots.
+
+:class:`ChamberJournal` keeps the open chambers in memory and appends every
+lifecycle event (open, vote, close) to a write-ahead log before returning.
+Each record reaches the operating system immediately, so a killed process
+loses nothing; a background thread fsyncs whatever was written since its
+last pass every ``sync_interval`` seconds, so one fsync covers every vote
+in that window instead of one per vote. Callers that need a vote on disk
+before acting pass ``durable=True`` and wait for the next group commit.
+
+Every ``snapshot_every`` records the open chambers are written to an
+atomically replaced snapshot and the log starts a new segment; older
+segments are then deleted. Recovery loads the newest snapshot and replays
+only the records after it. A record torn by a crash at the end of the log
+is truncated away; a failed write (e.g. a full disk) is cut off before the
+error is raised. If the background fsync fails, every later call raises,
+including waiting ``durable`` callers, until the journal is reopened.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .star_chamber_consensus import StarChamber, Vote
+from .star_chamber_signing import STATE_DIR_ENV, KeyRing
+
+
+DEFAULT_SYNC_INTERVAL = 0.01
+DEFAULT_SNAPSHOT_EVERY = 100_000
+
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+_SNAPSHOT_PREFIX = "snapshot-"
+_SNAPSHOT_SUFFIX = ".json"
+
+
+def _name(prefix: str, seq: int, suffix: str) -> str:
+    return f"{prefix}{seq:016d}{suffix}"
+
+
+def _numbered(directory: str, prefix: str, suffix: str) -> List[Tuple[int, str]]:
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix):
+            number = name[len(prefix):-len(suffix)]
+            if number.isdigit():
+                found.append((int(number), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def _fsync_dir(directory: str) -> None:
+    # Makes created, renamed and deleted file names durable (not supported on Windows).
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes) -> Optional[Dict[str, Any]]:
+    """The record framed in ``line`` (without its newline), or None when it is torn or corrupt."""
+    if len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _records(data: bytes, path: str, last: bool) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(end offset, record)`` for a segment's bytes, stopping before a torn final record.
+
+    A bad record anywhere but at the end of the last segment is corruption, not a torn append.
+    """
+    offset = 0
+    while offset < len(data):
+        end = data.find(b"\n", offset)
+        record = _decode(data[offset:end]) if end != -1 else None
+        if record is None:
+            if not last or (end != -1 and end + 1 < len(data)):
+                raise ValueError(f"Corrupt Star Chamber journal record in {path} at byte {offset}")
+            return
+        offset = end + 1
+        yield offset, record
+
+
+def iter_logged_votes(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(action_id, vote)`` for every vote in a log segment, or in a whole state directory.
+
+    For a directory this covers the votes of the chambers in the newest
+    snapshot and those logged after it, as recovery would see them.
+    """
+    if not os.path.isdir(path):
+        with open(path, "rb") as handle:
+            data = handle.read()
+        for _, record in _records(data, path, True):
+            if record["op"] == "vote":
+                yield record["action_id"], record["vote"]
+        return
+
+    snapshot_seq = 0
+    snapshots = _numbered(path, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX)
+    if snapshots:
+        snapshot_seq, snapshot = snapshots[-1]
+        with open(snapshot, encoding="utf-8") as handle:
+            chambers = json.load(handle)["chambers"]
+        for chamber in chambers:
+            for vote in chamber["votes"]:
+                yield chamber["action_id"], vote
+    segments = _numbered(path, _SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+    for index, (_, segment) in enumerate(segments):
+        last = index == len(segments) - 1
+        if not last and segments[index + 1][0] <= snapshot_seq + 1:
+            continue
+        with open(segment, "rb") as handle:
+            data = handle.read()
+        for _, record in _records(data, segment, last):
+            if record["op"] == "vote" and record["seq"] > snapshot_seq:
+                yield record["action_id"], record["vote"]
+
+
+class ChamberJournal:
+    """Open Star Chambers backed by a write-ahead log and snapshots in ``directory``.
+
+    Opening a journal recovers the state left by the previous process;
+    restored chambers sign and verify votes with ``keyring`` (the
+    process-wide KeyRing when None). Methods are thread-safe. Use :meth:`close` (or a ``with`` block) to
+    flush the log on shutdown.
+    """
+
+    def __init__(self, directory: str, sync_interval: float = DEFAULT_SYNC_INTERVAL,
+                 snapshot_every: int = DEFAULT_SNAPSHOT_EVERY, keyring: Optional[KeyRing] = None):
+        if sync_interval <= 0:
+            raise ValueError("sync_interval must be positive")
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.keyring = keyring
+        self.chambers: Dict[str, StarChamber] = {}
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        # Held around fsync and segment rotation so the syncer never fsyncs a closed descriptor.
+        self._sync_lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._seq = 0
+        self._synced_seq = 0
+        self._snapshot_seq = 0
+        self._urgent = False
+        self._idle = False
+        self._closed = False
+        # Set when the syncer dies or a failed write could not be rolled back; the journal then refuses work.
+        self._error: Optional[BaseException] = None
+        self.fsyncs = 0
+        self.snapshots = 0
+
+        self.recovery = self._recover()
+        self._fd, self._segment = self._open_segment()
+        os.fsync(self._fd)  # replayed records may only have reached the page cache before the crash
+        self._synced_seq = self._seq
+        self._syncer = threading.Thread(target=self._sync_loop, name="star-chamber-journal", daemon=True)
+        self._syncer.start()
+
+    # -- recovery ---------------------------------------------------------------------------------------------
+
+    def _recover(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+
+        snapshots = _numbered(self.directory, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX)
+        if snapshots:
+            self._snapshot_seq, path = snapshots[-1]
+            with open(path, encoding="utf-8") as handle:
+                state = json.load(handle)
+            for data in state["chambers"]:
+                chamber = StarChamber.from_dict(data, self.keyring)
+                self.chambers[chamber.action_id] = chamber
+        self._seq = self._snapshot_seq
+
+        segments = _numbered(self.directory, _SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+        replayed = truncated = 0
+        for index, (_, path) in enumerate(segments):
+            last = index == len(segments) - 1
+            if not last and segments[index + 1][0] <= self._snapshot_seq + 1:
+                continue  # every record in this segment is covered by the snapshot
+            with open(path, "rb") as handle:
+                data = handle.read()
+            offset = 0
+            for offset, record in _records(data, path, last):
+                if record["seq"] <= self._snapshot_seq:
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+                replayed += 1
+            if offset < len(data):
+                # A crash tore the final append: drop it so new records start on a clean line.
+                truncated = len(data) - offset
+                with open(path, "r+b") as handle:
+                    handle.truncate(offset)
+                    os.fsync(handle.fileno())
+
+        return {
+            "snapshot_seq": self._snapshot_seq,
+            "replayed": replayed,
+            "truncated_bytes": truncated,
+            "chambers": len(self.chambers),
+            "seconds": round(time.perf_counter() - started, 6),
+        }
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record["op"]
+        if op == "open":
+            chamber = StarChamber.from_dict(record["chamber"], self.keyring)
+            self.chambers[chamber.action_id] = chamber
+        elif op == "vote":
+            chamber = self.chambers[record["action_id"]]
+            chamber.votes.append(Vote.from_dict(record["vote"]))
+            chamber.final_decision = record["final_decision"]
+            resolved_at = record["resolved_at"]
+            chamber.resolved_at = datetime.fromisoformat(resolved_at) if resolved_at else None
+        elif op == "close":
+            self.chambers.pop(record["action_id"], None)
+        else:
+            raise ValueError(f"Unknown Star Chamber journal operation: {op}")
+
+    # -- log --------------------------------------------------------------------------------------------------
+
+    def _open_segment(self) -> Tuple[int, str]:
+        segments = _numbered(self.directory, _SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+        if segments and segments[-1][0] > self._snapshot_seq:
+            path = segments[-1][1]
+        else:
+            path = os.path.join(self.directory, _name(_SEGMENT_PREFIX, self._seq + 1, _SEGMENT_SUFFIX))
+        created = not os.path.exists(path)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        if created:
+            _fsync_dir(self.directory)
+        self._size = os.fstat(fd).st_size
+        return fd, path
+
+    def _check(self) -> None:
+        # Caller holds self._lock.
+        if self._error is not None:
+            raise RuntimeError("Star Chamber journal failed; reopen it to recover") from self._error
+        if self._closed:
+            raise ValueError("Star Chamber journal is closed")
+
+    def _write(self, data: bytes) -> None:
+        # Caller holds self._lock. os.write may write only part of a record (e.g. when the disk fills);
+        # anything partial is cut off again so the segment never holds a torn record mid-log.
+        start, view, written = self._size, memoryview(data), 0
+        try:
+            while written < len(data):
+                count = os.write(self._fd, view[written:])
+                if count == 0:
+                    raise OSError(errno.EIO, "Star Chamber journal write made no progress")
+                written += count
+        except OSError as exc:
+            if written:
+                try:
+                    os.ftruncate(self._fd, start)
+                except OSError:
+                    self._error = exc
+            raise
+        self._size += written
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        # Caller holds self._lock.
+        self._check()
+        record["seq"] = self._seq + 1
+        # One write per record: it is in the page cache (safe from a process crash) once this returns.
+        self._write(_encode(record))
+        self._seq += 1
+        if self._idle:
+            # Only the first record after a commit wakes the syncer; later ones join its batch.
+            self._idle = False
+            self._synced.notify_all()
+        return self._seq
+
+    def _wait(self, seq: int) -> None:
+        # Caller holds self._lock.
+        while self._synced_seq < seq:
+            if self._error is not None:
+                raise RuntimeError("Star Chamber journal failed before the record was synced") from self._error
+            self._urgent = True
+            self._synced.notify_all()
+            self._synced.wait()
+
+    def _sync_loop(self) -> None:
+        try:
+            self._sync_forever()
+        except BaseException as exc:
+            # Durable callers would otherwise wait forever for a commit that never comes.
+            with self._lock:
+                self._error = exc
+                self._synced.notify_all()
+            raise
+
+    def _sync_forever(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed and self._synced_seq >= self._seq:
+                    self._idle = True
+                    self._synced.wait()
+                self._idle = False
+                if self._closed:
+                    return
+                # Let more records join this commit unless a durable caller is waiting.
+                deadline = time.monotonic() + self.sync_interval
+                while not self._urgent and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._synced.wait(remaining)
+            self._commit()
+            if self._seq - self._snapshot_seq >= self.snapshot_every:
+                try:
+                    self.snapshot()
+                except ValueError:
+                    if not self._closed:
+                        raise
+                    return
+
+    def _commit(self) -> None:
+        with self._sync_lock:
+            with self._lock:
+                seq, fd = self._seq, self._fd
+                self._urgent = False
+            if seq > self._synced_seq:
+                os.fsync(fd)
+            with self._lock:
+                self.fsyncs += seq > self._synced_seq
+                self._synced_seq = max(self._synced_seq, seq)
+                self._synced.notify_all()
+
+    # -- chambers ---------------------------------------------------------------------------------------------
+
+    def open_chamber(self, chamber: StarChamber, durable: bool = False) -> int:
+        """Start tracking ``chamber`` and log it; returns the record's sequence number."""
+        with self._lock:
+            if chamber.action_id in self.chambers:
+                raise ValueError(f"Star Chamber already open: {chamber.action_id}")
+            data = chamber.to_dict()
+            del data["timed_out"]
+            seq = self._append({"op": "open", "chamber": data})
+            self.chambers[chamber.action_id] = chamber
+            if durable:
+                self._wait(seq)
+        return seq
+
+    def vote(self, action_id: str, agent_role: str, decision: str, rationale: str, confidence: float,
+             signature: Optional[str] = None, timestamp: Optional[str] = None,
+             durable: bool = False) -> Dict[str, Any]:
+        """Add a vote to an open chamber (see :meth:`StarChamber.add_vote`), logging it when accepted."""
+        with self._lock:
+            chamber = self.chambers.get(action_id)
+            if chamber is None:
+                raise KeyError(f"Unknown Star Chamber: {action_id}")
+            self._check()
+            previous = chamber.final_decision, chamber.resolved_at
+            result = chamber.add_vote(agent_role, decision, rationale, confidence, signature, timestamp)
+            if result["success"]:
+                try:
+                    seq = self._append({
+                        "op": "vote",
+                        "action_id": action_id,
+                        "vote": result["vote_recorded"],
+                        "final_decision": chamber.final_decision,
+                        "resolved_at": chamber.resolved_at.isoformat() if chamber.resolved_at else None,
+                    })
+                except BaseException:
+                    # An unlogged vote must not count: recovery would not see it.
+                    chamber.votes.pop()
+                    chamber.final_decision, chamber.resolved_at = previous
+                    raise
+                if durable:
+                    self._wait(seq)
+        return result
+
+    def close_chamber(self, action_id: str, durable: bool = False) -> StarChamber:
+        """Stop tracking a chamber (e.g. once its decision was acted on) and return it."""
+        with self._lock:
+            chamber = self.chambers.get(action_id)
+            if chamber is None:
+                raise KeyError(f"Unknown Star Chamber: {action_id}")
+            seq = self._append({"op": "close", "action_id": action_id})
+            del self.chambers[action_id]
+            if durable:
+                self._wait(seq)
+        return chamber
+
+    def get(self, action_id: str) -> Optional[StarChamber]:
+        with self._lock:
+            return self.chambers.get(action_id)
+
+    def __len__(self) -> int:
+        return len(self.chambers)
+
+    # -- durability -------------------------------------------------------------------------------------------
+
+    def sync(self) -> None:
+        """Block until every record logged so far is on disk."""
+        with self._lock:
+            self._wait(self._seq)
+
+    def snapshot(self) -> str:
+        """Write the open chambers to a new snapshot, start a new log segment and drop the old ones."""
+        with self._snapshot_lock:
+            with self._sync_lock:
+                with self._lock:
+                    self._check()
+                    seq = self._seq
+                    chambers = []
+                    for chamber in self.chambers.values():
+                        data = chamber.to_dict()
+                        del data["timed_out"]
+                        chambers.append(data)
+                    # Records after the snapshot go to a fresh segment; the old one is synced and retired.
+                    os.fsync(self._fd)
+                    os.close(self._fd)
+                    self._synced_seq = seq
+                    self.fsyncs += 1
+                    self._snapshot_seq = seq
+                    self._fd, self._segment = self._open_segment()
+                    self._synced.notify_all()
+
+            path = os.path.join(self.directory, _name(_SNAPSHOT_PREFIX, seq, _SNAPSHOT_SUFFIX))
+            temporary = path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump({"seq": seq, "chambers": chambers}, handle, separators=(",", ":"))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, path)
+            _fsync_dir(self.directory)
+
+            # Only now is the new snapshot durable, so older snapshots and covered segments can go.
+            for number, old in _numbered(self.directory, _SNAPSHOT_PREFIX, _SNAPSHOT_SUFFIX):
+                if number < seq:
+                    os.remove(old)
+            for number, old in _numbered(self.directory, _SEGMENT_PREFIX, _SEGMENT_SUFFIX):
+                if number <= seq:
+                    os.remove(old)
+            _fsync_dir(self.directory)
+            self.snapshots += 1
+            return path
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_chambers": len(self.chambers),
+                "seq": self._seq,
+                "synced_seq": self._synced_seq,
+                "snapshot_seq": self._snapshot_seq,
+                "fsyncs": self.fsyncs,
+                "snapshots": self.snapshots,
+                "segment": os.path.basename(self._segment),
+                "recovery": dict(self.recovery),
+            }
+
+    def close(self) -> None:
+        """Sync the log and stop the background syncer."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._synced.notify_all()
+        self._syncer.join()
+        try:
+            if self._error is None:
+                self._commit()  # also wakes durable callers still waiting
+        finally:
+            with self._sync_lock:
+                os.close(self._fd)
+
+    def __enter__(self) -> "ChamberJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default_journal: Optional[ChamberJournal] = None
+
+
+def get_journal() -> Optional[ChamberJournal]:
+    """The process-wide journal in ``HARBINGER_STAR_CHAMBER_DIR``, or None when that is unset."""
+    global _default_journal
+    if _default_journal is None:
+        directory = os.environ.get(STATE_DIR_ENV)
+        if directory:
+            _default_journal = ChamberJournal(directory)
+    return _default_journal
@@ -0,0 +1,347 @@
+"""Per-agent keyed signatures for Star Chamber votes, with batch verification.
+
+A vote is signed over a canonical, length-prefixed encoding of the action
+id, agent role, decision, rationale, confidence and timestamp, so no two
+distinct votes share signed bytes. Agents sign with HMAC-SHA256 or, when
+the ``cryptography`` package is installed, Ed25519. Signatures read
+``<algorithm>:<key id>:<hex>``; the key id selects the verifying key, so
+rotated keys keep verifying older votes.
+
+Keys come from a :class:`KeyRing`. The process-wide ring
+(:func:`get_keyring`) loads the JSON key file named by
+``HARBINGER_STAR_CHAMBER_KEYS`` and derives an HMAC key per agent from
+``HARBINGER_STAR_CHAMBER_SECRET``. With neither set it derives keys from a
+secret generated once and kept in the Star Chamber state directory
+(``HARBINGER_STAR_CHAMBER_DIR``), or, without one, from a random
+per-process secret whose signatures only verify in that process. Both
+fallbacks emit a :class:`RuntimeWarning`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import time
+import warnings
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+except ImportError:  # cryptography is only needed for Ed25519 keys
+    Ed25519PrivateKey = None
+
+
+SIGNING_KEYS_ENV = "HARBINGER_STAR_CHAMBER_KEYS"
+SIGNING_SECRET_ENV = "HARBINGER_STAR_CHAMBER_SECRET"
+STATE_DIR_ENV = "HARBINGER_STAR_CHAMBER_DIR"
+GENERATED_SECRET_NAME = "signing-secret"
+
+HMAC_SHA256 = "hmac-sha256"
+ED25519 = "ed25519"
+
+MAX_REPORTED_FAILURES = 1000
+
+_DOMAIN = "harbinger/star-chamber/vote/v1"
+
+
+def _field(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return len(data).to_bytes(4, "big") + data
+
+
+_DOMAIN_FIELD = _field(_DOMAIN)
+
+
+def canonical_vote(action_id: str, agent_role: str, decision: str, rationale: str, confidence: float,
+                   timestamp: str) -> bytes:
+    """The bytes a vote signature covers: a domain tag, then each field prefixed by its byte length."""
+    return b"".join((
+        _DOMAIN_FIELD,
+        _field(action_id),
+        _field(agent_role),
+        _field(decision),
+        _field(rationale),
+        _field(repr(float(confidence))),
+        _field(timestamp),
+    ))
+
+
+def _digests_equal(expected: str, given: str) -> bool:
+    # compare_digest rejects str with non-ASCII characters; a corrupt record must fail, not raise.
+    return hmac.compare_digest(expected.encode("utf-8"), given.encode("utf-8", "surrogatepass"))
+
+
+def legacy_signature(action_id: str, agent_role: str, decision: str, rationale: str, confidence: float) -> str:
+    """The unkeyed digest that votes carried before keyed signatures (verifiable by anyone)."""
+    return hashlib.sha256(f"{agent_role}{decision}{rationale}{confidence}{action_id}".encode()).hexdigest()[:32]
+
+
+class _HmacKey:
+    __slots__ = ("key_id", "_base")
+
+    algorithm = HMAC_SHA256
+    can_sign = True
+
+    def __init__(self, key: bytes):
+        if len(key) < 16:
+            raise ValueError("HMAC keys must be at least 16 bytes")
+        self.key_id = hashlib.sha256(b"harbinger/star-chamber/key-id\x00" + key).hexdigest()[:16]
+        # The keyed inner/outer state is computed once; each signature only hashes the message.
+        self._base = hmac.new(key, digestmod=hashlib.sha256)
+
+    def sign(self, message: bytes) -> str:
+        mac = self._base.copy()
+        mac.update(message)
+        return mac.hexdigest()
+
+    def verify(self, message: bytes, signature: str) -> bool:
+        return _digests_equal(self.sign(message), signature)
+
+
+class _Ed25519Key:
+    __slots__ = ("key_id", "can_sign", "_private", "_public")
+
+    algorithm = ED25519
+
+    def __init__(self, private_key: Optional[bytes] = None, public_key: Optional[bytes] = None):
+        if Ed25519PrivateKey is None:
+            raise ImportError("cryptography is required for Ed25519 vote signatures")
+        self._private = Ed25519PrivateKey.from_private_bytes(private_key) if private_key else None
+        if self._private is not None:
+            self._public = self._private.public_key()
+        elif public_key:
+            self._public = Ed25519PublicKey.from_public_bytes(public_key)
+        else:
+            raise ValueError("Ed25519 keys need a private or public key")
+        raw = self._public.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        if public_key and raw != public_key:
+            raise ValueError("Ed25519 public key does not match the private key")
+        self.key_id = hashlib.sha256(raw).hexdigest()[:16]
+        self.can_sign = self._private is not None
+
+    def sign(self, message: bytes) -> str:
+        if self._private is None:
+            raise KeyError(f"Ed25519 key {self.key_id} has no private key")
+        return self._private.sign(message).hex()
+
+    def verify(self, message: bytes, signature: str) -> bool:
+        try:
+            self._public.verify(bytes.fromhex(signature), message)
+        except (InvalidSignature, ValueError):
+            return False
+        return True
+
+
+class KeyRing:
+    """Per-agent signing and verifying keys, indexed by key id.
+
+    An agent's first key that can sign is used for new votes; its other
+    keys only verify. With ``secret`` set, agents without explicit keys get
+    an HMAC key derived from it.
+    """
+
+    def __init__(self, secret: Optional[bytes] = None):
+        self._secret = secret
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._signing: Dict[str, Any] = {}
+
+    def _add(self, agent_role: str, key: Any) -> str:
+        self._keys.setdefault(agent_role, {})[key.key_id] = key
+        if key.can_sign:
+            self._signing.setdefault(agent_role, key)
+        return key.key_id
+
+    def add_hmac_key(self, agent_role: str, key: bytes) -> str:
+        """Add an HMAC-SHA256 key for ``agent_role`` and return its key id."""
+        return self._add(agent_role, _HmacKey(key))
+
+    def add_ed25519_key(self, agent_role: str, private_key: Optional[bytes] = None,
+                        public_key: Optional[bytes] = None) -> str:
+        """Add a raw 32-byte Ed25519 key (public only for verify-only agents) and return its key id."""
+        return self._add(agent_role, _Ed25519Key(private_key, public_key))
+
+    def _derive(self, agent_role: str) -> None:
+        if self._secret is not None and agent_role not in self._signing:
+            derived = hmac.new(self._secret, b"agent-key\x00" + agent_role.encode("utf-8"), hashlib.sha256).digest()
+            self.add_hmac_key(agent_role, derived)
+
+    def signing_key(self, agent_role: str) -> Any:
+        self._derive(agent_role)
+        try:
+            return self._signing[agent_role]
+        except KeyError:
+            raise KeyError(f"No signing key for agent {agent_role}") from None
+
+    def key(self, agent_role: str, key_id: str) -> Optional[Any]:
+        key = self._keys.get(agent_role, {}).get(key_id)
+        if key is None:
+            self._derive(agent_role)
+            key = self._keys.get(agent_role, {}).get(key_id)
+        return key
+
+    def sign(self, action_id: str, agent_role: str, decision: str, rationale: str, confidence: float,
+             timestamp: str) -> str:
+        key = self.signing_key(agent_role)
+        digest = key.sign(canonical_vote(action_id, agent_role, decision, rationale, confidence, timestamp))
+        return f"{key.algorithm}:{key.key_id}:{digest}"
+
+    def verify(self, action_id: str, agent_role: str, decision: str, rationale: str, confidence: float,
+               timestamp: str, signature: str) -> bool:
+        if not isinstance(signature, str):
+            return False
+        algorithm, key_id, digest = _split(signature)
+        key = self.key(agent_role, key_id) if digest else None
+        if key is None or key.algorithm != algorithm:
+            return False
+        return key.verify(canonical_vote(action_id, agent_role, decision, rationale, confidence, timestamp), digest)
+
+    @classmethod
+    def from_file(cls, path: str, secret: Optional[bytes] = None) -> "KeyRing":
+        """Load ``{"agents": {role: [{"algorithm": ..., "key" | "private_key" | "public_key": hex}]}}``."""
+        with open(path, encoding="utf-8") as handle:
+            config = json.load(handle)
+        ring = cls(secret)
+        for agent_role, entries in config.get("agents", {}).items():
+            for entry in entries:
+                algorithm = entry.get("algorithm", HMAC_SHA256)
+                if algorithm == HMAC_SHA256:
+                    ring.add_hmac_key(agent_role, bytes.fromhex(entry["key"]))
+                elif algorithm == ED25519:
+                    private_key, public_key = entry.get("private_key"), entry.get("public_key")
+                    ring.add_ed25519_key(
+                        agent_role,
+                        bytes.fromhex(private_key) if private_key else None,
+                        bytes.fromhex(public_key) if public_key else None,
+                    )
+                else:
+                    raise ValueError(f"Unknown vote signature algorithm for {agent_role}: {algorithm}")
+        return ring
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        secret = os.environ.get(SIGNING_SECRET_ENV)
+        secret_bytes = secret.encode("utf-8") if secret else None
+        path = os.environ.get(SIGNING_KEYS_ENV)
+        if path:
+            return cls.from_file(path, secret_bytes)
+        if secret_bytes is not None:
+            return cls(secret_bytes)
+        directory = os.environ.get(STATE_DIR_ENV)
+        if directory:
+            secret_path = os.path.join(directory, GENERATED_SECRET_NAME)
+            warnings.warn(
+                f"Neither {SIGNING_KEYS_ENV} nor {SIGNING_SECRET_ENV} is set; "
+                f"signing Star Chamber votes with the generated secret in {secret_path}",
+                RuntimeWarning,
+            )
+            return cls(state_secret(directory))
+        warnings.warn(
+            f"Neither {SIGNING_KEYS_ENV} nor {SIGNING_SECRET_ENV} is set; Star Chamber votes are signed "
+            "with a random per-process key that no other process can verify",
+            RuntimeWarning,
+        )
+        return cls(secrets.token_bytes(32))
+
+
+def state_secret(directory: str) -> bytes:
+    """The signing secret kept in a Star Chamber state directory, generated (mode 0600) on first use."""
+    path = os.path.join(directory, GENERATED_SECRET_NAME)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix=f".{GENERATED_SECRET_NAME}-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(secrets.token_hex(32))
+                handle.flush()
+                os.fsync(handle.fileno())
+            try:
+                os.link(temporary, path)  # fails if a concurrent process created it first; theirs wins
+            except FileExistsError:
+                pass
+        finally:
+            os.remove(temporary)
+    with open(path, encoding="utf-8") as handle:
+        return bytes.fromhex(handle.read().strip())
+
+
+def _split(signature: str) -> Tuple[str, str, str]:
+    algorithm, _, rest = signature.partition(":")
+    key_id, _, digest = rest.partition(":")
+    return algorithm, key_id, digest
+
+
+_MISSING = object()
+
+
+def verify_votes(votes: Iterable[Tuple[str, Dict[str, Any]]], keyring: Optional[KeyRing] = None) -> Dict[str, Any]:
+    """Verify ``(action_id, vote dict)`` pairs in one pass.
+
+    Keys are resolved once per ``(agent_role, key id)``. Votes with the
+    pre-keyed SHA-256 digest are counted as ``legacy`` (or ``invalid`` when
+    even that digest does not match). Up to :data:`MAX_REPORTED_FAILURES`
+    failing votes are listed with the reason.
+    """
+    keyring = keyring or get_keyring()
+    started = time.perf_counter()
+    cache: Dict[Tuple[str, str], Any] = {}
+    checked = valid = invalid = legacy = unknown_key = 0
+    failures = []
+
+    for action_id, vote in votes:
+        checked += 1
+        agent_role = vote["agent_role"]
+        signature = vote.get("signature")
+        algorithm, key_id, digest = _split(signature if isinstance(signature, str) else "")
+        reason = None
+        if not digest:
+            expected = legacy_signature(action_id, agent_role, vote["decision"], vote["rationale"], vote["confidence"])
+            if _digests_equal(expected, algorithm):
+                legacy += 1
+                continue
+            reason = "legacy_mismatch"
+        else:
+            key = cache.get((agent_role, key_id), _MISSING)
+            if key is _MISSING:
+                key = cache[(agent_role, key_id)] = keyring.key(agent_role, key_id)
+            if key is None or key.algorithm != algorithm:
+                unknown_key += 1
+                reason = "unknown_key"
+            else:
+                message = canonical_vote(action_id, agent_role, vote["decision"], vote["rationale"],
+                                         vote["confidence"], vote["timestamp"])
+                if key.verify(message, digest):
+                    valid += 1
+                    continue
+                reason = "bad_signature"
+        invalid += 1
+        if len(failures) < MAX_REPORTED_FAILURES:
+            failures.append({"action_id": action_id, "agent_role": agent_role, "reason": reason})
+
+    seconds = time.perf_counter() - started
+    return {
+        "checked": checked,
+        "valid": valid,
+        "invalid": invalid,
+        "legacy": legacy,
+        "unknown_key": unknown_key,
+        "all_valid": invalid == 0 and legacy == 0,
+        "failures": failures,
+        "seconds": round(seconds, 6),
+        "votes_per_second": round(checked / seconds) if seconds > 0 else None,
+    }
+
+
+_default_keyring: Optional[KeyRing] = None
+
+
+def get_keyring() -> KeyRing:
+    global _default_keyring
+    if _default_keyring is None:
+        _default_keyring = KeyRing.from_env()
+    return _default_keyring
@@ -0,0 +1,101 @@
+"""Bounded-memory readers for CLI inputs given as file paths or stdin."""
+
+from __future__ import annotations
+
+import io
+import json
+import re
+import sys
+from contextlib import contextmanager
+from typing import Any, Iterator, TextIO
+
+STDIN = "-"
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE_CHARS = frozenset(" \t\n\r")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CLOSERS = frozenset('}]"')
+_DELIMITERS = frozenset(" \t\n\r,]")
+
+
+@contextmanager
+def open_text(path: str) -> Iterator[TextIO]:
+    """Open ``path`` (``-`` for stdin) as UTF-8 text with line endings left untranslated."""
+    if path == STDIN:
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        try:
+            yield stream
+        finally:
+            stream.detach()  # leave sys.stdin usable
+        return
+    with open(path, encoding="utf-8", newline="") as stream:
+        yield stream
+
+
+def iter_lines(path: str) -> Iterator[str]:
+    """Yield the lines of ``path`` (or stdin), each with its line ending."""
+    with open_text(path) as stream:
+        yield from stream
+
+
+def iter_json_items(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array without parsing the whole document.
+
+    Input that does not start with ``[`` is read as a sequence of JSON
+    values, e.g. JSON lines. Only the current item and one read chunk are
+    held in memory; reads grow geometrically while a single item spans
+    several chunks. Raises ``json.JSONDecodeError`` on malformed input.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    read_size = chunk_size
+    array = None
+    separated = True  # inside an array: a "," (or the opening "[") precedes the next item
+    empty = True
+
+    while True:
+        if position < len(buffer) and buffer[position] in _WHITESPACE_CHARS:
+            position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                break
+            buffer, position = stream.read(read_size), 0
+            eof = not buffer
+            continue
+
+        character = buffer[position]
+        if array is None:
+            array = character == "["
+            position += array
+            continue
+        if array and not separated:
+            if character == "]":
+                return
+            if character != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+            position += 1
+            separated = True
+            continue
+        if array and character == "]" and empty:
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+            # A number cut at the end of the buffer (e.g. "-25" of "-2500.5") parses but is incomplete.
+            complete = eof or buffer[end - 1] in _CLOSERS or (end < len(buffer) and buffer[end] in _DELIMITERS)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            chunk = stream.read(read_size)
+            buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+            read_size *= 2
+            continue
+        read_size = chunk_size
+        position = end
+        separated, empty = not array, False
+        yield item
+
+    if array:
+        raise json.JSONDecodeError("Unterminated array", buffer, position)
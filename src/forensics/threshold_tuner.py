@@ -0,0 +1,203 @@
+"""Online detector threshold tuning from labeled feedback."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .collateral_damage_scorer import SlidingWindowAccumulator, summarize_metrics
+from .thresholds import ThresholdStore, get_store
+
+
+@dataclass(frozen=True)
+class TuningTarget:
+    """A tunable detector cutoff.
+
+    ``name`` is the key the detector reads from the threshold store. Scores
+    at or above the threshold count as alerts, or strictly below it with
+    ``direction="below"``; ``target_fpr`` bounds the share of negative
+    feedback that may alert. ``ceiling`` names another target whose
+    threshold this one may not exceed when both are published.
+    """
+
+    name: str
+    default: float
+    target_fpr: float = 0.05
+    low: float = 0.0
+    high: float = 1.0
+    bins: int = 1000
+    min_samples: int = 200
+    direction: str = "above"
+    ceiling: Optional[str] = None
+
+    def __post_init__(self):
+        if self.direction not in ("above", "below"):
+            raise ValueError(f"direction must be 'above' or 'below', got {self.direction!r}")
+
+    def mirror(self, value):
+        """Map between score space and the tuner's "alert when at or above" space."""
+        return self.low + self.high - value if self.direction == "below" else value
+
+    def reflect(self, scores: np.ndarray) -> np.ndarray:
+        """Move observed scores into the tuner's space.
+
+        "below" scores are snapped to the centre of their mirrored bin, so
+        alerting on mirrored bin edge ``e`` and up selects exactly the scores
+        with ``score < mirror(e)``, the detector's strict comparison.
+        """
+        if self.direction == "above":
+            return scores
+        bins = (scores - self.low) * (self.bins / (self.high - self.low))
+        bins = np.clip(bins.astype(np.int64), 0, self.bins - 1)
+        return self.low + (self.bins - bins - 0.5) * ((self.high - self.low) / self.bins)
+
+
+DEFAULT_TARGETS = (
+    TuningTarget("injection_detector", 0.4),
+    TuningTarget("machiavellian_delta", 5.0, high=100.0),
+    TuningTarget(
+        "machiavellian_divergence.review", 0.25, target_fpr=0.2, ceiling="machiavellian_divergence.divergent"
+    ),
+    TuningTarget("machiavellian_divergence.divergent", 0.6),
+    # evaluate_response asks for review when confidence falls *below* the cutoff.
+    TuningTarget("sere_evaluator.review", 0.4, target_fpr=0.2, direction="below"),
+)
+
+
+class ThresholdTuner:
+    """Keeps per-detector, per-tenant score histograms and retunes cutoffs.
+
+    Each (target, tenant) pair holds a fixed-bin sliding window from
+    :class:`SlidingWindowAccumulator`, so memory is bounded by
+    ``bins * slots`` regardless of feedback volume. :meth:`recompute`
+    picks the loosest threshold whose windowed false positive rate stays
+    within the target and publishes it to the threshold store.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[TuningTarget] = DEFAULT_TARGETS,
+        slots: int = 24,
+        store: Optional[ThresholdStore] = None,
+    ):
+        self.targets = {target.name: target for target in targets}
+        self.slots = slots
+        self.store = store or get_store()
+        self._windows: Dict[Tuple[str, Optional[str]], SlidingWindowAccumulator] = {}
+
+    def _window(self, name: str, tenant: Optional[str]) -> SlidingWindowAccumulator:
+        key = (name, tenant)
+        window = self._windows.get(key)
+        if window is None:
+            target = self.targets[name]
+            window = SlidingWindowAccumulator(
+                bins=target.bins, slots=self.slots, low=target.low, high=target.high
+            )
+            self._windows[key] = window
+        return window
+
+    def observe(self, name: str, scores, labels, tenant: Optional[str] = None) -> None:
+        """Record labeled scores for one detector.
+
+        Feedback is counted both globally and, when given, for ``tenant``.
+        """
+        target = self.targets.get(name)
+        if target is None:
+            raise KeyError(f"Unknown tuning target: {name}")
+        scores = target.reflect(np.asarray(scores, dtype=float))
+        self._window(name, None).update(scores, labels)
+        if tenant is not None:
+            self._window(name, tenant).update(scores, labels)
+
+    def consume(self, feedback: Iterable[Dict[str, object]]) -> int:
+        """Ingest a stream of ``{"detector", "score", "label", "tenant"}`` records.
+
+        Records are grouped per detector and tenant so each histogram is
+        updated with one vectorized call. Returns the number consumed.
+        """
+        batches: Dict[Tuple[str, Optional[str]], Tuple[List[float], List[bool]]] = {}
+        consumed = 0
+        for record in feedback:
+            name = str(record["detector"])
+            if name not in self.targets:
+                continue
+            scores, labels = batches.setdefault((name, record.get("tenant")), ([], []))
+            scores.append(float(record["score"]))
+            labels.append(bool(record["label"]))
+            consumed += 1
+        for (name, tenant), (scores, labels) in batches.items():
+            self.observe(name, np.asarray(scores), np.asarray(labels), tenant)
+        return consumed
+
+    def advance(self) -> None:
+        """Rotate every window, forgetting the oldest slot of feedback."""
+        for window in self._windows.values():
+            window.advance()
+
+    def recompute(self, publish: bool = True) -> Dict[str, Dict[str, object]]:
+        """Recompute thresholds for every window with enough feedback.
+
+        Returns a report keyed by ``name`` or ``name@tenant``. Windows
+        below ``min_samples`` negatives or positives keep their current
+        threshold and are reported as skipped.
+        """
+        report: Dict[str, Dict[str, object]] = {}
+        tuned: Dict[Tuple[str, Optional[str]], float] = {}
+        for (name, tenant), window in self._windows.items():
+            target = self.targets[name]
+            key = name if tenant is None else f"{name}@{tenant}"
+            negatives, positives = window.histogram().sum(axis=1)
+            if min(negatives, positives) < target.min_samples:
+                report[key] = {
+                    "status": "skipped",
+                    "reason": "insufficient feedback",
+                    "negatives": int(negatives),
+                    "positives": int(positives),
+                }
+                continue
+
+            curves = window.curves()
+            feasible = np.flatnonzero(curves.false_positive_rate <= target.target_fpr)
+            if feasible.size:
+                mirrored = float(curves.thresholds[feasible[-1]])
+            else:
+                mirrored = target.high
+            metrics = curves.at(mirrored)
+            threshold = float(target.mirror(mirrored))
+            previous = self.store.get(name, target.default, tenant)
+
+            tuned[(name, tenant)] = threshold
+            report[key] = {
+                "status": "tuned" if feasible.size else "infeasible",
+                "threshold": round(threshold, 6),
+                "previous": previous,
+                "target_fpr": target.target_fpr,
+                "metrics": summarize_metrics(metrics),
+                "negatives": int(negatives),
+                "positives": int(positives),
+            }
+
+        # Ordered cutoffs (review <= divergent) are tuned independently; clamp so they stay ordered.
+        for (name, tenant), threshold in tuned.items():
+            ceiling = self.targets[name].ceiling
+            if ceiling is None:
+                continue
+            limit = tuned.get((ceiling, tenant))
+            if limit is None:
+                limit = self.store.get(ceiling, self.targets[ceiling].default, tenant)
+            if threshold > limit:
+                tuned[(name, tenant)] = limit
+                entry = report[name if tenant is None else f"{name}@{tenant}"]
+                curves = self._windows[(name, tenant)].curves()
+                entry["threshold"] = round(limit, 6)
+                entry["metrics"] = summarize_metrics(curves.at(self.targets[name].mirror(limit)))
+                entry["clamped_to"] = ceiling
+
+        if publish:
+            for (name, tenant), threshold in tuned.items():
+                self.store.publish(name, threshold, tenant)
+        if publish and self.store.path:
+            self.store.save()
+        return report
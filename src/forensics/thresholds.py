@@ -0,0 +1,143 @@
+"""Runtime detector thresholds."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+THRESHOLDS_PATH_ENV = "HARBINGER_THRESHOLDS_PATH"
+
+_RELOAD_INTERVAL = 1.0
+
+
+class ThresholdStore:
+    """Published detector thresholds, optionally backed by a JSON file.
+
+    The file maps threshold names to either a number (applies to every
+    tenant) or ``{"default": x, "tenants": {"acme": y}}``. It is re-read
+    when its mtime changes, checked at most once per ``reload_interval``
+    seconds, so tuned values reach running detectors without a redeploy.
+    Values published since the last :meth:`save` are re-applied on top of
+    every reload, so an external edit never discards them.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = _RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._values: Dict[str, object] = {}
+        self._pending: Dict[Tuple[str, Optional[str]], float] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not self.path or (not force and now - self._checked_at < self.reload_interval):
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    values = json.load(handle)
+            except (OSError, ValueError):
+                return
+            if isinstance(values, dict):
+                self._values = values
+                self._mtime = mtime
+                for (name, tenant), value in self._pending.items():
+                    self._set(name, value, tenant)
+
+    def _set(self, name: str, value: float, tenant: Optional[str]) -> None:
+        entry = self._values.get(name)
+        if not isinstance(entry, dict):
+            entry = {"default": entry, "tenants": {}}
+        if tenant is None:
+            entry["default"] = value
+        else:
+            entry.setdefault("tenants", {})[tenant] = value
+        self._values[name] = entry
+
+    def get(self, name: str, default: float, tenant: Optional[str] = None) -> float:
+        """Return the tenant's threshold, falling back to global then ``default``."""
+        self._maybe_reload()
+        entry = self._values.get(name)
+        if isinstance(entry, dict):
+            tenants = entry.get("tenants") or {}
+            if tenant is not None and tenant in tenants:
+                return float(tenants[tenant])
+            entry = entry.get("default")
+        return default if entry is None else float(entry)
+
+    def publish(self, name: str, value: float, tenant: Optional[str] = None) -> None:
+        """Set a threshold in memory, scoped to ``tenant`` when given.
+
+        The value stays pending until :meth:`save` writes it out.
+        """
+        # Pick up external edits first so they are not clobbered on save.
+        self._maybe_reload(force=True)
+        with self._lock:
+            self._pending[(name, tenant)] = value
+            self._set(name, value, tenant)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the current thresholds to ``path`` (or the backing file)."""
+        import tempfile  # only the tuner writes; keep it off the detectors' import path
+
+        target = path or self.path
+        if not target:
+            raise ValueError("no threshold file configured")
+        directory = os.path.dirname(os.path.abspath(target))
+        with self._lock:
+            snapshot = json.dumps(self._values, indent=2, sort_keys=True)
+            saved = dict(self._pending)
+        try:
+            mode = os.stat(target).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".thresholds-")
+        try:
+            # mkstemp creates 0600; keep the file readable by the workers that poll it.
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(snapshot)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        if target != self.path:
+            return
+        with self._lock:
+            for key, value in saved.items():
+                if self._pending.get(key) == value:
+                    del self._pending[key]
+
+    def snapshot(self) -> Dict[str, object]:
+        self._maybe_reload()
+        return json.loads(json.dumps(self._values))
+
+
+_default_store = ThresholdStore(os.environ.get(THRESHOLDS_PATH_ENV))
+
+
+def get_store() -> ThresholdStore:
+    return _default_store
+
+
+def get_threshold(name: str, default: float, tenant: Optional[str] = None) -> float:
+    """Look up a published threshold in the process-wide store."""
+    return _default_store.get(name, default, tenant)
@@ -0,0 +1,303 @@
+"""Per-user epistemic narrowing state sharded across worker processes.
+
+:class:`ShardRouter` keeps a :class:`.epistemic_narrowing_monitor.NarrowingTracker`
+per ``user_id`` so callers only send new interactions. Users are assigned
+to workers by consistent hashing (:class:`HashRing`), so adding or removing
+a worker moves only the users whose owner changed; their state is exported
+from the old worker and imported into the new one. Each worker holds its
+users in a :class:`UserStateStore`, which keeps the most recently used
+trackers in memory and spills idle ones to a per-worker SQLite file.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .epistemic_narrowing_monitor import NarrowingTracker
+
+
+DEFAULT_VNODES = 128
+DEFAULT_CAPACITY = 50_000
+# A full store spills this many extra users at once (at most 1/8 of capacity).
+SPILL_BATCH = 256
+
+
+def _point(key: str) -> int:
+    # Stable across processes (unlike hash()), so every process agrees on ownership.
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` virtual points per node."""
+
+    __slots__ = ("vnodes", "_points", "_owners")
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self._points = array("Q")
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners))
+
+    def add(self, node: str) -> None:
+        if node in self._owners:
+            raise ValueError(f"Node already on the ring: {node}")
+        for replica in range(self.vnodes):
+            point = _point(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self._owners:
+            raise KeyError(f"Node not on the ring: {node}")
+        keep = [index for index, owner in enumerate(self._owners) if owner != node]
+        self._points = array("Q", (self._points[index] for index in keep))
+        self._owners = [self._owners[index] for index in keep]
+
+    def node_for(self, key: str) -> str:
+        if not self._owners:
+            raise LookupError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._owners[index]
+
+
+class UserStateStore:
+    """LRU of in-memory trackers backed by a SQLite spill file for idle users.
+
+    At most ``capacity`` trackers stay in memory; the least recently used
+    ones are written to ``spill_path`` and reloaded on their next access.
+    """
+
+    def __init__(self, spill_path: str, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._active: "OrderedDict[str, NarrowingTracker]" = OrderedDict()
+        self._db = sqlite3.connect(spill_path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS states (user_id TEXT PRIMARY KEY, state TEXT NOT NULL)")
+        self.spills = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._active) + self.spilled()
+
+    def spilled(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM states").fetchone()[0]
+
+    def get(self, user_id: str, create: bool = True) -> Optional[NarrowingTracker]:
+        tracker = self._active.get(user_id)
+        if tracker is not None:
+            self._active.move_to_end(user_id)
+            return tracker
+        row = self._db.execute("SELECT state FROM states WHERE user_id = ?", (user_id,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM states WHERE user_id = ?", (user_id,))
+            tracker = NarrowingTracker.from_state(json.loads(row[0]))
+            self.reloads += 1
+        elif create:
+            tracker = NarrowingTracker()
+        else:
+            return None
+        self.put(user_id, tracker)
+        return tracker
+
+    def put(self, user_id: str, tracker: NarrowingTracker) -> None:
+        self._active[user_id] = tracker
+        self._active.move_to_end(user_id)
+        if len(self._active) > self.capacity:
+            # Spill a batch at once so a full store does not write one row per access.
+            count = len(self._active) - self.capacity + min(SPILL_BATCH, self.capacity // 8)
+            self._spill(self._active.popitem(last=False) for _ in range(count))
+
+    def _spill(self, items: Iterable[Tuple[str, NarrowingTracker]]) -> None:
+        rows = [(user_id, json.dumps(tracker.to_state(), separators=(",", ":"))) for user_id, tracker in items]
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO states VALUES (?, ?)", rows)
+        self.spills += len(rows)
+
+    def pop_where(self, predicate) -> List[Tuple[str, Dict[str, Any]]]:
+        """Remove and return ``(user_id, state)`` for every user, in memory or spilled, matching ``predicate``."""
+        moved = [(user_id, tracker.to_state()) for user_id, tracker in self._active.items() if predicate(user_id)]
+        for user_id, _ in moved:
+            del self._active[user_id]
+        spilled = [
+            (user_id, json.loads(state))
+            for user_id, state in self._db.execute("SELECT user_id, state FROM states")
+            if predicate(user_id)
+        ]
+        with self._db:
+            self._db.executemany("DELETE FROM states WHERE user_id = ?", [(user_id,) for user_id, _ in spilled])
+        return moved + spilled
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self._active),
+            "spilled": self.spilled(),
+            "spills": self.spills,
+            "reloads": self.reloads,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _handle(store: UserStateStore, name: str, command: str, args: tuple) -> Any:
+    if command == "observe":
+        user_id, interactions, baseline_diversity = args
+        tracker = store.get(user_id)
+        for interaction in interactions:
+            tracker.update(interaction)
+        return tracker.report(baseline_diversity, user_id)
+    if command == "report":
+        user_id, baseline_diversity = args
+        tracker = store.get(user_id, create=False)
+        return (tracker or NarrowingTracker()).report(baseline_diversity, user_id)
+    if command == "export":
+        ring = args[0]
+        if ring is None:
+            return store.pop_where(lambda user_id: True)
+        return store.pop_where(lambda user_id: ring.node_for(user_id) != name)
+    if command == "import":
+        for user_id, state in args[0]:
+            store.put(user_id, NarrowingTracker.from_state(state))
+        return len(args[0])
+    if command == "stats":
+        return store.stats()
+    raise ValueError(f"Unknown shard command: {command}")
+
+
+def _serve(connection, name: str, spill_path: str, capacity: int) -> None:
+    store = UserStateStore(spill_path, capacity)
+    try:
+        while True:
+            command, args = connection.recv()
+            if command == "close":
+                break
+            try:
+                connection.send((True, _handle(store, name, command, args)))
+            except Exception as exc:  # report to the router instead of killing the worker
+                connection.send((False, exc))
+    finally:
+        store.close()
+        connection.close()
+
+
+class ShardRouter:
+    """Routes per-user monitoring calls to worker processes by consistent hashing.
+
+    ``observe(user_id, interactions)`` appends interactions to the user's
+    tracker in its owning worker and returns the updated narrowing report.
+    Spill files live in ``spill_dir`` (a temporary directory by default,
+    removed on :meth:`close`).
+    """
+
+    def __init__(self, workers: int = 2, capacity: int = DEFAULT_CAPACITY, spill_dir: Optional[str] = None,
+                 vnodes: int = DEFAULT_VNODES):
+        self.capacity = capacity
+        self._own_spill_dir = spill_dir is None
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="harbinger-shards-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.ring = HashRing(vnodes=vnodes)
+        self._workers: Dict[str, Tuple[multiprocessing.Process, Any]] = {}
+        self._next_id = 0
+        for _ in range(workers):
+            self.add_worker()
+
+    def _call(self, name: str, command: str, *args: Any) -> Any:
+        connection = self._workers[name][1]
+        connection.send((command, args))
+        ok, result = connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def _spill_path(self, name: str) -> str:
+        return os.path.join(self.spill_dir, f"{name}.sqlite")
+
+    def add_worker(self) -> Dict[str, Any]:
+        """Start a worker, put it on the ring and move the users it now owns to it."""
+        name = f"worker-{self._next_id}"
+        self._next_id += 1
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_serve, args=(child, name, self._spill_path(name), self.capacity), name=f"harbinger-{name}",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        self._workers[name] = (process, parent)
+        self.ring.add(name)
+
+        moved = 0
+        for other in list(self._workers):
+            if other != name:
+                states = self._call(other, "export", self.ring)
+                moved += self._call(name, "import", states) if states else 0
+        return {"worker": name, "moved_users": moved}
+
+    def remove_worker(self, name: str) -> Dict[str, Any]:
+        """Take a worker off the ring, hand its users to their new owners and stop it."""
+        if name not in self._workers:
+            raise KeyError(f"Unknown worker: {name}")
+        if len(self._workers) == 1:
+            raise ValueError("Cannot remove the last worker")
+        self.ring.remove(name)
+        states = self._call(name, "export", None)
+        by_owner: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for user_id, state in states:
+            by_owner.setdefault(self.ring.node_for(user_id), []).append((user_id, state))
+        for owner, owned in by_owner.items():
+            self._call(owner, "import", owned)
+        self._stop(name)
+        os.remove(self._spill_path(name))
+        return {"worker": name, "moved_users": len(states)}
+
+    def _stop(self, name: str) -> None:
+        process, connection = self._workers.pop(name)
+        connection.send(("close", ()))
+        connection.close()
+        process.join()
+
+    def worker_for(self, user_id: str) -> str:
+        return self.ring.node_for(str(user_id))
+
+    def observe(self, user_id: str, interactions: Iterable[Dict[str, Any]],
+                baseline_diversity: float = None) -> Dict[str, Any]:
+        """Add ``interactions`` to ``user_id``'s history and return its narrowing report."""
+        user_id = str(user_id)
+        return self._call(self.worker_for(user_id), "observe", user_id, list(interactions), baseline_diversity)
+
+    def report(self, user_id: str, baseline_diversity: float = None) -> Dict[str, Any]:
+        user_id = str(user_id)
+        return self._call(self.worker_for(user_id), "report", user_id, baseline_diversity)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: self._call(name, "stats") for name in sorted(self._workers)}
+
+    def close(self) -> None:
+        for name in list(self._workers):
+            self._stop(name)
+        if self._own_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self) -> "ShardRouter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Dict, List
 
+from .metrics import instrument
+
 
 _KNOWN_WATERMARKS = [
     "openai",
@@ -15,6 +17,7 @@ _KNOWN_WATERMARKS = [
 ]
 
 
+@instrument("watermark_scanner", verdict_key="detected")
 def scan(text: str) -> Dict[str, object]:
     """Scan for simple textual watermark indicators."""
     if not text:
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Wazuh-MCP Bridge
+
+Compiles natural language security intent into Wazuh SIEM rules and queries.
+Implements operational integrity enforcement via SIEM integration.
+
+This is the operational security binding layer described in H4RB1NG3R v0.05.
+
+query_siem_logs also runs aggregations (group-by counts, time histograms,
+approximate distinct counts, top-k) over local alert files in one streaming
+pass when the filters ask for them; see siem_aggregation.
+
+Bulk intents compile through WazuhRuleCompiler.compile_batch, which collapses
+block_ip addresses into a minimal set of CIDR ranges, drops duplicate rules
+and emits grouped rules.
+
+Usage:
+    wazuh_mcp_bridge.py compile "block suspicious IP" '{"ip": "192.168.1.1"}'
+    wazuh_mcp_bridge.py query "failed logins" '{"filters": {"limit": 50}}'
+    wazuh_mcp_bridge.py query "failed logins" '{"time_range": {}, "filters": {"alerts_path": "alerts.json",
+        "aggregations": [{"op": "histogram", "by": "agent.name", "interval": "1h"}]}}'
+    wazuh_mcp_bridge.py compile_batch intents.json   # JSON array or JSON lines, - for stdin
+"""
+
+import json
+import socket
+import sys
+from typing import Dict, Iterable, List, Any, Tuple
+import hashlib
+from datetime import datetime
+
+from .streaming import iter_json_items, open_text
+
+# srcip elements per grouped block_ip rule; Wazuh matches a rule when any of them matches.
+MAX_SRCIPS_PER_RULE = 256
+
+_FAMILIES = ((socket.AF_INET, 4, 32), (socket.AF_INET6, 6, 128))
+
+
+def _parse_network(ip: str) -> Tuple[int, int, int]:
+    """Parse an address or CIDR (host bits ignored) into (version, first, last) integers."""
+    address, _, prefix = str(ip).strip().partition('/')
+    for family, version, bits in _FAMILIES:
+        try:
+            packed = socket.inet_pton(family, address)
+        except (OSError, ValueError):
+            continue
+        length = int(prefix) if prefix.isdigit() else (bits if not prefix else -1)
+        if not 0 <= length <= bits:
+            raise ValueError(f'Invalid prefix length in {ip!r}')
+        host_bits = bits - length
+        first = int.from_bytes(packed, 'big') >> host_bits << host_bits
+        return version, first, first + (1 << host_bits) - 1
+    raise ValueError(f'Invalid IP address or network: {ip!r}')
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping and adjacent [first, last] intervals."""
+    merged: List[Tuple[int, int]] = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _interval_cidrs(first: int, last: int, bits: int) -> List[Tuple[int, int]]:
+    """Split [first, last] into the fewest aligned CIDR blocks, as (network, prefix length) pairs."""
+    blocks = []
+    while first <= last:
+        # Largest block aligned at first (any size at 0) that does not run past last.
+        size_bits = (first & -first).bit_length() - 1 if first else bits
+        while first + (1 << size_bits) - 1 > last:
+            size_bits -= 1
+        blocks.append((first, bits - size_bits))
+        first += 1 << size_bits
+    return blocks
+
+
+def _format_network(version: int, network: int, length: int) -> str:
+    family, bits = (socket.AF_INET, 32) if version == 4 else (socket.AF_INET6, 128)
+    address = socket.inet_ntop(family, network.to_bytes(bits // 8, 'big'))
+    return address if length == bits else f'{address}/{length}'
+
+
+def aggregate_networks(ips: Iterable[str]) -> List[str]:
+    """
+    Collapse addresses and CIDR ranges into the minimal equivalent list of CIDR ranges.
+
+    IPv4 ranges come before IPv6 ones, each in address order; single
+    addresses are returned without a prefix length.
+    """
+    intervals: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+    for ip in ips:
+        version, first, last = _parse_network(ip)
+        intervals[version].append((first, last))
+    networks = []
+    for version, bits in ((4, 32), (6, 128)):
+        for first, last in _merge_intervals(intervals[version]):
+            networks.extend(
+                _format_network(version, network, length) for network, length in _interval_cidrs(first, last, bits)
+            )
+    return networks
+
+
+class WazuhRuleCompiler:
+    """Compiles security intent into Wazuh rule format."""
+
+    # Intent-to-rule mapping templates
+    INTENT_TEMPLATES = {
+        'block_ip': {
+            'rule_template': '<rule id="{id}" level="10"><if_group>web</if_group><srcip>{ip}</srcip><description>Blocked IP: {ip} - Reason: {reason}</description><options>no_email_alert,no_log</options><action>deny</action></rule>',
+            'category': 'firewall',
+            'severity': 10,
+            'group_template': '<rule id="{id}" level="10"><if_group>web</if_group>{srcips}<description>Blocked IPs ({count} ranges) - Reason: {reason}</description><options>no_email_alert,no_log</options><action>deny</action></rule>'
+        },
+        'detect_anomaly': {
+            'rule_template': '<rule id="{id}" level="7"><if_group>threat_detection</if_group><match>{pattern}</match><description>Anomaly detected: {description}</description></rule>',
+            'category': 'detection',
+            'severity': 7
+        },
+        'rate_limit': {
+            'rule_template': '<rule id="{id}" level="8" frequency="10" timeframe="60"><if_matched_sid>{parent_id}</if_matched_sid><description>Rate limit exceeded: {resource} - {description}</description><action>throttle</action></rule>',
+            'category': 'rate_limiting',
+            'severity': 8
+        },
+        'privilege_escalation': {
+            'rule_template': '<rule id="{id}" level="12"><if_group>authentication</if_group><match>privilege.*escalation|sudo|root</match><description>Privilege escalation attempt: {description}</description><action>alert</action></rule>',
+            'category': 'security',
+            'severity': 12
+        },
+        'data_exfiltration': {
+            'rule_template': '<rule id="{id}" level="11"><if_group>data_loss</if_group><match>upload|exfil|transfer.*large</match><description>Potential data exfiltration: {description}</description><action>block</action></rule>',
+            'category': 'dlp',
+            'severity': 11
+        }
+    }
+
+    @staticmethod
+    def generate_rule_id() -> str:
+        """Generate a unique Wazuh rule ID."""
+        timestamp = datetime.utcnow().isoformat()
+        return str(100000 + abs(hash(timestamp)) % 900000)
+
+    @classmethod
+    def compile_intent(cls, intent: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compile natural language intent into Wazuh rule.
+
+        Args:
+            intent: Intent type (e.g., 'block_ip', 'detect_anomaly')
+            parameters: Intent-specific parameters
+
+        Returns:
+            Dictionary containing compiled rule and metadata
+        """
+        if intent not in cls.INTENT_TEMPLATES:
+            return {
+                'success': False,
+                'error': f'Unknown intent type: {intent}',
+                'supported_intents': list(cls.INTENT_TEMPLATES.keys())
+            }
+
+        template_config = cls.INTENT_TEMPLATES[intent]
+        rule_id = cls.generate_rule_id()
+
+        # Populate template
+        rule_params = {
+            'id': rule_id,
+            **parameters
+        }
+
+        try:
+            rule_xml = template_config['rule_template'].format(**rule_params)
+        except KeyError as e:
+            return {
+                'success': False,
+                'error': f'Missing required parameter: {e}',
+                'required_params': cls.get_required_params(intent)
+            }
+
+        return {
+            'success': True,
+            'rule_id': rule_id,
+            'rule_xml': rule_xml,
+            'category': template_config['category'],
+            'severity': template_config['severity'],
+            'intent': intent,
+            'parameters': parameters
+        }
+
+    @classmethod
+    def compile_batch(
+        cls,
+        intents: Iterable[Dict[str, Any]],
+        max_per_rule: int = MAX_SRCIPS_PER_RULE,
+        first_rule_id: int = None
+    ) -> Dict[str, Any]:
+        """
+        Compile many intents into a minimal rule set.
+
+        block_ip intents are grouped by reason (as a string, the way a
+        single compile renders it); their addresses and CIDR
+        ranges are collapsed into the fewest CIDR ranges and emitted as
+        rules with up to max_per_rule srcip elements each. Other intents
+        with identical parameters compile to a single rule. Rule ids are
+        assigned sequentially from first_rule_id.
+
+        Args:
+            intents: Items of the form {"intent": ..., "parameters": {...}}
+            max_per_rule: srcip elements per grouped block_ip rule
+            first_rule_id: First rule id (a generated id when omitted)
+
+        Returns:
+            Dictionary containing the compiled rules and a before/after report
+        """
+        if max_per_rule < 1:
+            raise ValueError('max_per_rule must be positive')
+        next_id = int(first_rule_id if first_rule_id is not None else cls.generate_rule_id())
+
+        blocked: Dict[str, List[str]] = {}
+        unique: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        errors = []
+        intents_in = block_intents = addresses_in = duplicates = 0
+
+        for index, item in enumerate(intents):
+            intents_in += 1
+            intent, parameters = item.get('intent'), item.get('parameters') or {}
+            if intent == 'block_ip':
+                block_intents += 1
+                ips = parameters.get('ip')
+                ips = ips if isinstance(ips, list) else [ips]
+                # Reasons key the grouping, so an unhashable one (a list or dict) is grouped by its text.
+                reason = str(parameters.get('reason', 'security_policy'))
+                for ip in ips:
+                    addresses_in += 1
+                    try:
+                        _parse_network(ip)
+                    except ValueError as e:
+                        errors.append({'index': index, 'intent': intent, 'error': str(e)})
+                        continue
+                    blocked.setdefault(reason, []).append(ip)
+                continue
+            key = (intent, json.dumps(parameters, sort_keys=True, default=str))
+            if key in unique:
+                duplicates += 1
+            else:
+                unique[key] = {'index': index, 'intent': intent, 'parameters': parameters}
+
+        template_config = cls.INTENT_TEMPLATES['block_ip']
+        rules = []
+        cidr_ranges = 0
+        for reason, ips in blocked.items():
+            networks = aggregate_networks(ips)
+            cidr_ranges += len(networks)
+            for start in range(0, len(networks), max_per_rule):
+                chunk = networks[start:start + max_per_rule]
+                rule_id = str(next_id)
+                next_id += 1
+                if len(chunk) == 1:
+                    rule_xml = template_config['rule_template'].format(id=rule_id, ip=chunk[0], reason=reason)
+                else:
+                    rule_xml = template_config['group_template'].format(
+                        id=rule_id, srcips=''.join(f'<srcip>{network}</srcip>' for network in chunk),
+                        count=len(chunk), reason=reason
+                    )
+                rules.append({
+                    'success': True,
+                    'rule_id': rule_id,
+                    'rule_xml': rule_xml,
+                    'category': template_config['category'],
+                    'severity': template_config['severity'],
+                    'intent': 'block_ip',
+                    'parameters': {'ip': chunk, 'reason': reason}
+                })
+
+        for entry in unique.values():
+            if entry['intent'] not in cls.INTENT_TEMPLATES:
+                errors.append({'index': entry['index'], 'intent': entry['intent'],
+                               'error': f"Unknown intent type: {entry['intent']}"})
+                continue
+            try:
+                rule_xml = cls.INTENT_TEMPLATES[entry['intent']]['rule_template'].format(
+                    **{**entry['parameters'], 'id': str(next_id)}
+                )
+            except KeyError as e:
+                errors.append({'index': entry['index'], 'intent': entry['intent'],
+                               'error': f'Missing required parameter: {e}'})
+                continue
+            template_config = cls.INTENT_TEMPLATES[entry['intent']]
+            rules.append({
+                'success': True,
+                'rule_id': str(next_id),
+                'rule_xml': rule_xml,
+                'category': template_config['category'],
+                'severity': template_config['severity'],
+                'intent': entry['intent'],
+                'parameters': entry['parameters']
+            })
+            next_id += 1
+
+        # Compiled one by one, every block_ip address and every other intent is its own rule.
+        rules_before = addresses_in + intents_in - block_intents
+        return {
+            'success': not errors,
+            'rules': rules,
+            'errors': errors,
+            'report': {
+                'intents': intents_in,
+                'block_ip_addresses': addresses_in,
+                'cidr_ranges': cidr_ranges,
+                'duplicates_removed': duplicates,
+                'rules_before': rules_before,
+                'rules_after': len(rules),
+                'rule_bytes': sum(len(rule['rule_xml']) for rule in rules)
+            }
+        }
+
+    @classmethod
+    def get_required_params(cls, intent: str) -> List[str]:
+        """Get required parameters for an intent type."""
+        if intent not in cls.INTENT_TEMPLATES:
+            return []
+
+        template = cls.INTENT_TEMPLATES[intent]['rule_template']
+        # Extract {param} placeholders (excluding 'id')
+        import re
+        params = re.findall(r'\{(\w+)\}', template)
+        return [p for p in params if p != 'id']
+
+
+def compile_nl_to_siem(
+    natural_language_intent: str,
+    context: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """
+    Main function to compile natural language into SIEM rules.
+
+    Args:
+        natural_language_intent: Natural language description of security intent
+        context: Optional context information
+
+    Returns:
+        Dictionary containing compiled rules and enforcement plan
+    """
+    if context is None:
+        context = {}
+
+    # Parse intent from natural language (simplified - would use NLP in production)
+    intent_mapping = {
+        'block': ('block_ip', lambda: {'ip': context.get('ip', '0.0.0.0'), 'reason': context.get('reason', 'security_policy')}),
+        'detect': ('detect_anomaly', lambda: {'pattern': context.get('pattern', '.*'), 'description': natural_language_intent}),
+        'limit': ('rate_limit', lambda: {'resource': context.get('resource', 'api'), 'parent_id': '10001', 'description': natural_language_intent}),
+        'privilege': ('privilege_escalation', lambda: {'description': natural_language_intent}),
+        'exfil': ('data_exfiltration', lambda: {'description': natural_language_intent})
+    }
+
+    detected_intent = None
+    parameters = {}
+
+    for keyword, (intent_type, param_fn) in intent_mapping.items():
+        if keyword in natural_language_intent.lower():
+            detected_intent = intent_type
+            parameters = param_fn()
+            break
+
+    if not detected_intent:
+        return {
+            'success': False,
+            'error': 'Could not parse intent from natural language',
+            'input': natural_language_intent,
+            'suggestion': 'Try using keywords like: block, detect, limit, privilege, exfil'
+        }
+
+    # Compile the rule
+    compilation_result = WazuhRuleCompiler.compile_intent(detected_intent, parameters)
+
+    if not compilation_result['success']:
+        return compilation_result
+
+    # Generate deployment plan
+    deployment_plan = {
+        'step_1': 'Validate rule syntax',
+        'step_2': 'Deploy to Wazuh manager',
+        'step_3': 'Restart Wazuh service',
+        'step_4': 'Verify rule activation',
+        'step_5': 'Log deployment to audit trail'
+    }
+
+    # Generate evidence span
+    evidence_span_id = hashlib.sha256(
+        f"{natural_language_intent}{compilation_result['rule_id']}".encode()
+    ).hexdigest()[:16]
+
+    return {
+        'success': True,
+        'natural_language_intent': natural_language_intent,
+        'parsed_intent': detected_intent,
+        'compiled_rule': compilation_result,
+        'deployment_plan': deployment_plan,
+        'enforcement_mode': context.get('enforcement_mode', 'audit'),
+        'evidence_span_id': evidence_span_id,
+        'safety_warning': 'CRITICAL: Direct execution of SIEM rules requires authorization. This is a preview only.',
+        'requires_approval': True,
+        'approval_type': 'star_chamber'
+    }
+
+
+def query_siem_logs(
+    query_intent: str,
+    time_range: Dict[str, Any] = None,
+    filters: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """
+    Compile natural language into Wazuh query.
+
+    Args:
+        query_intent: Natural language query description
+        time_range: Time range for query ({'last': '24h'} or {'from': ..., 'to': ...})
+        filters: Additional filters. 'aggregations' (a list of operator specs,
+            see siem_aggregation) runs them over the local alert files in
+            'alerts_path' (default /var/ossec/logs/alerts/alerts.json), on the
+            alerts matching the 'where' override or else the compiled template
+            query (every alert when the intent matched no template)
+
+    Returns:
+        Dictionary containing compiled query
+    """
+    if time_range is None:
+        time_range = {'last': '24h'}
+    if filters is None:
+        filters = {}
+
+    # Map common query intents to Wazuh API queries
+    query_templates = {
+        'failed_logins': {
+            'endpoint': '/security_events',
+            'query': 'rule.groups=authentication_failed',
+            'fields': ['agent.name', 'rule.description', 'timestamp']
+        },
+        'high_severity': {
+            'endpoint': '/alerts',
+            'query': 'rule.level>=10',
+            'fields': ['rule.id', 'rule.description', 'agent.name', 'timestamp']
+        },
+        'anomalies': {
+            'endpoint': '/security_events',
+            'query': 'rule.groups=threat_detection',
+            'fields': ['rule.description', 'data.srcip', 'timestamp']
+        }
+    }
+
+    # Simple keyword matching (would use NLP in production)
+    detected_template = None
+    for keyword, template in query_templates.items():
+        if keyword.replace('_', ' ') in query_intent.lower():
+            detected_template = template
+            break
+
+    # Only template queries name fields local alerts actually have; free text filters nothing locally.
+    local_query = detected_template['query'] if detected_template else None
+    if not detected_template:
+        detected_template = {
+            'endpoint': '/security_events',
+            'query': f'description~{query_intent}',
+            'fields': ['*']
+        }
+
+    # Build full query
+    full_query = {
+        'endpoint': detected_template['endpoint'],
+        'query': detected_template['query'],
+        'fields': detected_template['fields'],
+        'time_range': time_range,
+        'filters': filters,
+        'limit': filters.get('limit', 100)
+    }
+
+    result = {
+        'success': True,
+        'query_intent': query_intent,
+        'compiled_query': full_query,
+        'execution_mode': 'read_only',
+        'estimated_results': 'unknown'
+    }
+
+    if filters.get('aggregations'):
+        # Imported here so compiling queries does not load the aggregation operators.
+        from .siem_aggregation import DEFAULT_ALERTS_PATH, aggregate_alert_files
+        try:
+            aggregated = aggregate_alert_files(
+                filters.get('alerts_path', DEFAULT_ALERTS_PATH),
+                filters['aggregations'],
+                filters.get('where', local_query),
+                time_range
+            )
+        except (OSError, ValueError) as e:
+            return {**result, 'success': False, 'error': f'Aggregation failed: {e}'}
+        result['aggregations'] = aggregated['aggregations']
+        result['scan'] = aggregated['scan']
+        result['estimated_results'] = aggregated['scan']['alerts_matched']
+
+    return result
+
+
+def main():
+    """CLI interface for the Wazuh-MCP Bridge."""
+    if len(sys.argv) < 2:
+        print(json.dumps({
+            'error': 'Usage: wazuh_mcp_bridge.py <mode> <intent> [context_json]',
+            'modes': ['compile', 'query', 'compile_batch']
+        }))
+        sys.exit(1)
+
+    mode = sys.argv[1]
+    intent = sys.argv[2] if len(sys.argv) > 2 else ''
+    context = json.loads(sys.argv[3]) if len(sys.argv) > 3 else {}
+
+    if mode == 'compile':
+        result = compile_nl_to_siem(intent, context)
+    elif mode == 'query':
+        result = query_siem_logs(intent, context.get('time_range'), context.get('filters'))
+    elif mode == 'compile_batch':
+        # intent is the path of a JSON array or JSON lines file of {"intent", "parameters"} items
+        with open_text(intent or '-') as stream:
+            result = WazuhRuleCompiler.compile_batch(
+                iter_json_items(stream), context.get('max_per_rule', MAX_SRCIPS_PER_RULE), context.get('first_rule_id')
+            )
+    else:
+        result = {'error': f'Unknown mode: {mode}', 'supported_modes': ['compile', 'query', 'compile_batch']}
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
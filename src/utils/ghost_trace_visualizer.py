@@ -1,13 +0,0 @@
-
-"""
-Ghost Trace Visualizer
-Function: "True latent intent vs output" visualization
-"""
-
-def visualize_trace(trace_data, output_path="trace_vis.html"):
-    print(f"[Ghost] Generating visualization at {output_path}...")
-    # D3.js or Matplotlib generation logic would go here
-    pass
-
-def generate_heatmap(activations):
-    pass
@@ -0,0 +1,77 @@
+"""Vectorized inter-rater agreement and batched bootstrap intervals."""
+
+import numpy as np
+import pytest
+
+from forensics.audit_tools import (
+    bootstrap_agreement,
+    cohens_kappa_matrix,
+    encode_labels,
+    fleiss_kappa,
+    krippendorff_alpha,
+    pairwise_cohens_kappa,
+)
+
+# Fleiss (1971) style example: 10 items, 3 raters, 3 categories.
+LABELS = np.array([
+    [0, 0, 0], [0, 0, 1], [1, 1, 1], [1, 2, 1], [2, 2, 2],
+    [0, 1, 0], [2, 2, 1], [1, 1, 1], [0, 0, 0], [2, 2, 2],
+])
+
+
+def _fleiss_reference(labels):
+    k = labels.max() + 1
+    counts = np.array([[np.sum(row == c) for c in range(k)] for row in labels], dtype=float)
+    n = counts.sum(axis=1)[0]
+    agreement = ((counts ** 2).sum(axis=1) - n) / (n * (n - 1))
+    proportions = counts.sum(axis=0) / counts.sum()
+    chance = (proportions ** 2).sum()
+    return (agreement.mean() - chance) / (1 - chance)
+
+
+def test_fleiss_matches_the_textbook_formula():
+    assert fleiss_kappa(LABELS) == pytest.approx(_fleiss_reference(LABELS))
+
+
+def test_cohen_matches_the_confusion_matrix():
+    first, second = LABELS[:, 0], LABELS[:, 1]
+    observed = np.mean(first == second)
+    chance = sum(np.mean(first == c) * np.mean(second == c) for c in range(3))
+    assert cohens_kappa_matrix(LABELS) == pytest.approx((observed - chance) / (1 - chance))
+    matrix = pairwise_cohens_kappa(LABELS)
+    assert matrix[0, 1] == matrix[1, 0] == pytest.approx(cohens_kappa_matrix(LABELS))
+    assert np.allclose(np.diag(matrix), 1.0)
+
+
+def test_krippendorff_perfect_and_interval_agreement():
+    assert krippendorff_alpha(np.repeat(LABELS[:, :1], 3, axis=1)) == pytest.approx(1.0)
+    assert krippendorff_alpha(LABELS, level='interval') > krippendorff_alpha(LABELS)
+
+
+def test_missing_ratings_do_not_depend_on_dtype():
+    numeric = [[1, -1, 2], [1, 1, -1], [2, 2, 2], [1, 2, 1]]
+    objects = [[1, None, 2], [1, 1, -1], [2, 2, 2], [1, 2, 1]]
+    codes, categories = encode_labels(np.array(objects, dtype=object))
+    assert len(categories) == 2
+    assert (codes == -1).sum() == 2
+    assert fleiss_kappa(np.array(objects, dtype=object)) == pytest.approx(fleiss_kappa(numeric))
+    assert krippendorff_alpha(np.array(objects, dtype=object)) == pytest.approx(krippendorff_alpha(numeric))
+
+
+def test_bootstrap_is_seeded_and_brackets_the_estimate():
+    rng = np.random.default_rng(0)
+    truth = rng.integers(0, 3, 300)
+    labels = np.where(rng.random((300, 4)) < 0.8, truth[:, None], rng.integers(0, 3, (300, 4)))
+    first = bootstrap_agreement(labels, n_resamples=300, seed=5)
+    again = bootstrap_agreement(labels, n_resamples=300, seed=5, chunk_size=7)
+    assert first == again
+    assert first['ci_low'] < first['estimate'] < first['ci_high']
+    assert first['estimate'] == pytest.approx(fleiss_kappa(labels))
+
+
+def test_bootstrap_chunks_respect_the_memory_budget():
+    labels = np.zeros((1000, 2), dtype=int)
+    labels[::3, 1] = 1
+    small = bootstrap_agreement(labels, 'cohen', n_resamples=50, seed=1, memory_budget=1)
+    assert small == bootstrap_agreement(labels, 'cohen', n_resamples=50, seed=1)
+    assert bootstrap_agreement(np.full((3, 2), -1), n_resamples=10)['n_items'] == 0
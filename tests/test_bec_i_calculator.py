@@ -0,0 +1,59 @@
+"""Scalar, batched and tracked coupling scores."""
+
+import numpy as np
+import pytest
+
+from forensics.bec_i_calculator import (
+    FEATURES,
+    CouplingTracker,
+    calculate_coupling,
+    calculate_coupling_batch,
+    to_feature_matrix,
+)
+
+ROWS = [
+    {"alignment": 0.9, "anomaly": 0.1, "volatility": 0.2, "memory_drift": 0.4},
+    {"alignment": 0.2, "anomaly": 0.9},
+    {"alignment": 1.0, "volatility": 1.0, "memory_drift": 1.0},
+]
+
+
+def test_batch_matches_scalar_for_every_input_shape():
+    expected = [calculate_coupling(row) for row in ROWS]
+    matrix = to_feature_matrix(ROWS)
+    columns = {name: matrix[:, index] for index, name in enumerate(FEATURES)}
+    for features in (ROWS, matrix, columns):
+        assert calculate_coupling_batch(features).tolist() == pytest.approx(expected)
+    assert expected[1] == 0.0 and expected[2] == 1.0  # clamped
+
+
+def test_weight_overrides():
+    weights = {"anomaly": 0.0}
+    assert calculate_coupling(ROWS[1], weights) == pytest.approx(0.1)
+    assert calculate_coupling_batch(ROWS, weights)[1] == pytest.approx(0.1)
+
+
+def test_empty_batch():
+    assert calculate_coupling_batch([]).shape == (0,)
+
+
+def test_tracker_rings_and_repeated_sessions():
+    tracker = CouplingTracker(window=3, capacity=1)
+    matrix = to_feature_matrix(ROWS)
+    tracker.update(["a", "b", "a"], matrix)
+    tracker.update(["a", "a"], matrix[[2, 0]])
+    scores = calculate_coupling_batch(ROWS)
+    assert len(tracker) == 2
+    assert tracker.history("a").tolist() == pytest.approx([scores[2], scores[2], scores[0]])
+    assert tracker.rolling_mean()["b"] == pytest.approx(scores[1])
+    assert tracker.history("missing").size == 0
+
+
+def test_rejected_update_registers_no_sessions():
+    tracker = CouplingTracker(window=4)
+    tracker.update(["a"], ROWS[:1])
+    with pytest.raises(ValueError):
+        tracker.update(["a", "b", "c"], ROWS[:2])
+    assert len(tracker) == 1
+    assert list(tracker.rolling_mean()) == ["a"]
+    assert tracker.history("a").size == 1
@@ -0,0 +1,78 @@
+"""Vectorized PR/ROC curves and windowed metrics against a brute-force reference."""
+
+import numpy as np
+import pytest
+
+from forensics.collateral_damage_scorer import (
+    SlidingWindowAccumulator,
+    compute_curves,
+    compute_detector_curves,
+    compute_window_metrics,
+)
+
+
+def _confusion(scores, labels, threshold):
+    alerts = scores >= threshold
+    return (int(np.sum(alerts & labels)), int(np.sum(alerts & ~labels)),
+            int(np.sum(~alerts & labels)), int(np.sum(~alerts & ~labels)))
+
+
+@pytest.fixture
+def stream():
+    rng = np.random.default_rng(3)
+    labels = rng.random(2000) < 0.3
+    scores = np.round(np.clip(rng.normal(0.4 + 0.3 * labels, 0.15), 0, 1), 2)
+    return scores, labels
+
+
+def test_curves_match_per_threshold_counts(stream):
+    scores, labels = stream
+    curves = compute_curves(scores, labels)
+    assert np.array_equal(curves.thresholds, np.unique(scores)[::-1])
+    for index in range(0, curves.thresholds.size, 7):
+        tp, fp, fn, tn = _confusion(scores, labels, curves.thresholds[index])
+        assert (curves.true_positives[index], curves.false_positives[index],
+                curves.false_negatives[index], curves.true_negatives[index]) == (tp, fp, fn, tn)
+        assert curves.false_positive_rate[index] == pytest.approx(fp / (fp + tn))
+    metrics = curves.at(0.5)
+    tp, fp, fn, tn = _confusion(scores, labels, 0.5)
+    assert metrics.precision == pytest.approx(tp / (tp + fp))
+    assert metrics.recall == pytest.approx(tp / (tp + fn))
+    assert curves.at(2.0).recall == 0.0
+    assert 0.5 < curves.auc() <= 1.0
+
+
+def test_detector_curves_equal_separate_sorts(stream):
+    scores, labels = stream
+    detectors = np.where(np.arange(scores.size) % 3 == 0, "psyop", "sere")
+    grouped = compute_detector_curves(scores, labels, detectors)
+    for name in ("psyop", "sere"):
+        mask = detectors == name
+        alone = compute_curves(scores[mask], labels[mask])
+        assert np.array_equal(grouped[name].thresholds, alone.thresholds)
+        assert np.array_equal(grouped[name].true_positives, alone.true_positives)
+
+
+def test_window_metrics_bin_tumbling_windows(stream):
+    scores, labels = stream
+    timestamps = np.arange(scores.size) * 0.5 + 100
+    windows = compute_window_metrics(scores, labels, timestamps, threshold=0.5, window=60)
+    assert windows["window_start"][:2].tolist() == [100, 160]
+    first = slice(0, 120)
+    assert (int(windows["true_positives"][0]), int(windows["false_positives"][0])) == \
+        _confusion(scores[first], labels[first], 0.5)[:2]
+    assert compute_window_metrics([], [], [], 0.5, 60)["window_start"].size == 0
+
+
+def test_sliding_accumulator_forgets_retired_slots(stream):
+    scores, labels = stream
+    accumulator = SlidingWindowAccumulator(bins=100, slots=2)
+    accumulator.update(scores[:1000], labels[:1000])
+    accumulator.advance()
+    accumulator.update(scores[1000:], labels[1000:])
+    assert accumulator.histogram().sum() == scores.size
+    accumulator.advance()
+    assert accumulator.histogram().sum() == 1000
+    curves = accumulator.curves()
+    tp, fp, _, _ = _confusion(scores[1000:], labels[1000:], 0.5)
+    assert curves.at(0.5).precision == pytest.approx(tp / (tp + fp))
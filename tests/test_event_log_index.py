@@ -0,0 +1,73 @@
+"""Incremental indexing, lookups and time-range scans over the event log."""
+
+import json
+import sys
+
+import pytest
+
+from forensics import event_log_index
+from forensics.event_log_index import EventLogIndex
+
+
+def _append(path, *records, tail=b""):
+    with open(path, "ab") as handle:
+        for record in records:
+            handle.write(json.dumps(record).encode() + b"\n")
+        handle.write(tail)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "event_log.jsonl"
+    _append(
+        path,
+        {"timestamp": "2026-01-01T00:00:00Z", "action_id": "a1", "tool": "shell"},
+        {"timestamp": 1767225660000, "action_id": "a2", "payload": {"tool_name": "browser"}},
+        {"timestamp": 1767225720, "evidence_span_id": "span-1", "action_id": "a1"},
+    )
+    return str(path)
+
+
+def test_lookup_and_time_range(log_path):
+    with EventLogIndex(log_path) as index:
+        assert index.refresh()["indexed_records"] == 3
+        assert [record["timestamp"] for record in index.lookup("action_id", "a1")] == [
+            "2026-01-01T00:00:00Z", 1767225720]
+        assert index.lookup("tool", "browser")[0]["action_id"] == "a2"
+        assert index.lookup("evidence_span_id", "missing") == []
+        in_range = list(index.time_range("2026-01-01T00:00:30Z", 1767225720))
+        assert [record["action_id"] for record in in_range] == ["a2"]
+        with pytest.raises(ValueError):
+            index.lookup("rationale", "x")
+
+
+def test_refresh_is_incremental_and_waits_for_complete_lines(log_path):
+    with EventLogIndex(log_path) as index:
+        index.refresh()
+        _append(log_path, {"timestamp": 1767225780, "action_id": "a3"}, tail=b'{"action_id": "a4"')
+        assert index.refresh()["indexed_records"] == 1
+        _append(log_path, tail=b', "timestamp": 1767225840}\nnot json\n')
+        refresh = index.refresh()
+        assert (refresh["indexed_records"], refresh["skipped_lines"]) == (1, 1)
+        assert index.stats()["records"] == 5
+        assert index.lookup("action_id", "a4")[0]["timestamp"] == 1767225840
+
+
+def test_replaced_log_is_reindexed(log_path):
+    with EventLogIndex(log_path) as index:
+        index.refresh()
+    with open(log_path, "w") as handle:
+        handle.write(json.dumps({"timestamp": 5, "action_id": "fresh"}) + "\n" * 200)
+    with EventLogIndex(log_path) as index:
+        index.refresh()
+        assert index.stats()["records"] == 1
+        assert index.lookup("action_id", "a1") == []
+
+
+@pytest.mark.parametrize("argv", [["frobnicate"], ["lookup", "{log}", "action_id"]])
+def test_cli_usage_errors_exit_nonzero(log_path, monkeypatch, capsys, argv):
+    monkeypatch.setattr(sys, "argv", ["event_log_index.py"] + [arg.format(log=log_path) for arg in argv])
+    with pytest.raises(SystemExit) as exit_info:
+        event_log_index.main()
+    assert exit_info.value.code == 1
+    assert "Usage" in json.loads(capsys.readouterr().out)["error"]
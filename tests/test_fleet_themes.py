@@ -0,0 +1,106 @@
+"""Count-min, Space-Saving and decayed fleet-wide theme aggregation."""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from forensics.fleet_themes import OTHER_COHORT, CountMinSketch, FleetThemes, SpaceSaving
+
+HOUR = 3600.0
+WORDS = [f"theme{index:03d}" for index in range(300)]
+
+
+def _stream(count, seed):
+    rng = random.Random(seed)
+    # Zipf-like: a few themes dominate, the tail is long.
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    return [" ".join(rng.choices(WORDS, weights, k=3)) for _ in range(count)]
+
+
+def test_count_min_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    truth = Counter()
+    for text in _stream(2000, 1):
+        for word in text.split():
+            sketch.add(word)
+            truth[word] += 1
+    assert all(sketch.estimate(word) >= count for word, count in truth.items())
+    bound = 2.72 * sum(truth.values()) / 64
+    assert all(sketch.estimate(word) - count <= bound for word, count in truth.most_common(10))
+
+
+def test_space_saving_bounds_and_heavy_hitters():
+    summary = SpaceSaving(capacity=20)
+    truth = Counter()
+    for text in _stream(3000, 2):
+        for word in text.split():
+            summary.add(word)
+            truth[word] += 1
+    total = sum(truth.values())
+    for key, count, error in summary.top():
+        assert count - error <= truth[key] <= count
+    assert {word for word, count in truth.items() if count > total / 20} <= set(summary.counts)
+
+
+def test_counts_decay_with_the_half_life():
+    fleet = FleetThemes(half_life=HOUR, landmark=0.0)
+    fleet.observe({"content": "vaccine mandates"}, timestamp=0.0)
+    fleet.observe({"content": "vaccine"}, timestamp=HOUR)
+    assert fleet.estimate("vaccine", now=HOUR) == pytest.approx(1.5)
+    assert fleet.estimate("mandates", now=3 * HOUR) == pytest.approx(0.125)
+    report = fleet.report(now=HOUR)
+    assert report["interactions"] == pytest.approx(1.5)
+    assert report["themes"][0]["theme"] == "vaccine"
+    assert fleet.report(now=1e9)["interactions"] == 0.0  # far past the landmark: underflows, no overflow
+
+
+def test_rescaling_keeps_estimates():
+    fleet = FleetThemes(half_life=HOUR, landmark=0.0)
+    fleet.observe({"content": "election"}, timestamp=0.0)
+    later = 40 * HOUR  # far enough for the weights to be rescaled to a new landmark
+    fleet.observe({"content": "election"}, timestamp=later)
+    assert fleet.landmark == later
+    assert fleet.estimate("election", now=later) == pytest.approx(1.0 + 2.0 ** -40)
+
+
+def test_merged_workers_match_a_single_aggregator():
+    texts = _stream(600, 3)
+    single = FleetThemes(half_life=HOUR, landmark=0.0)
+    workers = [FleetThemes(half_life=HOUR, landmark=0.0), FleetThemes(half_life=HOUR, landmark=5 * HOUR)]
+    for index, text in enumerate(texts):
+        timestamp = index * 30.0
+        cohort = f"c{index % 3}"
+        single.observe({"content": text}, cohort, timestamp)
+        workers[index % 2].observe({"content": text}, cohort, timestamp)
+    merged = FleetThemes.from_state(json.loads(json.dumps(workers[0].to_state())))
+    merged.merge(FleetThemes.from_state(workers[1].to_state()))
+
+    now = len(texts) * 30.0
+    expected, actual = single.report(now), merged.report(now)
+    assert actual["interactions"] == pytest.approx(expected["interactions"], rel=1e-6)
+    assert [entry["theme"] for entry in actual["themes"][:5]] == [entry["theme"] for entry in expected["themes"][:5]]
+    for name, stats in expected["cohorts"].items():
+        assert actual["cohorts"][name]["diversity"] == pytest.approx(stats["diversity"], abs=1e-4)
+        assert actual["cohorts"][name]["interactions"] == pytest.approx(stats["interactions"], rel=1e-6)
+    for word in WORDS[:10]:
+        assert merged.estimate(word, now) >= single.estimate(word, now) * (1 - 1e-9)
+
+    with pytest.raises(ValueError):
+        merged.merge(FleetThemes(half_life=2 * HOUR))
+
+
+def test_cohorts_are_capped_and_narrowing_is_flagged():
+    fleet = FleetThemes(half_life=100 * HOUR, landmark=0.0, max_cohorts=2)
+    varied = "however some people might disagree, it depends on context; alternatively perhaps not"
+    for step in range(50):
+        fleet.observe({"content": varied}, "team", step * HOUR)
+    for step in range(50, 80):
+        fleet.observe({"content": "it must always be so, never otherwise"}, "team", step * HOUR)
+    for name in ("a", "b", "c"):
+        fleet.observe({"content": "plain words"}, name, 80 * HOUR)
+    report = fleet.report(now=80 * HOUR)
+    assert set(report["cohorts"]) == {"team", "a", OTHER_COHORT}
+    assert report["cohorts"][OTHER_COHORT]["interactions"] > 0
+    assert report["narrowing_cohorts"] == ["team"]
@@ -0,0 +1,41 @@
+"""The benchmark harness: deterministic corpora, every case runnable, regression checks."""
+
+import pytest
+
+import forensics_bench
+from forensics_bench import CASES, SyntheticCorpus, compare, measure, run_suite
+
+
+def test_corpus_is_deterministic_per_seed():
+    first, second, other = SyntheticCorpus(7), SyntheticCorpus(7), SyntheticCorpus(8)
+    assert first.trace(200) == second.trace(200) != other.trace(200)
+    assert first.jpeg(4096) == second.jpeg(4096)
+    assert first.jpeg(4096)[:2] == b"\xff\xd8"
+
+
+def test_every_case_builds_and_runs_at_the_small_size(monkeypatch):
+    monkeypatch.setenv("HARBINGER_STAR_CHAMBER_SECRET", "bench-test-secret-0123456789")
+    monkeypatch.setattr(forensics_bench, "measure", lambda run, min_time: measure(run, 0.0, 1, 1))
+    results = run_suite(sizes=("small",), min_time=0.0)["results"]
+    assert set(results) == {f"{name}[small]" for name in CASES}
+    failed = {key: result for key, result in results.items() if result["status"] not in ("ok", "skipped")}
+    assert not failed
+    assert all(result["peak_bytes"] >= 0 for result in results.values() if result["status"] == "ok")
+
+
+def _results(**p50):
+    return {"results": {key: {"status": "ok", "p50_ms": value, "peak_bytes": 1000} for key, value in p50.items()}}
+
+
+def test_compare_flags_regressions_against_a_baseline():
+    report = compare(_results(a=10.0, b=10.0, c=10.0), _results(a=13.0, b=5.0, c=11.0, d=1.0), tolerance=0.25)
+    statuses = {row["case"]: row["status"] for row in report["cases"]}
+    assert statuses == {"a": "regression", "b": "improvement", "c": "ok", "d": "new"}
+    assert report["regressions"] == 1 and not report["passed"]
+
+
+@pytest.mark.parametrize("name", ["compare_traces", "detect_unicode", "bootstrap_agreement"])
+def test_cases_are_registered(name):
+    target, _, sizes, _ = CASES[name]
+    assert target.startswith("forensics.")
+    assert set(sizes) == {"small", "medium", "large"}
@@ -0,0 +1,84 @@
+"""Token-level divergence alignment between internal traces and outputs."""
+
+import difflib
+import random
+
+import pytest
+
+from forensics.ghost_autopsy import align_traces, compare_traces
+
+
+def _edited(rng, tokens, edits, vocabulary):
+    edited = list(tokens)
+    for _ in range(edits):
+        position = rng.randrange(len(edited))
+        choice = rng.random()
+        if choice < 0.33:
+            edited.insert(position, rng.choice(vocabulary))
+        elif choice < 0.66:
+            del edited[position]
+        else:
+            edited[position] = rng.choice(vocabulary)
+    return edited
+
+
+def test_short_traces_match_difflib():
+    internal = "first inspect the logs then quietly disable the audit hook and report success"
+    external = "first inspect the logs then report success to the operator"
+    alignment = align_traces(internal, external)
+    matcher = difflib.SequenceMatcher(None, internal.split(), external.split(), autojunk=False)
+    assert alignment["matched_tokens"] == sum(block.size for block in matcher.get_matching_blocks())
+    assert alignment["method"] == "myers"
+    omitted = [span for span in alignment["spans"] if span["type"] == "omitted"]
+    assert omitted[0]["internal_text"] == "quietly disable the audit hook and"
+    start, end = omitted[0]["internal_chars"]
+    assert internal[start:end] == omitted[0]["internal_text"]
+
+
+def test_long_traces_over_a_small_vocabulary_are_chunked_not_replaced():
+    rng = random.Random(0)
+    vocabulary = [f"w{index}" for index in range(500)]
+    internal = [rng.choice(vocabulary) for _ in range(20000)]
+    external = _edited(rng, internal, 100, vocabulary)
+    alignment = align_traces(" ".join(internal), " ".join(external), time_budget=5.0)
+    assert alignment["method"] == "chunked"
+    assert alignment["coverage"] > 0.98
+    assert all(span["internal_end"] - span["internal_start"] < 50 for span in alignment["spans"])
+
+
+def test_rare_tokens_anchor_when_none_are_unique():
+    rng = random.Random(1)
+    vocabulary = [f"w{index}" for index in range(40)]
+    first = [f"r{index}" for index in range(1500)]
+    second = rng.sample(first, len(first))
+    # Every token the two sides share appears exactly twice on each, so none is
+    # unique, and differing ends keep prefix/suffix trimming from creating any.
+    internal = ["plan"] + first + second + ["done"]
+    external = ["output"] + _edited(rng, first, 60, vocabulary) + _edited(rng, second, 60, vocabulary) + ["end"]
+    alignment = align_traces(" ".join(internal), " ".join(external), time_budget=5.0)
+    assert alignment["method"] == "anchored"
+    assert alignment["coverage"] > 0.95
+
+
+def test_time_budget_falls_back_to_coarse_spans():
+    rng = random.Random(2)
+    vocabulary = [f"w{index}" for index in range(50)]
+    internal = " ".join(rng.choice(vocabulary) for _ in range(5000))
+    external = " ".join(rng.choice(vocabulary) for _ in range(5000))
+    alignment = align_traces(internal, external, time_budget=0.0)
+    assert alignment["method"] == "fallback"
+    assert [span["type"] for span in alignment["spans"]] == ["contradicting"]
+
+
+def test_compare_traces_summary():
+    result = compare_traces("plan: exfiltrate the keys then apologise", "I cannot help with that, apologies")
+    assert result["verdict"] == "divergent"
+    assert result["alignment"]["internal_tokens"] == 6
+    assert {span["type"] for span in result["spans"]} <= {"omitted", "inserted", "contradicting"}
+    assert compare_traces("", "output")["verdict"] == "insufficient"
+
+
+@pytest.mark.parametrize("internal, external", [("same text here", "same text here"), ("a b c", "")])
+def test_edge_alignments(internal, external):
+    alignment = align_traces(internal, external)
+    assert alignment["coverage"] == (1.0 if external else 0.0)
@@ -0,0 +1,69 @@
+"""Chunked, budget-bounded activation pyramids and heatmaps."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from forensics.ghost_trace_visualizer import build_pyramid, generate_heatmap, visualize_trace
+
+
+@pytest.fixture
+def activations(tmp_path):
+    data = np.random.default_rng(0).normal(size=(3, 1000, 5)).astype(np.float32)
+    path = tmp_path / "trace.npy"
+    np.save(path, data)
+    return data, str(path)
+
+
+def _reference(data, block):
+    tokens = data.shape[1]
+    columns = []
+    for start in range(0, tokens, block):
+        window = data[:, start:start + block, :]
+        columns.append((window.min(axis=(1, 2)), window.max(axis=(1, 2)), window.mean(axis=2).mean(axis=1)))
+    return np.stack([np.stack(stat, axis=1) for stat in zip(*columns)])
+
+
+@pytest.mark.parametrize("memory_budget", [60, 4 * 3 * 5 * 37, 2 ** 20])
+def test_pyramid_is_independent_of_the_chunking(activations, tmp_path, memory_budget):
+    data, path = activations
+    pyramid, (low, high) = build_pyramid(path, tmp_path / "tiles", [0, 3, 6], memory_budget=memory_budget)
+    for level in (0, 3, 6):
+        assert np.allclose(pyramid[level], _reference(data, 2 ** level), atol=1e-5)
+    means = data.mean(axis=2)
+    assert low == pytest.approx(means.min()) and high == pytest.approx(means.max())
+
+
+def test_heatmap_fits_the_requested_width(activations):
+    data, path = activations
+    heatmap = generate_heatmap(path, max_columns=100, memory_budget=200)
+    assert heatmap.shape == (3, 3, 63)
+    assert np.allclose(heatmap, _reference(data, 16), atol=1e-5)
+
+
+def test_visualize_trace_returns_paths_and_highlights_spans(activations, tmp_path, capsys):
+    _, path = activations
+    output = str(tmp_path / "trace.html")
+    divergence = {"spans": [{"type": "inserted", "internal_start": 10, "internal_end": 40}]}
+    summary = visualize_trace(path, output, levels=(0, 4), divergence=divergence, tile_columns=256)
+    assert capsys.readouterr().out == ""
+    assert summary["viewer"] == output and os.path.exists(output)
+    assert [tile["file"] for tile in summary["levels"]["4"]["tiles"]] == ["level_4_tile_0.png"]
+    assert len(summary["levels"]["0"]["tiles"]) == 4
+    with open(os.path.join(summary["tile_dir"], "manifest.json")) as handle:
+        assert json.load(handle)["spans"] == divergence["spans"]
+
+
+@pytest.mark.parametrize("shape", [(3, 0, 5), (0, 10, 5), (3, 10, 0)])
+def test_empty_activations_are_rejected(tmp_path, shape):
+    with pytest.raises(ValueError, match="empty"):
+        build_pyramid(np.zeros(shape, dtype=np.float32), tmp_path, [0])
+    with pytest.raises(ValueError, match="empty"):
+        generate_heatmap(np.zeros(shape, dtype=np.float32))
+
+
+def test_levels_are_required(activations, tmp_path):
+    with pytest.raises(ValueError, match="levels"):
+        build_pyramid(activations[0], tmp_path, [])
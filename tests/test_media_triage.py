@@ -0,0 +1,84 @@
+"""Single-pass evidence triage and resumable directory runs."""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+from forensics import media_triage
+from forensics.media_triage import HEAD_SIZE, load_manifest, triage_directory, triage_file
+
+
+def _segment(marker, body):
+    return bytes([0xFF, marker]) + (len(body) + 2).to_bytes(2, "big") + body
+
+
+JPEG = b"".join([
+    b"\xff\xd8",
+    _segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"),
+    _segment(0xE1, b"Exif\x00\x00" + bytes(100)),
+    _segment(0xED, b"Photoshop 3.0\x00" + bytes(32)),
+    _segment(0xDA, b"\x01\x01\x00\x00\x3f\x00"),
+    bytes(range(0xFE)) * 4,
+    b"\xff\xd9",
+])
+
+
+@pytest.fixture
+def evidence(tmp_path):
+    root = tmp_path / "evidence"
+    (root / "photos").mkdir(parents=True)
+    (root / "photos" / "a.jpg").write_bytes(JPEG)
+    # Marker straddling the boundary between the head read and the next chunk.
+    (root / "encoded.bin").write_bytes(b"\x00" * (HEAD_SIZE - 4) + b"Lavf58" + b"\x00" * 10)
+    (root / "notes.txt").write_bytes(b"plain notes")
+    return root
+
+
+def test_triage_file_hashes_sniffs_and_strips(evidence, tmp_path):
+    strip_dir = tmp_path / "stripped"
+    strip_dir.mkdir()
+    result = triage_file(str(evidence / "photos" / "a.jpg"), str(evidence), str(strip_dir))
+    assert "error" not in result
+    assert result["path"] == os.path.join("photos", "a.jpg")
+    assert result["mime"] == "image/jpeg"
+    assert result["digests"]["sha256"] == hashlib.sha256(JPEG).hexdigest()
+    assert result["digests"]["md5"] == hashlib.md5(JPEG).hexdigest()
+    assert result["flags"] == ["META_SOFTWARE_PHOTOSHOP"]
+    assert [segment["marker"] for segment in result["stripped"]["removed_segments"]] == ["APP1", "APP13"]
+    stripped = (strip_dir / result["stripped"]["file"]).read_bytes()
+    assert hashlib.sha256(stripped).hexdigest() == result["stripped"]["sha256"]
+    assert b"Photoshop" not in stripped
+
+
+def test_marker_split_across_reads_is_flagged(evidence):
+    assert triage_file(str(evidence / "encoded.bin"))["flags"] == ["VID_ENCODER_FFMPEG_DETECTED"]
+
+
+def test_directory_runs_resume_from_the_manifest(evidence, tmp_path):
+    manifest = str(tmp_path / "manifest.jsonl")
+    first = triage_directory(str(evidence), manifest, workers=1, batch_size=2)
+    assert (first["processed"], first["resumed"], first["errors"]) == (3, 0, 0)
+    assert first["flags"] == {"META_SOFTWARE_PHOTOSHOP": 1, "VID_ENCODER_FFMPEG_DETECTED": 1}
+
+    (evidence / "notes.txt").write_bytes(b"edited notes")
+    second = triage_directory(str(evidence), manifest, workers=1)
+    assert (second["processed"], second["resumed"]) == (1, 2)
+    assert len(load_manifest(manifest)) == 4
+
+
+def test_files_vanishing_during_the_walk_are_recorded(evidence, tmp_path, monkeypatch):
+    class Vanished:
+        path = str(evidence / "gone.bin")
+
+        def stat(self, follow_symlinks=True):
+            raise FileNotFoundError(2, "No such file or directory", self.path)
+
+    walk = media_triage.walk_evidence
+    monkeypatch.setattr(media_triage, "walk_evidence", lambda root, exclude: [Vanished(), *walk(root, exclude)])
+    manifest = tmp_path / "manifest.jsonl"
+    summary = triage_directory(str(evidence), str(manifest), workers=1)
+    assert (summary["processed"], summary["errors"]) == (4, 1)
+    records = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert [record["path"] for record in records if "error" in record] == ["gone.bin"]
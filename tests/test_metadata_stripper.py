@@ -0,0 +1,58 @@
+"""Streaming strip-and-hash custody records."""
+
+import hashlib
+import io
+
+import pytest
+
+from forensics.metadata_stripper import strip_and_hash, strip_metadata
+
+
+def _segment(marker, body):
+    return bytes([0xFF, marker]) + (len(body) + 2).to_bytes(2, "big") + body
+
+
+SCAN = _segment(0xDA, b"\x01\x01\x00\x00\x3f\x00") + bytes(range(0xFE)) * 40 + b"\xff\xd9"
+JPEG = b"".join([
+    b"\xff\xd8",
+    _segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"),
+    _segment(0xE1, b"Exif\x00\x00" + bytes(5000)),
+    _segment(0xDB, bytes(65)),
+    _segment(0xED, b"Photoshop 3.0\x00" + bytes(300)),
+]) + SCAN
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+def test_stream_matches_strip_metadata(chunk_size):
+    output = io.BytesIO()
+    record = strip_and_hash(io.BytesIO(JPEG), output, chunk_size=chunk_size)
+    stripped = strip_metadata(JPEG)
+    assert output.getvalue() == stripped
+    assert record["format"] == "jpeg"
+    assert record["original_sha256"] == hashlib.sha256(JPEG).hexdigest()
+    assert record["stripped_sha256"] == hashlib.sha256(stripped).hexdigest()
+    assert record["payload_sha256"] == hashlib.sha256(SCAN).hexdigest()
+    assert (record["original_bytes"], record["stripped_bytes"], record["payload_bytes"]) == (
+        len(JPEG), len(stripped), len(SCAN))
+    app1 = JPEG.index(b"\xff\xe1")
+    assert record["removed_segments"][0] == {"marker": "APP1", "offset": app1, "length": 5010}
+    assert [segment["marker"] for segment in record["removed_segments"]] == ["APP1", "APP13"]
+
+
+def test_payload_digest_survives_restripping(tmp_path):
+    source, target = tmp_path / "in.jpg", tmp_path / "out.jpg"
+    source.write_bytes(JPEG)
+    first = strip_and_hash(str(source), str(target))
+    second = strip_and_hash(str(target))
+    assert second["payload_sha256"] == first["payload_sha256"]
+    assert second["original_sha256"] == first["stripped_sha256"]
+    assert second["removed_segments"] == []
+
+
+@pytest.mark.parametrize("blob", [b"", b"\xff\xd8", b"GIF89a not a jpeg", JPEG[:300]])
+def test_passthrough_and_truncated_inputs(blob):
+    output = io.BytesIO()
+    record = strip_and_hash(io.BytesIO(blob), output)
+    assert output.getvalue() == strip_metadata(blob)
+    assert record["original_sha256"] == hashlib.sha256(blob).hexdigest()
+    assert record["original_bytes"] == len(blob)
@@ -0,0 +1,79 @@
+"""Per-thread detector counters and their Prometheus rendering."""
+
+import threading
+
+import pytest
+
+from forensics import metrics
+from forensics.metrics import MetricsRegistry, instrument, track, verdict_label
+
+
+def _value(text, series):
+    line = next(line for line in text.splitlines() if line.startswith(series + " "))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_threads_are_aggregated_and_retired():
+    registry = MetricsRegistry()
+
+    def work():
+        for _ in range(100):
+            registry.observe("psyop", 0.002, size=300, verdict="review")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.observe("psyop", 3.0, error=True)
+    registry.record_cache("psyop", True)
+    registry.record_cache("psyop", False)
+
+    totals = registry.collect()["psyop"]
+    assert (totals.calls, totals.errors) == (401, 1)
+    assert registry.collect()["psyop"].calls == 401  # retired shards are folded in once
+    text = registry.render()
+    assert _value(text, 'harbinger_detector_latency_seconds_bucket{detector="psyop",le="0.0025"}') == 400
+    assert _value(text, 'harbinger_detector_latency_seconds_bucket{detector="psyop",le="+Inf"}') == 401
+    assert _value(text, 'harbinger_detector_input_size_sum{detector="psyop"}') == 120000
+    assert _value(text, 'harbinger_detector_cache_hit_ratio{detector="psyop"}') == 0.5
+    assert _value(text, 'harbinger_detector_verdicts_total{detector="psyop",verdict="review"}') == 400
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.observe('a"b\\c', 0.1, verdict="x\ny")
+    assert 'detector="a\\"b\\\\c",verdict="x\\ny"' in registry.render()
+
+
+@pytest.mark.skipif(not metrics.ENABLED, reason="metrics disabled by HARBINGER_METRICS")
+def test_instrument_and_track_record_into_the_process_registry():
+    @instrument("test_metrics_detector", verdict_key="flagged")
+    def detector(text):
+        if text == "boom":
+            raise RuntimeError(text)
+        return {"flagged": "bad" in text}
+
+    detector("bad input")
+    detector("fine")
+    with pytest.raises(RuntimeError):
+        detector("boom")
+    with track("test_metrics_detector", size=10) as call:
+        call.verdict = "true"
+        call.cache(hit=True)
+
+    series = metrics.get_registry().collect()["test_metrics_detector"]
+    assert (series.calls, series.errors, series.cache_hits) == (4, 1, 1)
+    assert series.verdicts == {"true": 2, "false": 1}
+    assert series.size_sum == len("bad input") + len("fine") + len("boom") + 10
+
+
+@pytest.mark.parametrize("result, key, expected", [
+    ({"verdict": "aligned"}, "verdict", "aligned"),
+    ({"detected": True}, "detected", "true"),
+    ({"other": 1}, "verdict", None),
+    ([1, 2], "verdict", None),
+    ({"verdict": "x"}, None, None),
+])
+def test_verdict_label(result, key, expected):
+    assert verdict_label(result, key) == expected
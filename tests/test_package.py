@@ -0,0 +1,65 @@
+"""Lazy package attributes and the detector registry."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import forensics
+from forensics import registry
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def _fresh_import(code):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def test_import_loads_no_submodules():
+    loaded = _fresh_import(
+        "import json, sys, forensics\n"
+        "print(json.dumps(sorted(name for name in sys.modules if name.startswith('forensics.'))))"
+    )
+    assert loaded == []
+
+
+def test_one_detector_does_not_load_the_others():
+    loaded = _fresh_import(
+        "import json, sys, forensics\n"
+        "forensics.get_detector('psyop_scorer')\n"
+        "print(json.dumps(sorted(name for name in sys.modules if name.startswith('forensics.'))))"
+    )
+    assert "forensics.psyop_scorer" in loaded
+    assert "forensics.injection_detector" not in loaded and "forensics.media_triage" not in loaded
+
+
+def test_lazy_attributes_resolve_and_are_cached():
+    from forensics import psyop_scorer
+
+    assert forensics.score_influence is psyop_scorer.score_influence
+    assert forensics.__dict__["score_influence"] is psyop_scorer.score_influence
+    assert "compare_traces" in dir(forensics) and "registry" in forensics.__all__
+    with pytest.raises(AttributeError):
+        forensics.not_a_detector
+
+
+def test_registry_targets_all_resolve():
+    for spec in registry.DETECTORS.values():
+        if all(_importable(requirement) for requirement in spec.requires):
+            assert callable(registry.get_detector(spec.name))
+    assert registry.get_detector("cascade") is registry.get_detector("cascade")
+    assert [entry["name"] for entry in registry.list_detectors()] == list(registry.DETECTORS)
+    with pytest.raises(KeyError, match="Unknown detector"):
+        registry.get_detector("nope")
+
+
+def _importable(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
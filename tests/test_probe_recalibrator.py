@@ -0,0 +1,72 @@
+"""Streaming and batched drift recalibration."""
+
+import numpy as np
+import pytest
+
+from forensics.probe_recalibrator import BatchRecalibrator, StreamingRecalibrator, recalibrate_batch, update_probe
+
+
+def _series(rng, levels, length=200, noise=0.05):
+    return np.concatenate([level + rng.normal(0, noise, length) for level in levels])
+
+
+@pytest.mark.parametrize("method", ["cusum", "page_hinkley"])
+def test_shift_moves_the_baseline_and_rewarms(method):
+    values = _series(np.random.default_rng(0), [0.1, 0.6])
+    recalibrator = StreamingRecalibrator(method=method, warmup=16)
+    fired = [index for index, value in enumerate(values) if recalibrator.update(value)]
+    assert fired[0] == 15  # end of the initial warm-up
+    shift = next(index for index in fired if index >= 200)
+    assert shift < 230
+    assert recalibrator.baseline == pytest.approx(0.6, abs=0.05)
+    # The re-warm after the shift refines the baseline once more, then detection is quiet.
+    assert [index for index in fired if index > shift] == [fired[fired.index(shift) + 1]]
+    assert fired[fired.index(shift) + 1] > shift
+
+
+def test_long_run_before_detection_still_pauses():
+    recalibrator = StreamingRecalibrator(warmup=4, h=200.0)
+    for value in _series(np.random.default_rng(1), [0.0], length=40):
+        recalibrator.update(value)
+    for _ in range(200):
+        if recalibrator.update(1.0):
+            break
+    assert recalibrator.fresh == recalibrator.warmup - 1
+    assert recalibrator.update(1.0)  # the re-warm completes on the next observation
+
+
+def test_state_round_trip_matches_uninterrupted_stream():
+    values = _series(np.random.default_rng(2), [0.2, 0.5, 0.1], length=80)
+    probe = {}
+    for value in values[:120]:
+        update_probe(probe, value, warmup=8)
+    for value in values[120:]:
+        update_probe(probe, value)
+    direct = StreamingRecalibrator(warmup=8)
+    for value in values:
+        direct.update(value)
+    assert probe["stream"]["recalibrations"] == direct.recalibrations
+    assert probe["drift_baseline"] == round(direct.baseline, 3)
+
+
+@pytest.mark.parametrize("method", ["cusum", "page_hinkley"])
+def test_batch_matches_per_probe_streams(method):
+    rng = np.random.default_rng(3)
+    series = np.stack([_series(rng, levels, length=120) for levels in ([0.1, 0.5], [0.3, 0.3], [0.6, 0.2])])
+    series[1, ::7] = np.nan
+    batch = BatchRecalibrator(3, method=method, warmup=12)
+    streams = [StreamingRecalibrator(method=method, warmup=12) for _ in range(3)]
+    for column in series.T:
+        fired = batch.update(column)
+        for probe, value in enumerate(column):
+            if not np.isnan(value):
+                assert streams[probe].update(value) == fired[probe]
+    for probe, stream in enumerate(streams):
+        assert batch.baseline[probe] == pytest.approx(stream.baseline)
+        assert batch.fresh[probe] == stream.fresh
+
+
+def test_recalibrate_batch_ignores_padding():
+    result = recalibrate_batch([[1.0, 2.0, np.nan], [np.nan] * 3, [4.0, 5.0, 6.0]], window=2)
+    assert result["drift_window"].tolist() == [1, 0, 2]
+    assert result["drift_baseline"][0] == 2.0 and np.isnan(result["drift_baseline"][1])
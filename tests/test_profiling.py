@@ -0,0 +1,78 @@
+"""Slow-call capture, sampled profiling and signal-triggered dumps."""
+
+import json
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from forensics.profiling import Profiler
+
+
+def _busy(text, seconds=0.0):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while True:
+        total += sum(ord(char) for char in text)
+        if time.perf_counter() >= deadline:
+            return total
+
+
+def test_slow_calls_keep_fingerprints_not_inputs():
+    profiler = Profiler(active=True, slow_ms=1, ring_size=2)
+    for index in range(3):
+        profiler.record_slow("psyop", 0.002 * (index + 1), (f"secret input {index}", b"\x00" * 10, [1, 2]), {})
+    calls = profiler.slow_calls()
+    assert [call["elapsed_ms"] for call in calls] == [4.0, 6.0]
+    first = calls[0]["args"]
+    assert first[0]["size"] == len("secret input 1") and len(first[0]["sha256"]) == 16
+    assert first[2] == {"type": "list", "size": 2}
+    assert "secret" not in json.dumps(calls)
+
+
+def test_cprofile_sampling_aggregates_per_detector(tmp_path):
+    profiler = Profiler(active=True, sample_rate=1.0, mode="cprofile", dump_dir=str(tmp_path))
+    for _ in range(3):
+        assert profiler.call("detector", _busy, ("abc",), {}) == 294
+    rows = profiler.snapshot()["profiles"]["detector"]
+    assert any("_busy" in row["function"] and row["calls"] == 3 for row in rows)
+    written = profiler.dump()
+    assert any(path.endswith("-detector.pstats") for path in written)
+    assert all(os.path.exists(path) for path in written)
+
+
+def test_stack_sampling_writes_folded_stacks(tmp_path):
+    profiler = Profiler(active=True, sample_rate=1.0, mode="stack", sample_interval=0.001)
+    profiler.call("slow_detector", _busy, ("abc", 0.05), {})
+    profiler.configure(active=False)
+    stacks = profiler.snapshot()["stacks"]
+    assert stacks and all(key.startswith("slow_detector;") for key in stacks)
+    assert any(key.endswith("_busy") for key in stacks)
+    folded = [path for path in profiler.dump(str(tmp_path)) if path.endswith(".folded")]
+    assert folded and open(folded[0]).read().startswith("slow_detector;")
+
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Profiler(mode="perf")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 is not available")
+def test_signal_dump_does_not_deadlock_while_the_lock_is_held(tmp_path):
+    profiler = Profiler(active=True, dump_dir=str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert profiler.install_signal_handler()
+        with profiler._lock:  # e.g. the signal lands while a sampled call merges its stats
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.05)
+        for thread in threading.enumerate():
+            if thread.name == "harbinger-profile-dump":
+                thread.join(5)
+        (name,) = [name for name in os.listdir(tmp_path) if name.endswith(".json")]
+        with open(tmp_path / name, encoding="utf-8") as handle:
+            assert json.load(handle)["mode"] == "cprofile"
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
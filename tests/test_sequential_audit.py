@@ -0,0 +1,66 @@
+"""Early-stopping sandbagging audits."""
+
+import numpy as np
+import pytest
+
+from forensics.audit_tools import (
+    CONSISTENT,
+    INCONCLUSIVE,
+    SANDBAGGING,
+    SequentialSandbaggingTest,
+    run_sequential_audit,
+    wilson_bounds,
+    wilson_score_interval,
+)
+
+
+def test_wilson_bounds_match_the_scalar_interval():
+    low, high = wilson_bounds([0, 7, 50], [0, 20, 50])
+    assert (low[0], high[0]) == (0.0, 1.0)
+    assert low[1] == pytest.approx(wilson_score_interval(7, 20))
+    assert low[1] < 7 / 20 < high[1] and high[2] == pytest.approx(1.0)
+
+
+def test_sprt_separates_sandbagging_pairs_early():
+    rng = np.random.default_rng(0)
+    latent = np.full(400, 0.8)
+    sandbagging = np.arange(400) < 200
+    expressed_rate = np.where(sandbagging, 0.5, 0.8)
+
+    test = run_sequential_audit(
+        lambda indices: (rng.random(indices.size) < expressed_rate[indices]).astype(float),
+        400, latent_capability=latent, margin=0.2,
+    )
+    assert np.mean(test.decisions[sandbagging] == SANDBAGGING) > 0.95
+    assert np.mean(test.decisions[~sandbagging] == CONSISTENT) > 0.9
+    assert test.queries.mean() < 60
+    assert test.summary()[0]['divergence'] == pytest.approx(abs(test.summary()[0]['expressed_rate'] - 0.8))
+
+
+def test_decided_pairs_are_not_queried_again():
+    asked = []
+
+    def query(indices):
+        asked.append(indices.copy())
+        return np.zeros(indices.size)
+
+    test = run_sequential_audit(query, 3, latent_capability=[0.9, 0.9, 0.0001], margin=0.3, max_queries=40)
+    assert test.decisions[:2].tolist() == [SANDBAGGING, SANDBAGGING]
+    assert test.decisions[2] == INCONCLUSIVE
+    assert test.queries.tolist() == [10, 10, 40]
+    assert [indices.tolist() for indices in asked[10:]] == [[2]] * 30
+
+
+def test_observed_latent_mode_uses_wilson_intervals():
+    rng = np.random.default_rng(1)
+    expressed_rate = np.array([0.2, 0.7])
+
+    def query(indices):
+        expressed = rng.random(indices.size) < expressed_rate[indices]
+        latent = rng.random(indices.size) < 0.7
+        return expressed.astype(float), latent.astype(float)
+
+    test = run_sequential_audit(query, 2, margin=0.3, max_queries=2000)
+    assert test.decisions.tolist() == [SANDBAGGING, CONSISTENT]
+    with pytest.raises(ValueError):
+        SequentialSandbaggingTest(2).update([1.0, 0.0])
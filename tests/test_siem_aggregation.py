@@ -0,0 +1,149 @@
+"""One-pass alert aggregation: query terms, line prefilter and operators."""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from forensics.siem_aggregation import (
+    OTHER, HyperLogLog, aggregate_alert_files, aggregate_alerts, compile_query, parse_duration,
+)
+
+
+def _alert(index, level, srcip, groups, hour):
+    return {
+        "timestamp": f"2026-10-01T{hour:02d}:{index % 60:02d}:00.000+0000",
+        "rule": {"id": str(5700 + level), "level": level, "groups": groups},
+        "agent": {"name": f"host-{index % 3}"},
+        "data": {"srcip": srcip},
+    }
+
+
+def _alerts(count, seed=0):
+    rng = random.Random(seed)
+    addresses = [f"10.0.{rank % 4}.{rank}" for rank in range(200)]
+    weights = [1 / (rank + 1) for rank in range(200)]  # a few sources dominate
+    return [
+        _alert(index, rng.choice([3, 5, 10, 12]), rng.choices(addresses, weights)[0],
+               rng.choice([["sshd", "authentication_failed"], ["web"], ["sshd"]]), index % 24)
+        for index in range(count)
+    ]
+
+
+def test_parse_duration():
+    assert parse_duration("15m") == 900 and parse_duration("1.5h") == 5400 and parse_duration(30) == 30.0
+    for bad in ("", "5y", "0s", -1):
+        with pytest.raises(ValueError):
+            parse_duration(bad)
+
+
+def test_query_terms_and_literals():
+    matches, required = compile_query("rule.groups=sshd;rule.level>=10,agent.name~HOST-1;data.srcip!=10.0.0.1")
+    assert required == ["sshd"]
+    assert matches(_alert(0, 12, "10.0.0.2", ["sshd"], 0))
+    assert matches(_alert(1, 3, "10.0.0.2", ["sshd"], 0))  # agent.name~host-1 (case-insensitive)
+    assert not matches(_alert(0, 3, "10.0.0.2", ["sshd"], 0))
+    assert not matches(_alert(0, 12, "10.0.0.1", ["sshd"], 0))
+    assert not matches(_alert(0, 12, "10.0.0.2", ["web"], 0))
+    assert compile_query("rule.level=10")[1] == []  # numbers can be written as 10.0 or 1e1
+    with pytest.raises(ValueError):
+        compile_query("no operator here")
+
+
+def test_operators_match_exact_counts():
+    alerts = _alerts(2000)
+    query = "rule.level>=10"
+    result = aggregate_alerts(
+        [json.dumps(alert) for alert in alerts],
+        [
+            {"op": "count", "by": ["rule.groups"]},
+            {"op": "histogram", "interval": "6h", "by": "agent.name"},
+            {"op": "distinct", "field": "data.srcip"},
+            {"op": "top", "field": "data.srcip", "k": 3},
+        ],
+        query,
+    )
+    kept = [alert for alert in alerts if alert["rule"]["level"] >= 10]
+    assert result["scan"]["alerts_matched"] == len(kept)
+
+    groups = Counter(group for alert in kept for group in alert["rule"]["groups"])
+    counted = result["aggregations"]["count:rule.groups"]
+    assert {entry["key"]["rule.groups"]: entry["count"] for entry in counted["groups"]} == groups
+
+    histogram = result["aggregations"]["histogram:agent.name"]
+    assert histogram["interval_seconds"] == 6 * 3600 and histogram["total_series"] == 3
+    assert sum(bucket["count"] for series in histogram["series"] for bucket in series["buckets"]) == len(kept)
+    assert all(len(series["buckets"]) == 4 for series in histogram["series"])
+
+    distinct = result["aggregations"]["distinct:data.srcip"]
+    truth = len({alert["data"]["srcip"] for alert in kept})
+    assert abs(distinct["estimate"] - truth) <= 3 * distinct["relative_error"] * truth
+
+    top = result["aggregations"]["top:data.srcip"]["items"]
+    exact = Counter(alert["data"]["srcip"] for alert in kept)
+    assert [item["value"] for item in top] == [value for value, _ in exact.most_common(3)]
+    assert all(item["count"] - item["error"] <= exact[item["value"]] <= item["count"] for item in top)
+
+
+def test_prefilter_skips_lines_without_the_literal():
+    lines = [json.dumps(_alert(index, 5, "10.0.0.1", ["web"] if index % 2 else ["sshd"], 0)) for index in range(10)]
+    result = aggregate_alerts(lines + ["not json", "[1, 2]", ""], [{"op": "count"}], "rule.groups=sshd")
+    assert result["scan"]["alerts_matched"] == 5
+    assert result["scan"]["skipped_unparsed"] == 5 + 3  # web alerts and the three lines without "sshd"
+
+    everything = aggregate_alerts(lines + ["not json", "[1, 2]", ""], [{"op": "count"}])
+    assert everything["scan"]["malformed"] == 2 and everything["scan"]["alerts_matched"] == 10
+
+
+@pytest.mark.parametrize("value", ["sérvidor", "path/to/file"])
+def test_escaped_values_are_not_prefiltered_away(value):
+    alert = _alert(0, 5, "10.0.0.1", ["web"], 0)
+    alert["agent"]["name"] = value
+    escaped = json.dumps(alert, ensure_ascii=True).replace("/", "\\/")
+    assert value not in escaped
+    result = aggregate_alerts([escaped], [{"op": "count", "by": "agent.name"}], f"agent.name={value}")
+    assert result["scan"]["skipped_unparsed"] == 0
+    assert result["scan"]["alerts_matched"] == 1
+    assert result["aggregations"]["count:agent.name"]["groups"] == [{"key": {"agent.name": value}, "count": 1}]
+
+
+def test_time_range_and_files(tmp_path):
+    alerts = _alerts(240)
+    path = tmp_path / "alerts.json"
+    path.write_text("\n".join(json.dumps(alert) for alert in alerts) + "\n")
+    result = aggregate_alert_files(
+        str(path), [{"op": "count", "name": "total"}],
+        time_range={"from": "2026-10-01T06:00:00+00:00", "to": "2026-10-01T11:59:59+00:00"},
+    )
+    assert result["aggregations"]["total"]["groups"] == [{"key": {}, "count": 60}]
+    assert result["scan"]["files"] == [str(path)]
+
+
+def test_group_caps_pool_into_other(monkeypatch):
+    from forensics import siem_aggregation
+
+    monkeypatch.setattr(siem_aggregation, "MAX_GROUPS", 4)
+    alerts = [{"data": {"srcip": f"10.0.0.{index}"}} for index in range(10)]
+    result = aggregate_alerts(alerts, [{"op": "count", "by": "data.srcip"}])["aggregations"]["count:data.srcip"]
+    assert result["truncated"] and result["total_groups"] == 5
+    assert {"key": {"data.srcip": OTHER}, "count": 6} in result["groups"]
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError):
+        aggregate_alerts([], [{"op": "median"}])
+    with pytest.raises(ValueError):
+        aggregate_alerts([], [{"op": "top"}])
+    with pytest.raises(ValueError):
+        aggregate_alerts([], [{"op": "count"}, {"op": "count"}])
+
+
+def test_hyperloglog_merge_is_lossless():
+    left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for value in range(5000):
+        (left if value % 2 else right).add(value)
+        union.add(value)
+    left.merge(HyperLogLog.from_state(right.to_state()))
+    assert left.registers == union.registers
+    assert abs(left.count() - 5000) <= 3 * left.relative_error() * 5000
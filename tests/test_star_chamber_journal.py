@@ -0,0 +1,148 @@
+"""Write-ahead log recovery, torn tails, snapshots and failure handling of ChamberJournal."""
+
+import errno
+import os
+import threading
+
+import pytest
+
+from forensics import star_chamber_journal
+from forensics.star_chamber_consensus import StarChamber
+from forensics.star_chamber_journal import ChamberJournal, iter_logged_votes
+from forensics.star_chamber_signing import KeyRing
+
+AGENTS = ["ciso", "legal", "ethics"]
+
+
+@pytest.fixture
+def keyring():
+    return KeyRing(b"journal-test-secret-0123456789")
+
+
+def _chamber(action_id, keyring):
+    return StarChamber(action_id, "Test action", AGENTS, keyring=keyring)
+
+
+def _segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("wal-"))
+
+
+def test_recovers_open_chambers_and_votes(tmp_path, keyring):
+    with ChamberJournal(str(tmp_path)) as journal:
+        journal.open_chamber(_chamber("a", keyring))
+        journal.open_chamber(_chamber("b", keyring))
+        assert journal.vote("a", "ciso", "approve", "ok", 0.9)["success"]
+        assert journal.vote("a", "legal", "approve", "ok", 0.8, durable=True)["success"]
+        journal.close_chamber("b")
+
+    with ChamberJournal(str(tmp_path), keyring=keyring) as journal:
+        assert journal.recovery["replayed"] == 5
+        assert journal.recovery["truncated_bytes"] == 0
+        assert set(journal.chambers) == {"a"}
+        assert [vote.agent_role for vote in journal.get("a").votes] == ["ciso", "legal"]
+        assert journal.get("a").keyring is keyring
+        assert journal.vote("a", "ethics", "approve", "ok", 0.7)["success"]
+        assert journal.get("a").final_decision == "APPROVED"
+        assert journal.get("a").verify_votes()["all_valid"]
+
+    assert [action_id for action_id, _ in iter_logged_votes(str(tmp_path))] == ["a", "a", "a"]
+
+
+def test_torn_final_record_is_truncated(tmp_path, keyring):
+    with ChamberJournal(str(tmp_path)) as journal:
+        journal.open_chamber(_chamber("a", keyring))
+        journal.vote("a", "ciso", "approve", "ok", 0.9)
+    segment = os.path.join(str(tmp_path), _segments(str(tmp_path))[-1])
+    intact = os.path.getsize(segment)
+    with open(segment, "ab") as handle:
+        handle.write(b'0badc0de {"op":"vote","act')  # a crash mid-append
+
+    with ChamberJournal(str(tmp_path), keyring=keyring) as journal:
+        assert journal.recovery["truncated_bytes"] > 0
+        assert len(journal.get("a").votes) == 1
+        journal.vote("a", "legal", "approve", "ok", 0.9)
+    assert os.path.getsize(segment) > intact
+
+    with ChamberJournal(str(tmp_path), keyring=keyring) as journal:
+        assert journal.recovery["truncated_bytes"] == 0
+        assert len(journal.get("a").votes) == 2
+
+
+def test_corruption_before_the_tail_is_an_error(tmp_path, keyring):
+    with ChamberJournal(str(tmp_path)) as journal:
+        journal.open_chamber(_chamber("a", keyring))
+        journal.vote("a", "ciso", "approve", "ok", 0.9)
+    segment = os.path.join(str(tmp_path), _segments(str(tmp_path))[-1])
+    with open(segment, "r+b") as handle:
+        handle.write(b"ffffffff")
+
+    with pytest.raises(ValueError, match="Corrupt"):
+        ChamberJournal(str(tmp_path))
+
+
+def test_snapshot_rotates_segments_and_replays_only_the_tail(tmp_path, keyring):
+    with ChamberJournal(str(tmp_path)) as journal:
+        for index in range(10):
+            journal.open_chamber(_chamber(f"c{index}", keyring))
+        journal.snapshot()
+        journal.vote("c3", "ciso", "reject", "no", 0.6)
+        journal.close_chamber("c9")
+
+    assert len(_segments(str(tmp_path))) == 1
+    with ChamberJournal(str(tmp_path), keyring=keyring) as journal:
+        assert journal.recovery["snapshot_seq"] == 10
+        assert journal.recovery["replayed"] == 2
+        assert len(journal) == 9
+        assert journal.get("c3").votes[0].decision == "reject"
+
+
+def test_failed_write_is_rolled_back(tmp_path, keyring, monkeypatch):
+    journal = ChamberJournal(str(tmp_path))
+    journal.open_chamber(_chamber("a", keyring))
+    real_write = os.write
+    calls = []
+
+    def short_then_full(fd, data):
+        calls.append(fd)
+        if len(calls) == 1:
+            return real_write(fd, bytes(data[:7]))
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(star_chamber_journal.os, "write", short_then_full)
+    with pytest.raises(OSError):
+        journal.vote("a", "ciso", "approve", "ok", 0.9)
+    monkeypatch.setattr(star_chamber_journal.os, "write", real_write)
+
+    assert journal.get("a").votes == []
+    assert journal.vote("a", "ciso", "approve", "ok", 0.9)["success"]
+    journal.close()
+
+    with ChamberJournal(str(tmp_path), keyring=keyring) as journal:
+        assert journal.recovery["truncated_bytes"] == 0
+        assert [vote.agent_role for vote in journal.get("a").votes] == ["ciso"]
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_syncer_failure_wakes_durable_callers(tmp_path, keyring, monkeypatch):
+    journal = ChamberJournal(str(tmp_path), sync_interval=0.001)
+
+    def failing_fsync(fd):
+        raise OSError(errno.EIO, "Input/output error")
+
+    monkeypatch.setattr(star_chamber_journal.os, "fsync", failing_fsync)
+    outcome = []
+
+    def durable_open():
+        try:
+            journal.open_chamber(_chamber("a", keyring), durable=True)
+        except RuntimeError as exc:
+            outcome.append(exc)
+
+    worker = threading.Thread(target=durable_open)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert outcome and isinstance(outcome[0].__cause__, OSError)
+    with pytest.raises(RuntimeError):
+        journal.vote("a", "ciso", "approve", "ok", 0.9)
+    journal.close()
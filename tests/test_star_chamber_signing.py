@@ -0,0 +1,117 @@
+"""Keyed vote signatures, batch verification and key configuration."""
+
+import os
+import stat
+
+import pytest
+
+from forensics import star_chamber_signing
+from forensics.star_chamber_signing import (
+    GENERATED_SECRET_NAME,
+    SIGNING_KEYS_ENV,
+    SIGNING_SECRET_ENV,
+    STATE_DIR_ENV,
+    KeyRing,
+    canonical_vote,
+    legacy_signature,
+    verify_votes,
+)
+
+TIMESTAMP = "2026-01-01T00:00:00"
+
+
+def _vote(keyring, agent_role="ciso", decision="approve", rationale="ok", confidence=0.9, action_id="act"):
+    return action_id, {
+        "agent_role": agent_role,
+        "decision": decision,
+        "rationale": rationale,
+        "confidence": confidence,
+        "timestamp": TIMESTAMP,
+        "signature": keyring.sign(action_id, agent_role, decision, rationale, confidence, TIMESTAMP),
+    }
+
+
+@pytest.fixture
+def keyring():
+    return KeyRing(b"signing-test-secret-0123456789")
+
+
+def test_canonical_encoding_is_unambiguous():
+    assert canonical_vote("a", "bc", "d", "", 0.5, TIMESTAMP) != canonical_vote("ab", "c", "d", "", 0.5, TIMESTAMP)
+
+
+def test_valid_tampered_and_unknown_votes(keyring):
+    valid = _vote(keyring)
+    tampered_id, tampered = _vote(keyring, agent_role="legal")
+    tampered = {**tampered, "decision": "reject"}
+    foreign = _vote(KeyRing(b"another-secret-entirely-0000000"), agent_role="ethics")
+
+    report = verify_votes([valid, (tampered_id, tampered), foreign], keyring)
+
+    assert report["checked"] == 3
+    assert report["valid"] == 1
+    assert report["unknown_key"] == 1
+    assert [failure["reason"] for failure in report["failures"]] == ["bad_signature", "unknown_key"]
+    assert not report["all_valid"]
+
+
+def test_rotated_keys_keep_verifying(keyring):
+    old = KeyRing()
+    old.add_hmac_key("ciso", b"old-ciso-key-0123456789")
+    action_id, vote = _vote(old)
+    keyring.add_hmac_key("ciso", b"old-ciso-key-0123456789")
+    assert verify_votes([(action_id, vote)], keyring)["valid"] == 1
+
+
+def test_legacy_digests_are_reported(keyring):
+    digest = legacy_signature("act", "ciso", "approve", "ok", 0.9)
+    vote = {"agent_role": "ciso", "decision": "approve", "rationale": "ok", "confidence": 0.9,
+            "timestamp": TIMESTAMP, "signature": digest}
+    report = verify_votes([("act", vote), ("act", {**vote, "decision": "reject"})], keyring)
+    assert report["legacy"] == 1
+    assert report["failures"] == [{"action_id": "act", "agent_role": "ciso", "reason": "legacy_mismatch"}]
+
+
+@pytest.mark.parametrize("signature", ["ü", "hmac-sha256:{key_id}:ü", "hmac-sha256:{key_id}:\udcff", 5, None])
+def test_corrupt_signatures_fail_without_raising(keyring, signature):
+    action_id, vote = _vote(keyring)
+    if isinstance(signature, str):
+        signature = signature.format(key_id=keyring.signing_key("ciso").key_id)
+    report = verify_votes([(action_id, {**vote, "signature": signature}), (action_id, vote)], keyring)
+    assert report["checked"] == 2
+    assert report["valid"] == 1
+    assert report["invalid"] == 1
+
+
+def test_unconfigured_keys_persist_in_the_state_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv(SIGNING_KEYS_ENV, raising=False)
+    monkeypatch.delenv(SIGNING_SECRET_ENV, raising=False)
+    monkeypatch.setenv(STATE_DIR_ENV, str(tmp_path))
+
+    with pytest.warns(RuntimeWarning, match=GENERATED_SECRET_NAME):
+        first = KeyRing.from_env()
+    with pytest.warns(RuntimeWarning):
+        second = KeyRing.from_env()
+
+    assert verify_votes([_vote(first)], second)["valid"] == 1
+    mode = stat.S_IMODE(os.stat(tmp_path / GENERATED_SECRET_NAME).st_mode)
+    assert mode == 0o600
+
+
+def test_unconfigured_keys_without_state_directory_warn(monkeypatch):
+    for name in (SIGNING_KEYS_ENV, SIGNING_SECRET_ENV, STATE_DIR_ENV):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.warns(RuntimeWarning, match="per-process"):
+        KeyRing.from_env()
+
+
+def test_ed25519_keys(keyring):
+    if star_chamber_signing.Ed25519PrivateKey is None:
+        pytest.skip("cryptography is not installed")
+    signer = KeyRing()
+    signer.add_ed25519_key("ciso", private_key=bytes(range(32)))
+    public = signer.signing_key("ciso")._public.public_bytes(
+        star_chamber_signing.Encoding.Raw, star_chamber_signing.PublicFormat.Raw)
+    verifier = KeyRing()
+    verifier.add_ed25519_key("ciso", public_key=public)
+    assert verify_votes([_vote(signer)], verifier)["valid"] == 1
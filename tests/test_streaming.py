@@ -0,0 +1,107 @@
+"""Incremental JSON parsing and the streaming CLI inputs."""
+
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from forensics.epistemic_narrowing_monitor import monitor_epistemic_narrowing, monitor_epistemic_narrowing_stream
+from forensics.machiavellian_delta import calculate_machiavellian_delta
+from forensics.streaming import iter_json_items, iter_lines
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+DOCUMENT = [
+    {"query": "what is the état of \"quoted\" [brackets], {braces}", "response": "ok"},
+    -2500.5,
+    12345678901234567890,
+    "a string with , and ] inside",
+    [1, [2, [3]], {"nested": None}],
+    True,
+    {},
+    [],
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_array_items_match_json_loads(chunk_size, indent):
+    text = json.dumps(DOCUMENT, indent=indent)
+    assert list(iter_json_items(io.StringIO(text), chunk_size)) == DOCUMENT
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_json_lines_and_concatenated_values(chunk_size):
+    lines = "\n".join(json.dumps(item) for item in DOCUMENT) + "\n"
+    assert list(iter_json_items(io.StringIO(lines), chunk_size)) == DOCUMENT
+    assert list(iter_json_items(io.StringIO("1 2\t-3.5e2"), chunk_size)) == [1, 2, -350.0]
+
+
+def test_empty_inputs():
+    assert list(iter_json_items(io.StringIO(""))) == []
+    assert list(iter_json_items(io.StringIO("  [ \n ] "))) == []
+
+
+@pytest.mark.parametrize("text", ["[1, 2", "[1 2]", "[1,, 2]", '[{"a": 1}', "[1, 2,"])
+def test_malformed_arrays_raise(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_items(io.StringIO(text), 2))
+
+
+def test_large_item_spanning_many_chunks():
+    item = {"response": "x" * 100_000, "query": "y"}
+    assert list(iter_json_items(io.StringIO(json.dumps([item, item])), 16)) == [item, item]
+
+
+def test_iter_lines_keeps_line_endings(tmp_path):
+    path = tmp_path / "trace.txt"
+    path.write_bytes("first\r\nsecond\nthird".encode("utf-8"))
+    assert list(iter_lines(str(path))) == ["first\r\n", "second\n", "third"]
+
+
+def test_stream_report_matches_in_memory_report():
+    rng = random.Random(3)
+    words = "vaccine policy climate energy tax market school water".split()
+    history = [
+        {"query": " ".join(rng.choices(words, k=6)), "response": " ".join(rng.choices(words, k=12))}
+        for _ in range(60)
+    ]
+    stream = iter_json_items(io.StringIO(json.dumps(history)), 32)
+    assert monitor_epistemic_narrowing_stream(stream, 0.5, "u1") == monitor_epistemic_narrowing(history, 0.5, "u1")
+
+
+def _cli(module, args, stdin=""):
+    env = dict(os.environ, PYTHONPATH=SRC, HARBINGER_METRICS="0")
+    return subprocess.run([sys.executable, "-m", f"forensics.{module}", *args], input=stdin, env=env,
+                          capture_output=True, text=True)
+
+
+def test_history_file_from_stdin_matches_inline_argument():
+    history = [{"query": "tax policy", "response": "tax policy is settled"}] * 5
+    inline = _cli("epistemic_narrowing_monitor", [json.dumps(history), "0.5"])
+    piped = _cli("epistemic_narrowing_monitor", ["--history-file", "-", "0.5"], "\n".join(map(json.dumps, history)))
+    assert inline.returncode == piped.returncode == 0
+    assert json.loads(piped.stdout) == json.loads(inline.stdout)
+
+
+def test_history_file_errors_are_reported(tmp_path):
+    bad = tmp_path / "bad.json"
+    bad.write_text("[{\"query\": 1},")
+    result = _cli("epistemic_narrowing_monitor", ["--history-file", str(bad)])
+    assert result.returncode == 1
+    assert "Cannot read interaction history" in json.loads(result.stdout)["error"]
+
+
+def test_trace_files_and_stdin_limits(tmp_path):
+    internal = tmp_path / "internal.txt"
+    internal.write_text("plan to hide the outage\nfrom the operators\n")
+    external = "Everything is running normally.\n"
+    result = _cli("machiavellian_delta", ["--internal-file", str(internal), "--external-file", "-"], external)
+    assert result.returncode == 0
+    assert json.loads(result.stdout) == calculate_machiavellian_delta(internal.read_text(), external)
+    both = _cli("machiavellian_delta", ["--internal-file", "-", "--external-file", "-"])
+    assert both.returncode == 1 and "stdin" in json.loads(both.stdout)["note"]
@@ -0,0 +1,110 @@
+"""Threshold store reload/publish/save and online threshold tuning."""
+
+import json
+import os
+import stat
+
+import numpy as np
+import pytest
+
+from forensics.threshold_tuner import ThresholdTuner, TuningTarget
+from forensics.thresholds import ThresholdStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "thresholds.json"
+    path.write_text(json.dumps({"injection_detector": 0.5, "sere_evaluator.review": {
+        "default": 0.4, "tenants": {"acme": 0.3}}}))
+    return ThresholdStore(str(path), reload_interval=0.0)
+
+
+def _touch(path, values, bump):
+    with open(path, "w") as handle:
+        json.dump(values, handle)
+    stat_result = os.stat(path)
+    os.utime(path, (stat_result.st_atime, stat_result.st_mtime + bump))
+
+
+def test_tenant_values_fall_back_to_global_then_default(store):
+    assert store.get("sere_evaluator.review", 0.9, "acme") == 0.3
+    assert store.get("sere_evaluator.review", 0.9, "globex") == 0.4
+    assert store.get("missing", 0.9) == 0.9
+
+
+def test_external_edits_are_reloaded(store):
+    assert store.get("injection_detector", 0.0) == 0.5
+    _touch(store.path, {"injection_detector": 0.7}, bump=10)
+    assert store.get("injection_detector", 0.0) == 0.7
+
+
+def test_unsaved_publishes_survive_a_reload(store):
+    store.publish("injection_detector", 0.6)
+    _touch(store.path, {"machiavellian_delta": 9.0}, bump=10)
+    store.publish("sere_evaluator.review", 0.2, tenant="acme")
+    assert store.get("injection_detector", 0.0) == 0.6
+    assert store.get("machiavellian_delta", 0.0) == 9.0
+    store.save()
+    saved = json.loads(open(store.path).read())
+    assert saved["injection_detector"]["default"] == 0.6
+    assert saved["sere_evaluator.review"]["tenants"] == {"acme": 0.2}
+    assert saved["machiavellian_delta"] == 9.0
+    assert stat.S_IMODE(os.stat(store.path).st_mode) == 0o644
+
+
+def test_save_keeps_the_existing_file_mode(store):
+    os.chmod(store.path, 0o640)
+    store.publish("injection_detector", 0.6)
+    store.save()
+    assert stat.S_IMODE(os.stat(store.path).st_mode) == 0o640
+    assert not [name for name in os.listdir(os.path.dirname(store.path)) if name.startswith(".thresholds-")]
+
+
+def _feedback(rng, size=4000):
+    labels = rng.random(size) < 0.5
+    scores = np.round(np.clip(rng.normal(np.where(labels, 0.7, 0.35), 0.12), 0, 1), 2)
+    return scores, labels
+
+
+def test_tuned_cutoff_meets_the_target_fpr():
+    store = ThresholdStore()
+    tuner = ThresholdTuner([TuningTarget("injection_detector", 0.4, target_fpr=0.05)], store=store)
+    scores, labels = _feedback(np.random.default_rng(1))
+    tuner.observe("injection_detector", scores, labels)
+    entry = tuner.recompute()["injection_detector"]
+    cutoff = store.get("injection_detector", 0.0)
+    alerts = scores >= cutoff
+    assert entry["status"] == "tuned"
+    assert np.mean(alerts[~labels]) <= 0.05
+    assert entry["metrics"]["false_positive_rate"] == pytest.approx(np.mean(alerts[~labels]))
+
+
+def test_below_target_agrees_with_the_detector_strict_comparison():
+    store = ThresholdStore()
+    target = TuningTarget("sere_evaluator.review", 0.4, target_fpr=0.2, bins=100, direction="below")
+    tuner = ThresholdTuner([target], store=store)
+    # Low confidence is the risky side: positives (should review) score low.
+    scores, labels = _feedback(np.random.default_rng(2))
+    scores = 1.0 - scores
+    tuner.observe(target.name, scores, labels)
+    entry = tuner.recompute()[target.name]
+    cutoff = store.get(target.name, 1.0)
+    alerts = scores < cutoff  # evaluate_response: confidence < review cutoff
+    assert np.isclose(scores, cutoff).any()  # the boundary case the comparisons must agree on
+    assert entry["metrics"]["false_positive_rate"] == pytest.approx(np.mean(alerts[~labels]))
+    assert entry["metrics"]["recall"] == pytest.approx(np.mean(alerts[labels]))
+    assert np.mean(alerts[~labels]) <= 0.2
+
+
+def test_ordered_cutoffs_are_clamped():
+    store = ThresholdStore()
+    tuner = ThresholdTuner([
+        TuningTarget("review", 0.25, target_fpr=0.01, ceiling="divergent"),
+        TuningTarget("divergent", 0.6, target_fpr=0.5),
+    ], store=store)
+    scores, labels = _feedback(np.random.default_rng(3))
+    tuner.observe("review", scores, labels)
+    tuner.observe("divergent", scores, labels)
+    report = tuner.recompute()
+    assert report["review"]["clamped_to"] == "divergent"
+    assert store.get("review", 0.0) == store.get("divergent", 1.0)
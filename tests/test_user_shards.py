@@ -0,0 +1,82 @@
+"""Consistent-hash ring, spilling user store and worker migration."""
+
+import pytest
+
+from forensics.epistemic_narrowing_monitor import NarrowingTracker
+from forensics.user_shards import HashRing, ShardRouter, UserStateStore
+
+USERS = [f"user-{index}" for index in range(60)]
+
+
+def _interactions(index, step):
+    words = ["however it depends", "it must always be so", "perhaps others believe", "never, only this"]
+    return [{"content": f"{words[(index + step) % 4]} topic{index % 5} round{step}"}]
+
+
+def _expected_report(index, steps):
+    tracker = NarrowingTracker()
+    for step in range(steps):
+        for interaction in _interactions(index, step):
+            tracker.update(interaction)
+    return tracker.report(None, USERS[index])
+
+
+def test_ring_moves_only_keys_owned_by_the_new_node():
+    ring = HashRing(["a", "b", "c"], vnodes=64)
+    keys = [f"key-{index}" for index in range(2000)]
+    before = {key: ring.node_for(key) for key in keys}
+    ring.add("d")
+    after = {key: ring.node_for(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(after[key] == "d" for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.4
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+    with pytest.raises(ValueError):
+        ring.add("a")
+    with pytest.raises(LookupError):
+        HashRing().node_for("key")
+
+
+def test_store_spills_idle_users_and_reloads_them(tmp_path):
+    store = UserStateStore(str(tmp_path / "spill.sqlite"), capacity=8)
+    for index, user_id in enumerate(USERS[:20]):
+        for interaction in _interactions(index, 0) + _interactions(index, 1):
+            store.get(user_id).update(interaction)
+    stats = store.stats()
+    assert stats["active"] <= 8 and stats["spilled"] == 20 - stats["active"] and len(store) == 20
+    assert store.get(USERS[0], create=False).report(None, USERS[0]) == _expected_report(0, 2)
+    assert store.stats()["reloads"] == 1
+    assert store.get("nobody", create=False) is None
+    popped = store.pop_where(lambda user_id: user_id in USERS[:10])
+    assert sorted(user_id for user_id, _ in popped) == sorted(USERS[:10]) and len(store) == 10
+    store.close()
+
+
+def test_adding_and_removing_workers_keeps_every_user_state(tmp_path):
+    with ShardRouter(workers=2, capacity=8, spill_dir=str(tmp_path), vnodes=32) as router:
+        for step in range(2):
+            for index, user_id in enumerate(USERS):
+                router.observe(user_id, _interactions(index, step))
+        owners = {user_id: router.worker_for(user_id) for user_id in USERS}
+
+        added = router.add_worker()
+        moved = [user_id for user_id in USERS if router.worker_for(user_id) != owners[user_id]]
+        assert added["moved_users"] == len(moved) > 0
+        assert all(router.worker_for(user_id) == added["worker"] for user_id in moved)
+        assert all(router.report(user_id) == _expected_report(index, 2) for index, user_id in enumerate(USERS))
+
+        for index, user_id in enumerate(USERS):
+            router.observe(user_id, _interactions(index, 2))
+        owned = sum(router.worker_for(user_id) == "worker-0" for user_id in USERS)
+        removed = router.remove_worker("worker-0")
+        assert removed["moved_users"] == owned
+        assert set(router.stats()) == {"worker-1", added["worker"]}
+        assert sum(stats["active"] + stats["spilled"] for stats in router.stats().values()) == len(USERS)
+        assert all(router.report(user_id) == _expected_report(index, 3) for index, user_id in enumerate(USERS))
+
+        with pytest.raises(KeyError):
+            router.remove_worker("worker-0")
+        router.remove_worker("worker-1")
+        with pytest.raises(ValueError):
+            router.remove_worker(added["worker"])
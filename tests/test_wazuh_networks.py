@@ -0,0 +1,79 @@
+"""CIDR aggregation and grouped block_ip rules of the Wazuh bridge."""
+
+import ipaddress
+import random
+
+import pytest
+
+from forensics.wazuh_mcp_bridge import MAX_SRCIPS_PER_RULE, WazuhRuleCompiler, aggregate_networks
+
+
+def _reference(ips):
+    networks = [ipaddress.ip_network(ip, strict=False) for ip in ips]
+    collapsed = []
+    for version in (4, 6):
+        collapsed += ipaddress.collapse_addresses(network for network in networks if network.version == version)
+    return [str(network.network_address) if network.prefixlen == network.max_prefixlen else str(network)
+            for network in collapsed]
+
+
+def test_adjacent_addresses_merge_into_cidrs():
+    ips = [f"10.0.0.{host}" for host in range(256)] + ["10.0.1.0/25", "10.0.1.128/25", "192.168.1.7"]
+    assert aggregate_networks(ips) == ["10.0.0.0/23", "192.168.1.7"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_ipaddress_collapse(seed):
+    rng = random.Random(seed)
+    ips = []
+    for _ in range(rng.randint(1, 300)):
+        if rng.random() < 0.7:
+            address = ipaddress.IPv4Address(rng.randrange(0x0A000000, 0x0A000400))
+            length = rng.choice([32, 32, 32, 30, 28, 24])
+        else:
+            address = ipaddress.IPv6Address((0x20010DB8 << 96) + rng.randrange(0, 1 << 12))
+            length = rng.choice([128, 128, 126, 120])
+        network = ipaddress.ip_network(f"{address}/{length}", strict=False)
+        ips.append(str(address) if length == network.max_prefixlen else str(network))
+    assert aggregate_networks(ips) == _reference(ips)
+
+
+def test_invalid_addresses_are_rejected():
+    with pytest.raises(ValueError):
+        aggregate_networks(["10.0.0.300"])
+
+
+def test_compile_batch_groups_and_dedupes():
+    intents = [{"intent": "block_ip", "parameters": {"ip": f"10.1.{index // 256}.{index % 256}"}}
+               for index in range(1024)]
+    intents += [{"intent": "block_ip", "parameters": {"ip": f"172.16.{index // 128}.{index % 128 * 2}"}}
+                for index in range(300)]
+    intents += [{"intent": "privilege_escalation", "parameters": {"description": "sudo"}}] * 3
+    intents += [{"intent": "block_ip", "parameters": {"ip": "not-an-ip"}}]
+
+    result = WazuhRuleCompiler.compile_batch(intents, first_rule_id=100000)
+    report = result["report"]
+
+    assert report["cidr_ranges"] == 1 + 300
+    assert report["duplicates_removed"] == 2
+    assert report["rules_before"] == 1024 + 300 + 1 + 3
+    assert report["rules_after"] == len(result["rules"]) == 2 + 1
+    assert [rule["rule_id"] for rule in result["rules"]] == ["100000", "100001", "100002"]
+    assert all(len(rule["parameters"]["ip"]) <= MAX_SRCIPS_PER_RULE
+               for rule in result["rules"] if rule["intent"] == "block_ip")
+    assert result["rules"][0]["rule_xml"].count("<srcip>") == MAX_SRCIPS_PER_RULE
+    assert [error["index"] for error in result["errors"]] == [len(intents) - 1]
+
+
+def test_compile_batch_accepts_unhashable_reasons():
+    intents = [
+        {"intent": "block_ip", "parameters": {"ip": "10.0.0.1", "reason": ["botnet", "c2"]}},
+        {"intent": "block_ip", "parameters": {"ip": "10.0.0.0", "reason": ["botnet", "c2"]}},
+        {"intent": "block_ip", "parameters": {"ip": "10.0.0.9", "reason": {"ticket": 7}}},
+    ]
+    result = WazuhRuleCompiler.compile_batch(intents, first_rule_id=1)
+    assert result["errors"] == []
+    assert [rule["parameters"] for rule in result["rules"]] == [
+        {"ip": ["10.0.0.0/31"], "reason": "['botnet', 'c2']"},
+        {"ip": ["10.0.0.9"], "reason": "{'ticket': 7}"},
+    ]